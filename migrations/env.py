@@ -9,6 +9,11 @@ from sqlmodel import SQLModel
 from src.models.user import User
 from src.models.food_log import FoodLog
 from src.models.user_details import UserDetails
+from src.models.user_features import UserFeatures
+from src.models.diet_prediction import DietPrediction
+from src.models.food_log_daily import FoodLogDaily
+from src.models.food_item import FoodItem
+from src.models.food_name import FoodName
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
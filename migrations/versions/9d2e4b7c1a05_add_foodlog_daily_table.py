@@ -0,0 +1,50 @@
+import sqlmodel
+"""Add foodlog_daily table
+
+Revision ID: 9d2e4b7c1a05
+Revises: 5fdd9a8da21f
+Create Date: 2026-10-17 19:02:13.540261
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2e4b7c1a05'
+down_revision: Union[str, None] = '5fdd9a8da21f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NUTRIENTS = ['calories', 'carbs', 'protein', 'fat', 'sugar', 'sodium', 'potassium', 'fiber', 'iron', 'calcium',
+             'cholesterol', 'vitamin_a', 'vitamin_c', 'saturated_fat', 'trans_fat', 'polyunsaturated_fat',
+             'monounsaturated_fat']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('foodlog_daily',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('log_date', sa.Date(), nullable=False),
+    sa.Column('log_count', sa.Integer(), nullable=False),
+    *[sa.Column(nutrient, sa.Float(), nullable=False) for nutrient in NUTRIENTS],
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'log_date')
+    )
+
+    # Backfill from existing logs, later writes keep the rollup up to date
+    columns = ', '.join(NUTRIENTS)
+    sums = ', '.join(f'COALESCE(SUM({nutrient}), 0)' for nutrient in NUTRIENTS)
+    op.execute(
+        f'INSERT INTO foodlog_daily (user_id, log_date, log_count, {columns}) '
+        f'SELECT user_id, log_date, COUNT(*), {sums} '
+        f'FROM foodlog GROUP BY user_id, log_date'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('foodlog_daily')
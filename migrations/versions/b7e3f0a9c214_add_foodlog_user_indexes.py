@@ -0,0 +1,42 @@
+import sqlmodel
+"""Add foodlog user indexes and unique userdetails.user_id
+
+Revision ID: b7e3f0a9c214
+Revises: 9d2e4b7c1a05
+Create Date: 2026-10-17 20:41:52.118304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f0a9c214'
+down_revision: Union[str, None] = '9d2e4b7c1a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_foodlog_user_id_log_date', 'foodlog', ['user_id', 'log_date'], unique=False)
+    op.create_index('ix_foodlog_user_id_meal_type_log_date', 'foodlog', ['user_id', 'meal_type', 'log_date'],
+                    unique=False)
+
+    # Users are meant to have a single details row, refuse to pick one silently
+    duplicates = op.get_bind().execute(sa.text(
+        'SELECT count(*) FROM (SELECT user_id FROM userdetails GROUP BY user_id HAVING count(*) > 1) AS d'
+    )).scalar()
+    if duplicates:
+        raise RuntimeError(f'{duplicates} users have several userdetails rows, '
+                           'delete the extra rows before upgrading')
+    op.create_index(op.f('ix_userdetails_user_id'), 'userdetails', ['user_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_userdetails_user_id'), table_name='userdetails')
+    op.drop_index('ix_foodlog_user_id_meal_type_log_date', table_name='foodlog')
+    op.drop_index('ix_foodlog_user_id_log_date', table_name='foodlog')
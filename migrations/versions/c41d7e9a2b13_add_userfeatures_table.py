@@ -0,0 +1,53 @@
+import sqlmodel
+"""Add UserFeatures table
+
+Revision ID: c41d7e9a2b13
+Revises: 5cfe370db46b
+Create Date: 2026-10-17 18:02:11.402215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e9a2b13'
+down_revision: Union[str, None] = '5cfe370db46b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NUTRIENTS = ['calories', 'protein', 'fat', 'carbs', 'fiber', 'sugar', 'sodium', 'potassium', 'iron',
+             'calcium', 'vitamin_a', 'vitamin_c']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('userfeatures',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('food_log_count', sa.Integer(), nullable=False),
+    sa.Column('first_log_date', sa.Date(), nullable=True),
+    sa.Column('last_log_date', sa.Date(), nullable=True),
+    *[sa.Column(f'total_{nutrient}', sa.Float(), nullable=False) for nutrient in NUTRIENTS],
+    sa.Column('bmi_class', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=True),
+    sa.Column('encoded_features', sa.JSON(none_as_null=True), nullable=True),
+    sa.Column('model_version', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill the aggregates of existing users, encoded inputs are filled on their next prediction
+    totals = ', '.join(f'total_{nutrient}' for nutrient in NUTRIENTS)
+    sums = ', '.join(f'COALESCE(SUM({nutrient}), 0)' for nutrient in NUTRIENTS)
+    op.execute(
+        f'INSERT INTO userfeatures (user_id, food_log_count, first_log_date, last_log_date, {totals}, updated_at) '
+        f'SELECT user_id, COUNT(*), MIN(log_date), MAX(log_date), {sums}, NOW() '
+        f'FROM foodlog GROUP BY user_id'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('userfeatures')
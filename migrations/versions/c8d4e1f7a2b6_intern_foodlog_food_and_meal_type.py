@@ -0,0 +1,97 @@
+import sqlmodel
+"""Intern foodlog food names and store meal types as small ints
+
+Revision ID: c8d4e1f7a2b6
+Revises: e5a1c7d3f806
+Create Date: 2026-10-17 23:18:40.502817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d4e1f7a2b6'
+down_revision: Union[str, None] = 'e5a1c7d3f806'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# foodlog rows rewritten per committed batch
+BATCH_SIZE = 10_000
+
+# models.food_log.MEAL_TYPES, the code is the index
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner', 'snack']
+
+
+def _in_batches(update: str) -> None:
+    """Run an UPDATE of foodlog over BATCH_SIZE rows at a time in id order, committing every batch"""
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last = None
+        while True:
+            after = 'WHERE id > :last ' if last is not None else ''
+            upper = bind.execute(sa.text(
+                f'SELECT max(id) FROM (SELECT id FROM foodlog {after}ORDER BY id LIMIT :size) AS batch'
+            ), {'last': last, 'size': BATCH_SIZE}).scalar()
+            if upper is None:
+                return
+            bind.execute(sa.text(f'{update} WHERE {"id > :last AND " if last is not None else ""}id <= :upper'),
+                         {'last': last, 'upper': upper})
+            last = upper
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    unknown = op.get_bind().execute(sa.text(
+        'SELECT count(*) FROM foodlog WHERE lower(meal_type) NOT IN :meal_types'
+    ).bindparams(sa.bindparam('meal_types', MEAL_TYPES, expanding=True))).scalar()
+    if unknown:
+        raise RuntimeError(f'{unknown} food logs have a meal type other than {", ".join(MEAL_TYPES)}, '
+                           'fix them before upgrading')
+
+    op.create_table('foodname',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.add_column('foodlog', sa.Column('food_id', sa.Integer(), nullable=True))
+    op.add_column('foodlog', sa.Column('meal_code', sa.SmallInteger(), nullable=True))
+    op.execute('INSERT INTO foodname (name) SELECT DISTINCT food FROM foodlog')
+
+    meal_codes = ' '.join(f"WHEN '{name}' THEN {code}" for code, name in enumerate(MEAL_TYPES))
+    _in_batches('UPDATE foodlog SET food_id = (SELECT foodname.id FROM foodname WHERE foodname.name = foodlog.food), '
+                f'meal_code = CASE lower(meal_type) {meal_codes} END')
+
+    # the dropped columns' space is reused by new rows, VACUUM FULL (or pg_repack) returns it at once
+    op.drop_index('ix_foodlog_user_id_meal_type_log_date', table_name='foodlog')
+    op.drop_column('foodlog', 'meal_type')
+    op.drop_column('foodlog', 'food')
+    op.alter_column('foodlog', 'meal_code', new_column_name='meal_type', nullable=False)
+    op.alter_column('foodlog', 'food_id', nullable=False)
+    op.create_foreign_key('foodlog_food_id_fkey', 'foodlog', 'foodname', ['food_id'], ['id'])
+    op.create_index('ix_foodlog_user_id_meal_type_log_date', 'foodlog', ['user_id', 'meal_type', 'log_date'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('foodlog', sa.Column('food', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=True))
+    op.add_column('foodlog', sa.Column('meal_name', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=True))
+
+    meal_names = ' '.join(f"WHEN {code} THEN '{name}'" for code, name in enumerate(MEAL_TYPES))
+    _in_batches('UPDATE foodlog SET food = (SELECT foodname.name FROM foodname WHERE foodname.id = foodlog.food_id), '
+                f'meal_name = CASE meal_type {meal_names} END')
+
+    op.drop_index('ix_foodlog_user_id_meal_type_log_date', table_name='foodlog')
+    op.drop_constraint('foodlog_food_id_fkey', 'foodlog', type_='foreignkey')
+    op.drop_column('foodlog', 'meal_type')
+    op.drop_column('foodlog', 'food_id')
+    op.alter_column('foodlog', 'meal_name', new_column_name='meal_type', nullable=False)
+    op.alter_column('foodlog', 'food', nullable=False)
+    op.create_index('ix_foodlog_user_id_meal_type_log_date', 'foodlog', ['user_id', 'meal_type', 'log_date'],
+                    unique=False)
+    op.drop_table('foodname')
@@ -0,0 +1,86 @@
+import sqlmodel
+"""Partition foodlog by month of log_date
+
+Revision ID: d1f6b3a8e4c9
+Revises: c8d4e1f7a2b6
+Create Date: 2026-10-17 19:02:11.318204
+
+Postgres only, foodlog stays a plain table elsewhere. Every food log is copied into the
+partitioned table while foodlog is locked against writes, so run it with the API stopped.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f6b3a8e4c9'
+down_revision: Union[str, None] = 'c8d4e1f7a2b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# config.config.FOODLOG_PARTITION_MONTHS_AHEAD, the app creates the later ones
+MONTHS_AHEAD = 3
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_keys_and_indexes(primary_key: list[str]) -> None:
+    op.create_primary_key('foodlog_pkey', 'foodlog', primary_key)
+    op.create_foreign_key('foodlog_user_id_fkey', 'foodlog', 'user', ['user_id'], ['id'])
+    op.create_foreign_key('foodlog_food_id_fkey', 'foodlog', 'foodname', ['food_id'], ['id'])
+    op.create_index(op.f('ix_foodlog_log_date'), 'foodlog', ['log_date'], unique=False)
+    op.create_index('ix_foodlog_user_id_log_date', 'foodlog', ['user_id', 'log_date'], unique=False)
+    op.create_index('ix_foodlog_user_id_meal_type_log_date', 'foodlog', ['user_id', 'meal_type', 'log_date'],
+                    unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # no log may be written between the copy and the drop, reads go on until then
+    op.execute('LOCK TABLE foodlog IN SHARE ROW EXCLUSIVE MODE')
+
+    # a partition per month holding logs, and for the current month and the next ones
+    months = set(bind.execute(sa.text(
+        "SELECT DISTINCT CAST(date_trunc('month', log_date) AS date) FROM foodlog"
+    )).scalars())
+    current = date.today().replace(day=1)
+    months.update(_add_months(current, ahead) for ahead in range(MONTHS_AHEAD + 1))
+
+    op.execute('CREATE TABLE foodlog_partitioned (LIKE foodlog INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+               'PARTITION BY RANGE (log_date)')
+    for month in sorted(months):
+        op.execute(f"CREATE TABLE foodlog_p{month:%Y_%m} PARTITION OF foodlog_partitioned "
+                   f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')")
+    op.execute('CREATE TABLE foodlog_default PARTITION OF foodlog_partitioned DEFAULT')
+
+    # keys and indexes are built once the rows are in, on every partition at once
+    op.execute('INSERT INTO foodlog_partitioned SELECT * FROM foodlog')
+    op.drop_table('foodlog')
+    op.rename_table('foodlog_partitioned', 'foodlog')
+    _create_keys_and_indexes(['id', 'log_date'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # partitions detached to the archive schema are left there
+    op.execute('LOCK TABLE foodlog IN SHARE ROW EXCLUSIVE MODE')
+    op.execute('CREATE TABLE foodlog_unpartitioned (LIKE foodlog INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    op.execute('INSERT INTO foodlog_unpartitioned SELECT * FROM foodlog')
+    op.drop_table('foodlog')
+    op.rename_table('foodlog_unpartitioned', 'foodlog')
+    _create_keys_and_indexes(['id'])
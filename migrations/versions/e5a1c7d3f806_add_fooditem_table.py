@@ -0,0 +1,49 @@
+import sqlmodel
+"""Add fooditem table
+
+Revision ID: e5a1c7d3f806
+Revises: b7e3f0a9c214
+Create Date: 2026-10-17 22:03:27.614085
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1c7d3f806'
+down_revision: Union[str, None] = 'b7e3f0a9c214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MICRONUTRIENTS = ['sugar', 'sodium', 'potassium', 'fiber', 'iron', 'calcium', 'cholesterol', 'vitamin_a', 'vitamin_c',
+                  'saturated_fat', 'trans_fat', 'polyunsaturated_fat', 'monounsaturated_fat']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fooditem',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+    sa.Column('serving_grams', sa.Float(), nullable=False),
+    sa.Column('calories', sa.Float(), nullable=False),
+    sa.Column('carbs', sa.Float(), nullable=False),
+    sa.Column('protein', sa.Float(), nullable=False),
+    sa.Column('fat', sa.Float(), nullable=False),
+    *[sa.Column(nutrient, sa.Float(), nullable=True) for nutrient in MICRONUTRIENTS],
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_fooditem_name'), 'fooditem', ['name'], unique=False)
+    op.create_index(op.f('ix_fooditem_updated_at'), 'fooditem', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_fooditem_updated_at'), table_name='fooditem')
+    op.drop_index(op.f('ix_fooditem_name'), table_name='fooditem')
+    op.drop_table('fooditem')
@@ -1,15 +1,60 @@
-from fastapi import APIRouter, HTTPException
-from sqlmodel import select
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional
 
-from models.food_log import FoodLog
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, select
+
+from config.config import MIN_FOOD_LOGS
+from core.config import configs
+from crud.diet_prediction import get_fresh_prediction, save_predictions
+from crud.user_features import get_user_features, store_encoded_features
+from models.diet_prediction import DietPredictionBatchRequest, DietPredictionPublic, DietPredictionsPublic
 from models.user_details import UserDetails
-from src.api.v1.debs import CurrentUser, SessionDep
+from src.api.v1.debs import CurrentUser, SessionDep, get_current_active_superuser
 from prediction_engine import diet_predictor
+from service.deficiency_engine import score_cohort, score_user
+from service.inference_pool import InferencePoolFull
+from service.prediction_cache import prediction_cache
+from utils.recommendations import get_food_recommendations
+
 router = APIRouter(prefix="/predict", tags=["predict"])
 
 
+def _load_prediction_inputs(
+        session: Session, user_id: uuid.UUID
+) -> Optional[tuple[int, str, Optional[np.ndarray], Optional[UserDetails]]]:
+    """
+    Food log count, BMI class and encoded model inputs of a user, read from the feature store.
+    User details are only loaded, and the stored inputs re-encoded, when those are stale.
+    Returns None when the user has no food logs or no details.
+    """
+    features = get_user_features(session=session, user_id=user_id)
+    if not features or not features.food_log_count:
+        return None
+
+    if features.model_version == diet_predictor.model_version and (
+            features.encoded_features is not None or features.food_log_count < MIN_FOOD_LOGS):
+        encoded = None if features.encoded_features is None else np.array([features.encoded_features])
+        return features.food_log_count, features.bmi_class, encoded, None
+
+    # Get user details from DB
+    user_details = session.exec(
+        select(UserDetails).where(UserDetails.user_id == user_id)
+    ).first()
+    if not user_details:
+        return None
+
+    bmi_class, encoded = diet_predictor.encode(user_details)
+    store_encoded_features(session=session, user_id=user_id, bmi_class=bmi_class, features=encoded,
+                           model_version=diet_predictor.model_version)
+    return features.food_log_count, bmi_class, encoded, user_details
+
+
 @router.post("/diet")
-def predict_diet(
+async def predict_diet(
         *,
         session: SessionDep,
         current_user: CurrentUser
@@ -17,18 +62,145 @@ def predict_diet(
     """
     Predict diet plan based on user details
     """
-    # Get user details from DB
-    user_details = session.exec(
-        select(UserDetails).where(UserDetails.user_id == current_user.id)
-    ).first()
+    model_version = diet_predictor.model_version
+    # precomputed by jobs.predict_all, or by an earlier request
+    recommendation = await run_in_threadpool(
+        lambda: get_fresh_prediction(session=session, user_id=current_user.id, model_version=model_version,
+                                     max_age=timedelta(hours=configs.PREDICTION_MAX_AGE_HOURS))
+    )
+    if recommendation is not None:
+        return {"recommendation": recommendation}
 
-    query = select(FoodLog).where(FoodLog.user_id == current_user.id)
-    food_logs = session.exec(query).all()
+    # the session is synchronous, keep its queries off the event loop
+    read_at = datetime.now(timezone.utc)
+    inputs = await run_in_threadpool(_load_prediction_inputs, session, current_user.id)
 
-    if not user_details or not food_logs:
+    if inputs is None:
         raise HTTPException(
             status_code=404,
             detail="Please complete your health profile first"
         )
+    food_log_count, bmi_class, encoded, user_details = inputs
+
+    try:
+        if encoded is not None or food_log_count < MIN_FOOD_LOGS:
+            recommendation = await diet_predictor.predict_encoded_async(bmi_class, encoded, food_log_count)
+        else:
+            recommendation = await diet_predictor.predict_async(user_details, food_log_count=food_log_count)
+    except InferencePoolFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many predictions in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    await run_in_threadpool(
+        lambda: save_predictions(session=session, predictions={current_user.id: recommendation},
+                                 model_version=model_version, predicted_at=read_at)
+    )
+
+    return {"recommendation": recommendation}
+
+
+@router.post(
+    "/diet/batch",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=DietPredictionsPublic,
+)
+def predict_diet_batch(
+        *,
+        session: SessionDep,
+        batch_in: DietPredictionBatchRequest
+) -> Any:
+    """
+    Predict diet plans for many users in one pass (superuser only).
+    Scores every user with a health profile when no user ids are given.
+    """
+    predictions = diet_predictor.predict_many(session, user_ids=batch_in.user_ids)
+
+    return DietPredictionsPublic(
+        data=[DietPredictionPublic(user_id=user_id, recommendation=recommendation)
+              for user_id, recommendation in predictions.items()],
+        count=len(predictions)
+    )
+
+
+@router.get("/deficiencies")
+def predict_deficiencies(
+        *,
+        session: SessionDep,
+        current_user: CurrentUser
+) -> Any:
+    """
+    Score the daily intake of the last logged days against the recommended values,
+    with foods for every deficient nutrient.
+    """
+    scored = score_user(session, current_user.id)
+    if scored is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Please log your food intake first"
+        )
 
-    return {"recommendation": diet_predictor.predict(user_details, food_log_count=len(food_logs))}
\ No newline at end of file
+    (date_from, date_to), scores = scored
+    report = scores.report()
+    # recommendations respect allergies, diet, cuisine and aversions once a profile exists
+    user_details = session.exec(
+        select(UserDetails).where(UserDetails.user_id == current_user.id)
+    ).first()
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        **report,
+        "recommendations": get_food_recommendations(report["deficiencies"], user_details),
+    }
+
+
+@router.get(
+    "/deficiencies/cohort",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def predict_cohort_deficiencies(
+        *,
+        session: SessionDep,
+        as_of: Optional[date] = None
+) -> Any:
+    """
+    Deficient user counts and mean severity per nutrient over every user
+    who logged food in the window ending at `as_of`, today by default (superuser only).
+    """
+    return score_cohort(session, as_of or date.today()).cohort_report()
+
+
+@router.get(
+    "/cache-stats",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def read_prediction_cache_stats() -> Any:
+    """
+    Hit/miss counters of the prediction cache (superuser only).
+    """
+    return prediction_cache.stats()
+
+
+@router.get(
+    "/models",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def read_model_stats() -> Any:
+    """
+    Load time and resident size of each loaded model version (superuser only).
+    """
+    return diet_predictor.registry.stats()
+
+
+@router.get(
+    "/scheduler-stats",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def read_inference_scheduler_stats() -> Any:
+    """
+    Batch-size distribution and queue wait of the inference scheduler (superuser only).
+    """
+    if diet_predictor.scheduler is None:
+        return {"enabled": False}
+    return {"enabled": True, **diet_predictor.scheduler.stats()}
@@ -0,0 +1,79 @@
+import uuid
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from src.api.v1.debs import SessionDep, CurrentUser, get_current_active_superuser
+from crud import food_item as crud
+from models.food_item import FoodItem, FoodItemCreate, FoodItemPublic, FoodItemUpdate, FoodSearchHit
+from service.food_search import food_index
+
+router = APIRouter(prefix="/foods", tags=["foods"])
+
+
+@router.get("/search", response_model=List[FoodSearchHit])
+def search_foods(
+        *,
+        session: SessionDep,
+        current_user: CurrentUser,
+        q: str = Query(min_length=1, max_length=100),
+        limit: int = Query(default=10, ge=1, le=50)
+) -> Any:
+    """
+    Autocomplete food names: items with words starting with the query's words, shortest names first,
+    then close spellings. Served from the in-memory search index.
+    """
+    return food_index.search(session, q, limit)
+
+
+@router.get("/{food_item_id}", response_model=FoodItemPublic)
+def read_food_item(
+        food_item_id: uuid.UUID,
+        session: SessionDep,
+        current_user: CurrentUser
+) -> Any:
+    """
+    Get a catalog item with all its nutrients.
+    """
+    food_item = session.get(FoodItem, food_item_id)
+    if not food_item or not food_item.is_active:
+        raise HTTPException(
+            status_code=404,
+            detail="The food item with this id does not exist"
+        )
+    return food_item
+
+
+@router.post(
+    "/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=FoodItemPublic,
+    status_code=status.HTTP_201_CREATED
+)
+def create_food_item(*, session: SessionDep, food_item_in: FoodItemCreate) -> Any:
+    """
+    Add an item to the catalog (superuser only).
+    """
+    food_item = crud.create_food_item(session=session, food_item=food_item_in)
+    food_index.refresh(session)
+    return food_item
+
+
+@router.patch(
+    "/{food_item_id}",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=FoodItemPublic
+)
+def update_food_item(*, session: SessionDep, food_item_id: uuid.UUID, food_item_in: FoodItemUpdate) -> Any:
+    """
+    Update a catalog item, `is_active: false` removes it from search (superuser only).
+    """
+    db_food_item = session.get(FoodItem, food_item_id)
+    if not db_food_item:
+        raise HTTPException(
+            status_code=404,
+            detail="The food item with this id does not exist"
+        )
+    food_item = crud.update_food_item(session=session, db_food_item=db_food_item, food_item_in=food_item_in)
+    food_index.refresh(session)
+    return food_item
@@ -1,19 +1,43 @@
+import codecs
+import csv
+import json
+import shutil
+import tempfile
 import uuid
-from collections import defaultdict
 from datetime import date, timedelta
-from typing import Any, List
+from pathlib import Path
+from typing import Annotated, Any, List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import select, func
+import numpy as np
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, Form, HTTPException, Response, UploadFile, status, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
 
-from crud.user_details import update_user_nutrition_summary
+from config.config import (
+    MAX_SUMMARY_WINDOWS, NUTRITION_WINDOW_DAYS, RECOMMENDED_VALUES, TRENDS_DEFAULT_DAYS, TRENDS_MAX_POINTS,
+)
+from core.config import configs
+from core.db_utils import BUCKETS
+from core.pagination import InvalidCursor, count_rows, paginate
 from models.message import Message
 from src.api.v1.debs import CurrentUser, SessionDep, get_current_active_superuser
-from models.food_log import FoodLog, FoodLogCreate, FoodLogPublic, FoodLogUpdate, FoodLogsPublic
+from models.food_log import (
+    FoodCount, FoodLog, FoodLogBulkResult, FoodLogCreate, FoodLogImportJob, FoodLogPublic, FoodLogUpdate, FoodLogsPublic,
+)
+from models.food_item import FoodItem, FoodLogFromCatalog
+from models.food_log_daily import FOOD_LOG_NUTRIENTS, FoodLogTrends
 from src.crud import food_log as crud
+from crud import food_item as crud_food_item
+from crud import food_log_daily as crud_daily
+from crud.user_features import get_user_features
+from service import food_log_export as export, food_log_import
+from service.deficiency_engine import score_user_windows
+from service.food_history import FoodHistory
 
 router = APIRouter(prefix="/food-log", tags=["food_log"])
 
+MealType = Literal["breakfast", "lunch", "dinner", "snack"]
+
 
 @router.post(
     "/",
@@ -34,6 +58,204 @@ def create_food_log(
     return food_log
 
 
+@router.post(
+    "/bulk",
+    response_model=FoodLogBulkResult,
+    status_code=status.HTTP_201_CREATED
+)
+def create_food_logs_bulk(
+        *,
+        session: SessionDep,
+        current_user: CurrentUser,
+        items: Annotated[list[Any], Body()]
+) -> Any:
+    """
+    Create many food log entries for the current user at once, e.g. a synced day or week.
+    Invalid items are reported by index and the valid ones are still stored.
+    """
+    if len(items) > configs.FOOD_LOG_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {configs.FOOD_LOG_BULK_MAX_ITEMS} food logs per request"
+        )
+
+    valid, errors = food_log_import.validate_food_logs(items)
+    food_logs = crud.create_food_logs(session=session, food_logs=[food_log for _, food_log in valid],
+                                      user_id=current_user.id)
+    return FoodLogBulkResult(created=len(food_logs), ids=[food_log.id for food_log in food_logs], errors=errors)
+
+
+@router.post(
+    "/from-catalog",
+    response_model=FoodLogPublic,
+    status_code=status.HTTP_201_CREATED
+)
+def create_food_log_from_catalog(
+        *,
+        session: SessionDep,
+        current_user: CurrentUser,
+        request: FoodLogFromCatalog
+) -> Any:
+    """
+    Log servings of a food catalog item, e.g. a `/foods/search` suggestion, for the current user.
+    """
+    food_item = session.get(FoodItem, request.food_item_id)
+    if not food_item or not food_item.is_active:
+        raise HTTPException(
+            status_code=404,
+            detail="The food item with this id does not exist"
+        )
+
+    food_log_in = crud_food_item.food_log_from_item(food_item, request)
+    return crud.create_food_log(session=session, food_log=food_log_in, user_id=current_user.id)
+
+
+@router.post(
+    "/import",
+    response_model=FoodLogImportJob,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def import_food_logs(
+        *,
+        session: SessionDep,
+        current_user: CurrentUser,
+        background_tasks: BackgroundTasks,
+        file: UploadFile,
+        columns: Annotated[Optional[str], Form()] = None
+) -> Any:
+    """
+    Import a CSV export of another food diary for the current user.
+    Columns are matched to food log fields by name, `columns` is an optional JSON object
+    mapping other header names to fields. The file is imported in the background,
+    poll `/food-log/import/{job_id}` for progress.
+    """
+    try:
+        mapping = json.loads(columns) if columns else None
+        if mapping is not None and not isinstance(mapping, dict):
+            raise ValueError("columns must be a JSON object")
+        header = next(csv.reader(codecs.iterdecode(file.file, "utf-8-sig")), None)
+        food_log_import.map_columns(header or [], mapping)
+    except ValueError as exc:  # also invalid JSON and undecodable files
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # the upload is closed with the request, keep a copy for the background task
+    file.file.seek(0)
+    with tempfile.NamedTemporaryFile("wb", suffix=".csv", delete=False) as copy:
+        shutil.copyfileobj(file.file, copy)
+
+    job = food_log_import.import_jobs.create(current_user.id)
+    background_tasks.add_task(food_log_import.run_import_job, session.get_bind(), job, Path(copy.name), mapping)
+    return job
+
+
+@router.get("/import/{job_id}", response_model=FoodLogImportJob)
+def read_import_job(*, current_user: CurrentUser, job_id: uuid.UUID) -> Any:
+    """
+    Progress of a CSV import.
+    """
+    job = food_log_import.import_jobs.get(job_id)
+    if not job or (job.user_id != current_user.id and not current_user.is_superuser):
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@router.get("/export")
+def export_food_logs(
+        *,
+        session: SessionDep,
+        current_user: CurrentUser,
+        format: Literal["ndjson", "csv"] = "ndjson"
+) -> StreamingResponse:
+    """
+    Export every food log of the current user, streamed as NDJSON or CSV.
+    """
+    return _export_response(session, format, current_user.id)
+
+
+@router.get("/export/all", dependencies=[Depends(get_current_active_superuser)])
+def export_all_food_logs(*, session: SessionDep, format: Literal["ndjson", "csv"] = "ndjson") -> StreamingResponse:
+    """
+    Export the food logs of every user, streamed as NDJSON or CSV (superuser only).
+    """
+    return _export_response(session, format)
+
+
+def _export_response(session: SessionDep, format: str, user_id: Optional[uuid.UUID] = None) -> StreamingResponse:
+    return StreamingResponse(
+        export.export_food_logs(session.get_bind(), format, user_id),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="food_logs.{format}"'},
+    )
+
+
+@router.get("/top-foods", response_model=List[FoodCount])
+def read_top_foods(
+        *,
+        session: SessionDep,
+        current_user: CurrentUser,
+        limit: int = Query(default=10, ge=1, le=100),
+        date_from: Annotated[Optional[date], Query(alias="from")] = None
+) -> Any:
+    """
+    The current user's most logged foods with the number of logs of each, since `from` when given.
+    """
+    return crud.get_top_foods(session=session, user_id=current_user.id, limit=limit, date_from=date_from)
+
+
+@router.get("/trends", response_model=FoodLogTrends)
+def read_trends(
+        *,
+        session: SessionDep,
+        current_user: CurrentUser,
+        nutrients: str = "calories",
+        bucket: Literal["day", "week", "month"] = "day",
+        date_from: Annotated[Optional[date], Query(alias="from")] = None,
+        date_to: Annotated[Optional[date], Query(alias="to")] = None,
+        meal_type: Optional[MealType] = None
+) -> Any:
+    """
+    Average daily intake of comma separated `nutrients` per day, week or month, as parallel arrays.
+    The range defaults to the last days up to the user's latest log. Ranges with more than
+    TRENDS_MAX_POINTS buckets are returned with the next coarser bucket, reported in `bucket`.
+    `meal_type` only counts the logs of that meal.
+    """
+    names = nutrients.split(",")
+    unknown = [name for name in names if name not in FOOD_LOG_NUTRIENTS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown nutrients: {', '.join(unknown)}")
+
+    if date_to is None:
+        features = get_user_features(session=session, user_id=current_user.id)
+        if features is None or not features.last_log_date:
+            return FoodLogTrends(bucket=bucket, dates=[], days_logged=[], values={name: [] for name in names})
+        date_to = features.last_log_date
+    if date_from is None:
+        date_from = date_to - timedelta(days=TRENDS_DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+
+    days = (date_to - date_from).days + 1
+    points = {"day": days, "week": days // 7 + 2, "month": days // 28 + 2}
+    coarser = [name for name in BUCKETS[BUCKETS.index(bucket):] if points[name] <= TRENDS_MAX_POINTS]
+    if not coarser:
+        raise HTTPException(status_code=400, detail="The range is too wide")
+    bucket = coarser[0]
+
+    if meal_type is None:
+        dates, days_logged, totals = crud_daily.get_nutrient_trends(
+            session=session, user_id=current_user.id, date_from=date_from, date_to=date_to, nutrients=names,
+            bucket=bucket
+        )
+    else:
+        # the rollup doesn't split meal types, group the logs themselves
+        history = FoodHistory.load(session, current_user.id, date_from, date_to, meal_type, nutrients=names)
+        starts, days_logged, totals = history.grouped(names, bucket)
+        dates = starts.tolist()
+    averages = np.round(totals / np.maximum(days_logged, 1)[:, None], 2)
+    return FoodLogTrends(bucket=bucket, dates=dates, days_logged=days_logged.astype(int).tolist(),
+                         values={name: averages[:, column].tolist() for column, name in enumerate(names)})
+
+
 @router.get("/{food_log_id}", response_model=FoodLogPublic)
 def read_food_log_by_id(
         food_log_id: uuid.UUID,
@@ -83,15 +305,7 @@ def update_food_log(
             detail="Not authorized to update this food log"
         )
 
-    # Update only provided fields
-    update_data = food_log_in.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_food_log, field, value)
-
-    session.add(db_food_log)
-    session.commit()
-    session.refresh(db_food_log)
-    return db_food_log
+    return crud.update_food_log(session=session, db_food_log=db_food_log, food_log_in=food_log_in)
 
 
 @router.delete("/{food_log_id}", response_model=Message)
@@ -114,13 +328,7 @@ def delete_food_log(
             detail="Not authorized to delete this food log"
         )
 
-    session.delete(food_log)
-    session.commit()
-
-    # Update summary after deletion
-    update_user_nutrition_summary(session, current_user.id)
-
-    return Message(message="Food log deleted successfully")
+    return crud.delete_food_log(session=session, db_food_log=food_log)
 
 
 @router.get("/", response_model=FoodLogsPublic)
@@ -129,15 +337,23 @@ def read_food_logs(
         session: SessionDep,
         current_user: CurrentUser,
         skip: int = 0,
-        limit: int = 100,
+        limit: int = Query(default=100, ge=1),
+        cursor: Optional[str] = None,
+        with_total: bool = False,
         date_from: date = None,
         date_to: date = None,
         meal_type: str = None
 ) -> Any:
     """
-    Retrieve food logs for the current user.
+    Retrieve food logs for the current user, ordered by date.
+    Pass the `next_cursor` of a page as `cursor` to get the next one; `skip` still works
+    but gets slower the deeper the page. `with_total` adds the number of matching logs,
+    estimated for large results.
     """
-    query = select(FoodLog).where(FoodLog.user_id == current_user.id)
+    query = select(FoodLog)
+    # For superusers to see all logs
+    if not (current_user.is_superuser and (date_from or date_to or meal_type)):
+        query = query.where(FoodLog.user_id == current_user.id)
 
     # Apply filters
     if date_from:
@@ -147,21 +363,20 @@ def read_food_logs(
     if meal_type:
         query = query.where(FoodLog.meal_type == meal_type.lower())
 
-    food_logs = session.exec(query.offset(skip).limit(limit)).all()
-
-    # For superusers to see all logs
-    if current_user.is_superuser and (date_from or date_to or meal_type):
-        admin_query = select(FoodLog)
-        if date_from:
-            admin_query = admin_query.where(FoodLog.log_date >= date_from)
-        if date_to:
-            admin_query = admin_query.where(FoodLog.log_date <= date_to)
-        if meal_type:
-            admin_query = admin_query.where(FoodLog.meal_type == meal_type.lower())
+    food_logs, next_cursor = _paginate(session, query, [FoodLog.log_date, FoodLog.id],
+                                       limit=limit, cursor=cursor, skip=skip)
 
-        food_logs = session.exec(admin_query.offset(skip).limit(limit)).all()
+    total, total_estimated = None, False
+    if with_total:
+        if date_from or date_to or meal_type:
+            total, total_estimated = count_rows(session, query)
+        else:
+            # every log of the user, counted in their aggregates
+            features = get_user_features(session=session, user_id=current_user.id)
+            total = features.food_log_count if features else 0
 
-    return FoodLogsPublic(data=food_logs, count=len(food_logs))
+    return FoodLogsPublic(data=food_logs, count=len(food_logs), next_cursor=next_cursor,
+                          total=total, total_estimated=total_estimated)
 
 
 @router.get("/latest/")
@@ -169,12 +384,18 @@ def read_latest_food_logs(
     *,
     session: SessionDep,
     current_user: CurrentUser,
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(default=100, ge=1),
+    cursor: Optional[str] = None,
 ) -> Any:
-    # Get the most recent log_date for the user
-    latest_date_query = select(func.max(FoodLog.log_date)).where(FoodLog.user_id == current_user.id)
-    latest_log_date = session.exec(latest_date_query).one()
+    """
+    Food logs of the user's last seven logged days, ordered by date.
+    The cursor of the next page is returned in the `X-Next-Cursor` header.
+    """
+    # The most recent log_date of the user, kept in their aggregates
+    features = get_user_features(session=session, user_id=current_user.id)
+    latest_log_date = features.last_log_date if features else None
 
     if not latest_log_date:
         return []
@@ -189,56 +410,50 @@ def read_latest_food_logs(
         FoodLog.log_date <= to_date
     )
 
-    food_logs = session.exec(query.offset(skip).limit(limit)).all()
+    food_logs, next_cursor = _paginate(session, query, [FoodLog.log_date, FoodLog.id],
+                                       limit=limit, cursor=cursor, skip=skip)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return food_logs
 
 
-
-RECOMMENDED_VALUES = {
-    "calories": 2000,
-    "protein": 50,
-    "fat": 70,
-    "carbs": 300,
-    "fiber": 30,
-    "sugar": 50,
-    "sodium": 2300,
-    "potassium": 4700,
-    "iron": 18,
-    "calcium": 1000,
-    "vitamin_a": 3000,
-    "vitamin_c": 90
-}
+def _paginate(session: SessionDep, query, order_by, **page) -> tuple[list, Optional[str]]:
+    try:
+        return paginate(session, query, order_by, **page)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 @router.get("/nutrition-summary/")
-def get_nutrition_summary(*, session: SessionDep, current_user=CurrentUser):
-    latest_date_query = select(func.max(FoodLog.log_date)).where(FoodLog.user_id == current_user.id)
-    latest_log_date = session.exec(latest_date_query).one()
+def get_nutrition_summary(
+        *,
+        session: SessionDep,
+        current_user: CurrentUser,
+        windows: Optional[str] = None,
+        meal_type: Optional[MealType] = None
+):
+    """
+    Daily nutrient averages and deficiencies over the days ending at the user's latest log.
+    `windows` lists window lengths in days, e.g. `7,30,90`, all summed by one query; the
+    top-level fields describe the first one. `meal_type` only counts the logs of that meal.
+    """
+    try:
+        lengths = [int(days) for days in windows.split(",")] if windows else [NUTRITION_WINDOW_DAYS]
+    except ValueError:
+        lengths = []
+    if not lengths or len(lengths) > MAX_SUMMARY_WINDOWS or not all(0 < days <= 366 for days in lengths):
+        raise HTTPException(
+            status_code=400,
+            detail=f"windows must be up to {MAX_SUMMARY_WINDOWS} comma separated day counts between 1 and 366"
+        )
 
-    if not latest_log_date:
+    scored = score_user_windows(session, current_user.id, lengths, meal_type)
+    if scored is None:
         return []
 
-    from_date = latest_log_date - timedelta(days=6)  # Includes today + 6 previous days
-    to_date = latest_log_date
-
-    query = select(FoodLog).where(
-        FoodLog.user_id == current_user.id,
-                    FoodLog.log_date >= from_date,
-                    FoodLog.log_date <= to_date
-    )
-    logs = session.exec(query).all()
-
-    totals = defaultdict(float)
-    days = set()
-
-    for log in logs:
-        days.add(log.log_date)
-        for field in RECOMMENDED_VALUES:
-            value = getattr(log, field, 0)
-            if value:
-                totals[field] += value
-
-    num_days = len(days) or 1
-    daily_avg = {nutrient: round(totals[nutrient] / num_days, 2) for nutrient in RECOMMENDED_VALUES}
-
-    return {"average": daily_avg, "recommended": RECOMMENDED_VALUES}
+    last_log_date, scores = scored
+    reports = [{"days": days, "date_from": last_log_date - timedelta(days=days - 1), "date_to": last_log_date,
+                "days_logged": int(scores.days[row]), **scores.report(row)}
+               for row, days in enumerate(lengths)]
+    return {"average": reports[0]["average"], "recommended": RECOMMENDED_VALUES,
+            "deficiencies": reports[0]["deficiencies"], "severity": reports[0]["severity"], "windows": reports}
@@ -1,10 +1,11 @@
 import uuid
 from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from api.v1.debs import CurrentUser, SessionDep, get_current_active_superuser
 from crud import user as crud
+from src.core.pagination import InvalidCursor
 from models.message import Message
 from src.models.user import (User, UserCreate, UserPublic, UserRegister,
                              UsersPublic, UserUpdate)
@@ -133,10 +134,14 @@ def delete_user(
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(session: SessionDep, skip: int = 0, limit: int = Query(default=100, ge=1),
+               cursor: str | None = None) -> Any:
     """
     Retrieve users.
+    Pass the `next_cursor` of a page as `cursor` to get the next one.
     """
-
-    users = crud.get_all_users(session=session, skip=skip, limit=limit)
+    try:
+        users = crud.get_all_users(session=session, skip=skip, limit=limit, cursor=cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     return users
@@ -5,12 +5,15 @@ import uuid
 from datetime import date
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlmodel import select
 
+from core.pagination import InvalidCursor, paginate
+
 from models.message import Message
 from src.api.v1.debs import CurrentUser, SessionDep
 from src.crud import user_details as crud
+from crud.user_features import mark_features_stale
 
 from models.user_details import UserDetailsPublic, UserDetailsCreate, UserDetails, UserDetailsUpdate
 
@@ -108,6 +111,7 @@ def update_user_details(
             details.bmi = round(details.weight_kg / ((details.height_cm / 100) ** 2), 1)
 
     session.add(details)
+    mark_features_stale(session, target_user_id)
     session.commit()
     session.refresh(details)
     return details
@@ -137,6 +141,7 @@ def delete_user_details(
         )
 
     session.delete(details)
+    mark_features_stale(session, target_user_id)
     session.commit()
     return Message(message="User details deleted successfully")
 
@@ -146,11 +151,14 @@ def read_all_user_details(
         *,
         session: SessionDep,
         current_user: CurrentUser,
+        response: Response,
         skip: int = 0,
-        limit: int = 100
+        limit: int = Query(default=100, ge=1),
+        cursor: Optional[str] = None
 ) -> Any:
     """
     Retrieve all user details (superuser only).
+    The cursor of the next page is returned in the `X-Next-Cursor` header.
     """
     if not current_user.is_superuser:
         raise HTTPException(
@@ -158,10 +166,12 @@ def read_all_user_details(
             detail="Only superusers can access all user details"
         )
 
-    details = session.exec(
-        select(UserDetails)
-        .offset(skip)
-        .limit(limit)
-    ).all()
+    try:
+        details, next_cursor = paginate(session, select(UserDetails), [UserDetails.id],
+                                        limit=limit, cursor=cursor, skip=skip)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return details
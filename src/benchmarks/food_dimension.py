@@ -0,0 +1,166 @@
+"""
+Size and GROUP BY latency of food logs with the food and meal type stored as strings versus
+interned food ids and meal type codes.
+
+    python -m benchmarks.food_dimension --rows 200000 --output results.json
+
+Seeds the same logs in both layouts, the former one as a `foodlog_before` table with the
+indexes foodlog had, in an in-memory SQLite database (or `--database-url`, which should
+point at a scratch database). Reports table and index bytes, then the best time of the
+most logged foods query for one user and for every user.
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy import (Column, Date, Float, Index, MetaData, String, Table, Uuid, create_engine, func, insert,
+                        select, text)
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel
+
+from benchmarks.food_search import catalog_names
+from crud.food_log import get_top_foods
+from crud.food_name import food_name_ids
+from models.food_log import MEAL_TYPES, FoodLog
+from models.food_log_daily import FOOD_LOG_NUTRIENTS
+from models.food_name import FoodName
+from models.user_details import UserDetails  # noqa: F401, mapped by User's relationships
+from src.models.user import User  # noqa: F401, mapped by FoodLog's relationships
+
+# foodlog before food names were interned
+BEFORE = Table(
+    "foodlog_before", MetaData(),
+    Column("id", Uuid, primary_key=True),
+    Column("user_id", Uuid, nullable=False),
+    Column("log_date", Date, nullable=False, index=True),
+    Column("food", String(100), nullable=False),
+    Column("meal_type", String(20), nullable=False),
+    *(Column(nutrient, Float) for nutrient in FOOD_LOG_NUTRIENTS),
+    Index("ix_foodlog_before_user_id_log_date", "user_id", "log_date"),
+    Index("ix_foodlog_before_user_id_meal_type_log_date", "user_id", "meal_type", "log_date"),
+)
+
+
+def seed(engine, rows: int, users: int, foods: int, seed_value: int = 0) -> uuid.UUID:
+    """The same logs in both layouts, foods picked with a long tail; returns the busiest user"""
+    rnd = random.Random(seed_value)
+    names = catalog_names(foods, seed_value)
+    weights = [1 / (rank + 1) for rank in range(foods)]
+    user_ids = [uuid.UUID(int=rnd.getrandbits(128)) for _ in range(users)]
+    start = date(2020, 1, 1)
+    with Session(engine) as session:
+        ids = food_name_ids.get(session, names)
+        for offset in range(0, rows, 10_000):
+            logs = [{
+                "id": uuid.UUID(int=rnd.getrandbits(128)),
+                "user_id": user_ids[index % users],
+                "log_date": start + timedelta(days=index // (4 * users)),
+                "food": rnd.choices(names, weights)[0],
+                "meal_type": MEAL_TYPES[index % 4],
+                **{nutrient: rnd.uniform(0, 100) for nutrient in ("calories", "carbs", "protein", "fat")},
+            } for index in range(offset, min(offset + 10_000, rows))]
+            session.execute(insert(BEFORE), logs)
+            session.execute(insert(FoodLog.__table__), [
+                {**{key: value for key, value in log.items() if key != "food"}, "food_id": ids[log["food"]]}
+                for log in logs
+            ])
+        session.commit()
+    return user_ids[0]
+
+
+def sizes(engine, table: str) -> dict:
+    """Bytes of a table and of its indexes"""
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            connection.execute(text(f"VACUUM ANALYZE {table}").execution_options(isolation_level="AUTOCOMMIT"))
+            table_bytes, index_bytes = connection.execute(
+                text("SELECT pg_table_size(:table), pg_indexes_size(:table)"), {"table": table}
+            ).one()
+        else:
+            used = dict(connection.execute(text(
+                "SELECT dbstat.name = schema.tbl_name, sum(dbstat.pgsize) FROM dbstat "
+                "JOIN sqlite_schema AS schema ON schema.name = dbstat.name "
+                "WHERE schema.tbl_name = :table GROUP BY dbstat.name = schema.tbl_name"
+            ), {"table": table}).all())
+            table_bytes, index_bytes = used.get(1, 0), used.get(0, 0)
+    return {"table_bytes": int(table_bytes), "index_bytes": int(index_bytes)}
+
+
+def best_ms(run: Callable[[], object], repeats: int) -> float:
+    seconds = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - started_at)
+    return round(min(seconds) * 1000, 3)
+
+
+def top_foods_before(session: Session, user_id: Optional[uuid.UUID], limit: int = 10) -> list:
+    statement = select(BEFORE.c.food, func.count().label("log_count"))
+    if user_id is not None:
+        statement = statement.where(BEFORE.c.user_id == user_id)
+    return session.execute(statement.group_by(BEFORE.c.food).order_by(func.count().desc(), BEFORE.c.food)
+                           .limit(limit)).all()
+
+
+def run(rows: int = 200_000, users: int = 20, foods: int = 2_000, repeats: int = 5,
+        database_url: Optional[str] = None, seed_value: int = 0) -> dict:
+    if database_url is None:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(database_url)
+    BEFORE.create(engine)
+    SQLModel.metadata.create_all(engine, tables=[FoodName.__table__, FoodLog.__table__])
+    user_id = seed(engine, rows, users, foods, seed_value)
+
+    with Session(engine) as session:
+        before = [(food, count) for food, count in top_foods_before(session, user_id)]
+        after = [(food.food, food.log_count) for food in get_top_foods(session=session, user_id=user_id)]
+        assert before == after
+        results = {
+            "rows": rows,
+            "foods": foods,
+            "dialect": engine.dialect.name,
+            "before": {
+                **sizes(engine, BEFORE.name),
+                "top_foods_user_ms": best_ms(lambda: top_foods_before(session, user_id), repeats),
+                "top_foods_all_ms": best_ms(lambda: top_foods_before(session, None), repeats),
+            },
+            "after": {
+                **sizes(engine, FoodLog.__tablename__),
+                "food_names_bytes": sum(sizes(engine, FoodName.__tablename__).values()),
+                "top_foods_user_ms": best_ms(lambda: get_top_foods(session=session, user_id=user_id), repeats),
+                "top_foods_all_ms": best_ms(lambda: get_top_foods(session=session, user_id=None), repeats),
+            },
+        }
+    engine.dispose()
+    for measure in ("table_bytes", "index_bytes", "top_foods_user_ms", "top_foods_all_ms"):
+        results[f"{measure}_ratio"] = round(results["before"][measure] / max(results["after"][measure], 1e-9), 2)
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark food logs with interned food names.")
+    parser.add_argument("--rows", type=int, default=200_000, help="food logs seeded in each layout")
+    parser.add_argument("--users", type=int, default=20, help="users the logs are spread over")
+    parser.add_argument("--foods", type=int, default=2_000, help="distinct food names")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per query, the best one is reported")
+    parser.add_argument("--database-url", default=None, help="scratch database to seed (default: in-memory SQLite)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    output = json.dumps(run(args.rows, args.users, args.foods, args.repeats, args.database_url, args.seed), indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        args.output.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
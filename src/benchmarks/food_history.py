@@ -0,0 +1,141 @@
+"""
+Memory and speed of summarizing a food history through ORM objects versus `FoodHistory` columns.
+
+    python -m benchmarks.food_history --rows 100000 --output results.json
+
+Seeds one user's history in an in-memory SQLite database (or `--database-url`, which
+should point at a scratch database), then times loading it and averaging every
+RECOMMENDED_VALUES nutrient per logged day both ways, and traces the peak memory of each.
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, select
+
+from config.config import RECOMMENDED_VALUES
+from crud.food_name import food_name_ids
+from models.food_log import FoodLog
+from models.user_details import UserDetails  # noqa: F401, mapped by User's relationships
+from service.food_history import MEAL_TYPES, FoodHistory
+from src.models.user import User
+
+NUTRIENTS = list(RECOMMENDED_VALUES)
+
+
+def seed(engine, rows: int, seed: int = 0) -> uuid.UUID:
+    rnd = random.Random(seed)
+    user_id = uuid.UUID(int=rnd.getrandbits(128))
+    start = date(2015, 1, 1)
+    with Session(engine) as session:
+        session.execute(insert(User), [{"id": user_id, "email": f"{user_id}@example.com", "hashed_password": "x"}])
+        food_id = food_name_ids.get(session, ["Oats"])["Oats"]
+        for offset in range(0, rows, 10_000):
+            session.execute(insert(FoodLog), [{
+                "id": uuid.UUID(int=rnd.getrandbits(128)),
+                "user_id": user_id,
+                "log_date": start + timedelta(days=index // 4),
+                "food_id": food_id,
+                "meal_type": MEAL_TYPES[index % 4],
+                "calories": rnd.uniform(50, 900),
+                "carbs": rnd.uniform(0, 100),
+                "protein": rnd.uniform(0, 50),
+                "fat": rnd.uniform(0, 40),
+                **{nutrient: rnd.uniform(0, 10) if rnd.random() < 0.5 else None
+                   for nutrient in ("sugar", "sodium", "potassium", "fiber", "iron", "calcium", "vitamin_a", "vitamin_c")},
+            } for index in range(offset, min(offset + 10_000, rows))])
+        session.commit()
+    return user_id
+
+
+def orm_average(engine, user_id: uuid.UUID) -> dict[str, float]:
+    """The per row path: ORM objects and a getattr per nutrient per log"""
+    with Session(engine) as session:
+        logs = session.exec(select(FoodLog).where(FoodLog.user_id == user_id)).all()
+        totals = dict.fromkeys(NUTRIENTS, 0.0)
+        days = set()
+        for log in logs:
+            days.add(log.log_date)
+            for nutrient in NUTRIENTS:
+                totals[nutrient] += getattr(log, nutrient, 0) or 0
+        return {nutrient: total / max(len(days), 1) for nutrient, total in totals.items()}
+
+
+def columnar_average(engine, user_id: uuid.UUID) -> dict[str, float]:
+    with Session(engine) as session:
+        history = FoodHistory.load(session, user_id, nutrients=NUTRIENTS)
+    _, days_logged, totals = history.grouped(NUTRIENTS)
+    return dict(zip(NUTRIENTS, totals.sum(axis=0) / max(len(days_logged), 1)))
+
+
+def measure(run: Callable[[], object], repeats: int) -> dict:
+    """Best wall time of `repeats` runs and the peak memory traced during one more"""
+    seconds = []
+    for _ in range(repeats):
+        gc.collect()
+        started_at = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - started_at)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"best_seconds": round(min(seconds), 4), "peak_bytes": peak}
+
+
+def run(rows: int = 100_000, repeats: int = 3, database_url: Optional[str] = None, seed_value: int = 0) -> dict:
+    if database_url is None:
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(database_url)
+    SQLModel.metadata.create_all(engine)
+    user_id = seed(engine, rows, seed_value)
+
+    orm, columnar = orm_average(engine, user_id), columnar_average(engine, user_id)
+    assert np.allclose([orm[nutrient] for nutrient in NUTRIENTS], [columnar[nutrient] for nutrient in NUTRIENTS])
+
+    with Session(engine) as session:
+        column_bytes = FoodHistory.load(session, user_id, nutrients=NUTRIENTS).nbytes
+    results = {
+        "rows": rows,
+        "dialect": engine.dialect.name,
+        "orm": measure(lambda: orm_average(engine, user_id), repeats),
+        "columnar": {**measure(lambda: columnar_average(engine, user_id), repeats), "column_bytes": column_bytes},
+    }
+    results["speedup"] = round(results["orm"]["best_seconds"] / results["columnar"]["best_seconds"], 2)
+    results["memory_ratio"] = round(results["orm"]["peak_bytes"] / results["columnar"]["peak_bytes"], 2)
+    engine.dispose()
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ORM and columnar food history summaries.")
+    parser.add_argument("--rows", type=int, default=100_000, help="food logs in the seeded history")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per path, the best one is reported")
+    parser.add_argument("--database-url", default=None, help="scratch database to seed (default: in-memory SQLite)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    output = json.dumps(run(args.rows, args.repeats, args.database_url, args.seed), indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        args.output.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Latency of `/foods/search` lookups on a large synthetic food catalog.
+
+    python -m benchmarks.food_search --items 300000 --output results.json
+
+Seeds the catalog in an in-memory SQLite database with names combined from common food
+words ("smoked turkey wrap with spinach 312"), loads a FoodSearchIndex from it, then times
+prefix, multi-word and misspelled queries, reporting p50/p99 per kind and the load time.
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session
+
+from models.food_item import FoodItem
+from models.user_details import UserDetails  # noqa: F401, mapped by User's relationships
+from service.food_search import FoodSearchIndex
+from src.models.user import User  # noqa: F401, mapped by FoodLog's relationships
+
+STYLES = ["grilled", "roasted", "smoked", "fried", "steamed", "baked", "raw", "spicy", "sweet", "creamy",
+          "organic", "frozen", "canned", "dried", "fresh", "low fat", "whole grain", "homemade"]
+FOODS = ["chicken", "turkey", "salmon", "tuna", "beef", "pork", "tofu", "tempeh", "lentil", "chickpea",
+         "rice", "quinoa", "oat", "barley", "potato", "spinach", "broccoli", "carrot", "tomato", "mushroom",
+         "apple", "banana", "mango", "strawberry", "yogurt", "cheese", "almond", "walnut", "peanut", "egg"]
+DISHES = ["salad", "soup", "wrap", "sandwich", "curry", "stew", "bowl", "pie", "burger", "pasta", "smoothie",
+          "bar", "cake", "muffin", "omelette", "stir fry"]
+
+PREFIX_QUERIES = ["c", "ch", "chi", "chick", "chicken", "smo", "smoked tu", "str", "gr", "yogu"]
+MULTI_WORD_QUERIES = ["chicken sal", "tofu cur", "salmon bowl 1", "sweet pot", "egg omel", "bean bur"]
+FUZZY_QUERIES = ["chiken", "brocoli", "stawberry", "omlette", "quinao", "yoghurt"]
+
+
+def catalog_names(items: int, seed: int = 0) -> list[str]:
+    rnd = random.Random(seed)
+    return [f"{rnd.choice(STYLES)} {rnd.choice(FOODS)} {rnd.choice(DISHES)}"
+            f"{' with ' + rnd.choice(FOODS) if rnd.random() < 0.3 else ''} {index}".capitalize()
+            for index in range(items)]
+
+
+def seed(engine, items: int, seed_value: int = 0) -> None:
+    now = datetime.now(timezone.utc)
+    names = catalog_names(items, seed_value)
+    with Session(engine) as session:
+        for offset in range(0, items, 10_000):
+            session.execute(insert(FoodItem), [
+                {"id": uuid.uuid4(), "name": name, "calories": 100, "is_active": True, "updated_at": now}
+                for name in names[offset:offset + 10_000]
+            ])
+        session.commit()
+
+
+def latency(index: FoodSearchIndex, session: Session, queries: list[str], repeats: int) -> dict:
+    timings = []
+    for _ in range(repeats):
+        for query in queries:
+            started_at = time.perf_counter()
+            index.search(session, query)
+            timings.append(time.perf_counter() - started_at)
+    timings = np.array(timings) * 1000
+    return {"queries": len(timings), "p50_ms": round(float(np.percentile(timings, 50)), 4),
+            "p99_ms": round(float(np.percentile(timings, 99)), 4)}
+
+
+def run(items: int = 300_000, repeats: int = 50, seed_value: int = 0) -> dict:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    FoodItem.__table__.create(engine)
+    seed(engine, items, seed_value)
+
+    # no refresh while timing, lookups only
+    index = FoodSearchIndex(refresh_interval=float("inf"))
+    with Session(engine) as session:
+        started_at = time.perf_counter()
+        index.load(session)
+        load_seconds = time.perf_counter() - started_at
+        results = {
+            "items": items,
+            "load_seconds": round(load_seconds, 3),
+            "prefix": latency(index, session, PREFIX_QUERIES, repeats),
+            "multi_word": latency(index, session, MULTI_WORD_QUERIES, repeats),
+            "fuzzy": latency(index, session, FUZZY_QUERIES, repeats),
+        }
+    engine.dispose()
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark food search lookups.")
+    parser.add_argument("--items", type=int, default=300_000, help="food items in the seeded catalog")
+    parser.add_argument("--repeats", type=int, default=50, help="times every query is timed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    output = json.dumps(run(args.items, args.repeats, args.seed), indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        args.output.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
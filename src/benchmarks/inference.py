@@ -0,0 +1,217 @@
+"""
+Latency and throughput benchmarks for the diet prediction engine.
+
+    python -m benchmarks.inference --output results.json
+
+Measures single-call latency percentiles of `DietPredictor.predict`, the pandas
+pipeline path, `_preprocess_input` and `_get_bmi_class`; `predict_frame` throughput
+at several batch sizes; cold-load time of the joblib artifact; and peak traced memory
+of each. Results are written as JSON so runs on two commits can be diffed, and
+`--baseline earlier.json` reports the change of every metric against an earlier run.
+"""
+import argparse
+import gc
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+from benchmarks.synthetic import user_details
+from config.config import CATEGORICAL_FEATURES, MIN_FOOD_LOGS, NUMERIC_FEATURES
+from prediction_engine import DietPredictor, _enum_value
+from service.model_registry import ModelRegistry
+from service.prediction_cache import prediction_cache
+
+DEFAULT_BATCH_SIZES = (1, 16, 256, 4096)
+
+
+def _percentiles(samples_ms: Sequence[float]) -> dict:
+    samples = np.asarray(samples_ms)
+    return {
+        "calls": int(samples.size),
+        "mean_ms": round(float(samples.mean()), 4),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+        "max_ms": round(float(samples.max()), 4),
+    }
+
+
+def _peak_bytes(run: Callable[[], object]) -> int:
+    """Peak memory traced by Python allocators (numpy included) while `run` executes"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_latency(call: Callable[[object], object], inputs: Sequence, warmup: int) -> dict:
+    """Time `call` once per input, after `warmup` untimed calls"""
+    for item in inputs[:warmup]:
+        call(item)
+    samples = []
+    for item in inputs:
+        started_at = time.perf_counter()
+        call(item)
+        samples.append((time.perf_counter() - started_at) * 1000)
+    result = _percentiles(samples)
+    result["peak_bytes"] = _peak_bytes(lambda: call(inputs[0]))
+    return result
+
+
+def bench_latencies(predictor: DietPredictor, users: Sequence, warmup: int) -> dict:
+    records = [predictor._dataframe_record(user, predictor._get_bmi_class(user.bmi)).iloc[0].to_dict()
+               for user in users]
+    bmis = [user.bmi for user in users]
+
+    def predict(user):
+        # every user has distinct inputs, clearing keeps the feature cache from answering
+        prediction_cache.clear()
+        return predictor.predict(user, food_log_count=MIN_FOOD_LOGS)
+
+    return {
+        "predict": bench_latency(predict, users, warmup),
+        "predict_dataframe": bench_latency(
+            lambda user: predictor._predict_dataframe(user, predictor._get_bmi_class(user.bmi)), users, warmup),
+        "preprocess_input": bench_latency(predictor._preprocess_input, records, warmup),
+        "get_bmi_class": bench_latency(predictor._get_bmi_class, bmis, warmup),
+    }
+
+
+def _frame(users: Sequence) -> pd.DataFrame:
+    columns = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+    return pd.DataFrame.from_records(
+        [[_enum_value(getattr(user, column)) for column in columns] for user in users], columns=columns)
+
+
+def bench_throughput(predictor: DietPredictor, users: Sequence, batch_sizes: Sequence[int],
+                     min_seconds: float) -> dict:
+    """Rows per second of `predict_frame`, repeating each batch size for at least `min_seconds`"""
+    results = {}
+    for batch_size in batch_sizes:
+        frame = _frame([users[i % len(users)] for i in range(batch_size)])
+        counts = np.full(batch_size, MIN_FOOD_LOGS)
+        predictor.predict_frame(frame, counts)
+        calls, started_at = 0, time.perf_counter()
+        while True:
+            predictor.predict_frame(frame, counts)
+            calls += 1
+            elapsed = time.perf_counter() - started_at
+            if elapsed >= min_seconds:
+                break
+        results[str(batch_size)] = {
+            "calls": calls,
+            "ms_per_batch": round(elapsed / calls * 1000, 4),
+            "rows_per_second": round(batch_size * calls / elapsed, 1),
+            "peak_bytes": _peak_bytes(lambda: predictor.predict_frame(frame, counts)),
+        }
+    return results
+
+
+def bench_cold_load(model_file: Path, repeats: int) -> dict:
+    """Time to load the artifact into a fresh registry, with and without memory mapping"""
+    results = {"artifact_bytes": model_file.stat().st_size}
+    for label, mmap_mode in (("mmap", "r"), ("no_mmap", None)):
+        samples = []
+        for _ in range(repeats):
+            registry = ModelRegistry(model_file.parent, model_file.name, mmap_mode=mmap_mode)
+            started_at = time.perf_counter()
+            registry.current()
+            samples.append((time.perf_counter() - started_at) * 1000)
+            del registry
+        result = _percentiles(samples)
+        result["peak_bytes"] = _peak_bytes(lambda: joblib.load(model_file, mmap_mode=mmap_mode))
+        results[label] = result
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(iterations: int = 1000, warmup: int = 50, batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+        min_seconds: float = 1.0, load_repeats: int = 5, seed: int = 0) -> dict:
+    predictor = DietPredictor()
+    users = user_details(iterations, seed)
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sklearn": sklearn.__version__,
+            "platform": platform.platform(),
+            "model_version": predictor.model_version,
+            "encoder": predictor.encoder is not None,
+            "iterations": iterations,
+            "seed": seed,
+        },
+        "cold_load": bench_cold_load(predictor.registry.current().path, load_repeats),
+        "latency": bench_latencies(predictor, users, warmup),
+        "throughput": bench_throughput(predictor, users, batch_sizes, min_seconds),
+    }
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results["meta"]["max_rss_bytes"] = max_rss if sys.platform == "darwin" else max_rss * 1024
+    return results
+
+
+def compare(baseline: dict, current: dict) -> dict:
+    """Relative change of every timing and throughput metric present in both runs"""
+    changes = {}
+    for section in ("cold_load", "latency", "throughput"):
+        for name, metrics in current.get(section, {}).items():
+            before = baseline.get(section, {}).get(name)
+            if not isinstance(metrics, dict) or not isinstance(before, dict):
+                continue
+            for metric in ("p50_ms", "p99_ms", "ms_per_batch", "rows_per_second"):
+                if metric in metrics and before.get(metric):
+                    changes[f"{section}.{name}.{metric}"] = round(metrics[metric] / before[metric] - 1, 4)
+    return changes
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark diet prediction latency and throughput.")
+    parser.add_argument("--iterations", type=int, default=1000, help="timed single calls per function")
+    parser.add_argument("--warmup", type=int, default=50, help="untimed calls before timing")
+    parser.add_argument("--batch-sizes", type=lambda value: [int(size) for size in value.split(",")],
+                        default=list(DEFAULT_BATCH_SIZES), help="comma separated (default: 1,16,256,4096)")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="minimum time spent per batch size")
+    parser.add_argument("--load-repeats", type=int, default=5, help="cold loads timed per mmap mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="write JSON here instead of stdout")
+    parser.add_argument("--baseline", type=Path, default=None,
+                        help="results of an earlier run, adds a `changes` section relative to it")
+    args = parser.parse_args(argv)
+
+    results = run(args.iterations, args.warmup, args.batch_sizes, args.min_seconds, args.load_repeats, args.seed)
+    if args.baseline is not None:
+        results["changes"] = compare(json.loads(args.baseline.read_text()), results)
+    output = json.dumps(results, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        args.output.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
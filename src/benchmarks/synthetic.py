@@ -0,0 +1,59 @@
+"""Synthetic user details for benchmarks, covering every member of every enum field"""
+import random
+import uuid
+from enum import Enum
+from typing import Iterator
+
+# registers User, which the UserDetails relationship resolves by name
+from src.models.user import User  # noqa: F401
+from models.user_details import (
+    AlcoholConsumption, Allergy, ChronicDisease, DietaryHabit, FoodAversion, Gender, GeneticRiskFactor,
+    PreferredCuisine, SmokingHabit, UserDetails,
+)
+
+ENUM_FIELDS: dict[str, type[Enum]] = {
+    "gender": Gender,
+    "chronic_disease": ChronicDisease,
+    "genetic_risk_factor": GeneticRiskFactor,
+    "allergies": Allergy,
+    "alcohol_consumption": AlcoholConsumption,
+    "smoking_habit": SmokingHabit,
+    "dietary_habits": DietaryHabit,
+    "preferred_cuisine": PreferredCuisine,
+    "food_aversions": FoodAversion,
+}
+
+
+def iter_user_details(count: int, seed: int = 0) -> Iterator[UserDetails]:
+    """
+    Yield `count` random users. Enum fields cycle through their members with a random
+    offset per field, so any `count` of at least the largest enum size covers every member.
+    """
+    rnd = random.Random(seed)
+    offsets = {field: rnd.randrange(len(enum)) for field, enum in ENUM_FIELDS.items()}
+    for index in range(count):
+        height_cm, weight_kg = rnd.uniform(150, 200), rnd.uniform(40, 140)
+        yield UserDetails(
+            id=uuid.UUID(int=rnd.getrandbits(128)),
+            user_id=uuid.UUID(int=rnd.getrandbits(128)),
+            age=rnd.randint(18, 80),
+            height_cm=height_cm,
+            weight_kg=weight_kg,
+            bmi=round(weight_kg / ((height_cm / 100) ** 2), 1),
+            cholesterol_level=rnd.uniform(150, 300),
+            blood_sugar_level=rnd.uniform(70, 250),
+            blood_pressure_systolic=rnd.randint(90, 180),
+            blood_pressure_diastolic=rnd.randint(60, 120),
+            calorie_intake=rnd.uniform(1200, 3500),
+            protein_intake=rnd.uniform(40, 200),
+            fat_intake=rnd.uniform(20, 150),
+            carbohydrate_intake=rnd.uniform(100, 400),
+            daily_steps=rnd.randint(1000, 15000),
+            exercise_frequency=rnd.randint(0, 7),
+            sleep_hours=rnd.uniform(4, 10),
+            **{field: list(enum)[(index + offsets[field]) % len(enum)] for field, enum in ENUM_FIELDS.items()},
+        )
+
+
+def user_details(count: int, seed: int = 0) -> list[UserDetails]:
+    return list(iter_user_details(count, seed))
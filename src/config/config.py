@@ -2,7 +2,87 @@ NUMERIC_FEATURES = ['height_cm', 'weight_kg', 'cholesterol_level', 'blood_sugar_
                     'exercise_frequency', 'sleep_hours', 'calorie_intake', 'protein_intake',
                     'carbohydrate_intake', 'fat_intake']
 
+CATEGORICAL_FEATURES = ['gender', 'chronic_disease', 'genetic_risk_factor', 'allergies', 'dietary_habits',
+                        'preferred_cuisine', 'food_aversions', 'smoking_habit', 'alcohol_consumption', 'bmi']
+
 
 # Features
 
-BMI = 'bmi'
\ No newline at end of file
+BMI = 'bmi'
+
+# Nutrition
+
+# recommended daily intake per nutrient
+RECOMMENDED_VALUES = {
+    "calories": 2000,
+    "protein": 50,
+    "fat": 70,
+    "carbs": 300,
+    "fiber": 30,
+    "sugar": 50,
+    "sodium": 2300,
+    "potassium": 4700,
+    "iron": 18,
+    "calcium": 1000,
+    "vitamin_a": 3000,
+    "vitamin_c": 90
+}
+
+# days of logs, ending at the latest one, averaged into the daily intake
+NUTRITION_WINDOW_DAYS = 7
+
+# a nutrient is deficient when the daily intake is below this share of its recommended value
+DEFICIENCY_THRESHOLD = 0.7
+
+# nutrients whose recommended value is a daily maximum: eating more is reported, eating less never is
+UPPER_LIMIT_NUTRIENTS = ("sugar", "sodium")
+
+# windows a nutrition summary may request at once
+MAX_SUMMARY_WINDOWS = 6
+
+# trend charts: days shown without a start date, and points returned at most, wider ranges use coarser buckets
+TRENDS_DEFAULT_DAYS = 90
+TRENDS_MAX_POINTS = 400
+
+# Prediction
+
+# users with fewer food logs than this get the BMI based fallback diet
+MIN_FOOD_LOGS = 21
+
+# rows scored per pipeline.predict call in batch predictions
+PREDICTION_CHUNK_SIZE = 10_000
+
+# Listing
+
+# above this many rows, as estimated by the planner, totals are reported as estimates
+EXACT_COUNT_LIMIT = 10_000
+
+# rows fetched from the server-side cursor and encoded per chunk of an export
+EXPORT_CHUNK_SIZE = 5_000
+
+# Import
+
+# CSV rows validated and written per transaction
+IMPORT_CHUNK_SIZE = 5_000
+
+# rejected rows reported per import job, the others are only counted
+IMPORT_MAX_ERRORS = 100
+
+# finished import jobs whose progress stays queryable
+IMPORT_JOBS_KEPT = 1_000
+
+# Food catalog
+
+# seconds between checks of the catalog for items changed since the search index was loaded
+FOOD_INDEX_REFRESH_SECONDS = 60
+
+# interned food name ids kept in memory per database, other names cost a lookup on their next log
+FOOD_NAME_CACHE_SIZE = 100_000
+
+# Food log partitions
+
+# months of foodlog partitions jobs.food_log_partitions creates ahead of the current one
+FOODLOG_PARTITION_MONTHS_AHEAD = 3
+
+# schema the partitions detached by jobs.food_log_partitions --keep-months are moved to
+FOODLOG_ARCHIVE_SCHEMA = "archive"
@@ -58,6 +58,28 @@ class Configs(BaseSettings):
     FIRST_SUPERUSER: EmailStr | None = None
     FIRST_SUPERUSER_PASSWORD: str | None = None
 
+    # Diet model, versions published under the model directory are picked up on this interval
+    MODEL_MMAP_MODE: str | None = "r"
+    MODEL_RELOAD_INTERVAL_SECONDS: float = 30
+
+    # Precomputed predictions from jobs.predict_all are served while younger than this
+    PREDICTION_MAX_AGE_HOURS: int = 24
+
+    # Prediction cache
+    PREDICTION_CACHE_SIZE: int = 10_000
+    PREDICTION_CACHE_TTL_SECONDS: int = 60 * 15
+
+    # Micro-batching of concurrent predictions, a window of 0 runs every prediction on its own
+    INFERENCE_BATCH_WINDOW_MS: float = 0
+    INFERENCE_MAX_BATCH_SIZE: int = 64
+
+    # Largest number of items accepted by POST /food-log/bulk
+    FOOD_LOG_BULK_MAX_ITEMS: int = 5_000
+
+    # Inference worker processes for /predict/diet, 0 keeps inference in the API process
+    INFERENCE_WORKERS: int = 0
+    INFERENCE_MAX_PENDING: int = 256
+
 
 class TestConfigs(Configs):
     model_config = SettingsConfigDict(
@@ -0,0 +1,41 @@
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Date, Table, cast, func, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session
+
+BUCKETS = ("day", "week", "month")
+
+
+def naive_utc(moment: Optional[datetime] = None) -> datetime:
+    """
+    `moment`, now by default, in UTC without tzinfo. Naive DateTime columns are written with
+    these, as Postgres would convert aware values to the server's time zone.
+    """
+    return (moment or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def dialect_insert(session: Session, table: Table):
+    """INSERT construct for the session's dialect, so ON CONFLICT upserts work on Postgres and SQLite"""
+    if session.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
+def date_bucket(session: Session, column, bucket: str):
+    """First day of the day, ISO week (Monday) or month holding `column`, date_trunc on Postgres"""
+    if bucket == "day":
+        return column
+    if session.get_bind().dialect.name == "sqlite":
+        if bucket == "week":
+            return func.date(column, "-6 days", "weekday 1")
+        return func.date(column, "start of month")
+    return cast(func.date_trunc(bucket, column), Date)
+
+
+def epoch_days(session: Session, column):
+    """Days between 1970-01-01 and a date column as a number, so rows load straight into float arrays"""
+    if session.get_bind().dialect.name == "sqlite":
+        return func.julianday(column) - 2440587.5
+    return column - literal(date(1970, 1, 1))
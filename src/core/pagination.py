@@ -0,0 +1,93 @@
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import ColumnElement, Select, func, text, tuple_
+from sqlmodel import Session, select
+
+from config.config import EXACT_COUNT_LIMIT
+
+_DECODERS = {
+    date: date.fromisoformat,
+    datetime: datetime.fromisoformat,
+    uuid.UUID: uuid.UUID,
+}
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that was not produced by `encode_cursor` for the same ordering"""
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key of the last row of a page"""
+    raw = json.dumps([_encode(value) for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: Sequence[ColumnElement]) -> tuple:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(order_by):
+            raise InvalidCursor(cursor)
+        return tuple(_DECODERS.get(column.type.python_type, lambda value: value)(value)
+                     for column, value in zip(order_by, values))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def paginate(
+        session: Session,
+        statement: Select,
+        order_by: Sequence[ColumnElement],
+        *,
+        limit: int,
+        cursor: Optional[str] = None,
+        skip: int = 0
+) -> tuple[list, Optional[str]]:
+    """
+    One page of `statement` in `order_by` order, which must be unique (end with the primary key),
+    and the cursor of the next page, None on the last one.
+
+    With a cursor the page starts right after the row it encodes, an index range scan whatever
+    the depth. `skip` is kept for clients paging by offset and is ignored when a cursor is given.
+    A `limit` below 1 gives an empty last page.
+    """
+    if limit <= 0:
+        return [], None
+    statement = statement.order_by(*order_by)
+    if cursor is not None:
+        statement = statement.where(tuple_(*order_by) > tuple_(*decode_cursor(cursor, order_by)))
+    elif skip:
+        statement = statement.offset(skip)
+    rows = session.exec(statement.limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return list(rows), None
+    rows = rows[:limit]
+    last = rows[-1]
+    return list(rows), encode_cursor([getattr(last, column.key) for column in order_by])
+
+
+def count_rows(session: Session, statement: Select) -> tuple[int, bool]:
+    """
+    Number of rows `statement` returns and whether it is an estimate.
+    On Postgres the planner's estimate is used when it is above `EXACT_COUNT_LIMIT`,
+    an exact COUNT(*) otherwise.
+    """
+    statement = statement.order_by(None)
+    if session.get_bind().dialect.name == "postgresql":
+        compiled = statement.compile(dialect=session.get_bind().dialect, compile_kwargs={"literal_binds": True})
+        plan = session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate > EXACT_COUNT_LIMIT:
+            return estimate, True
+    return session.exec(select(func.count()).select_from(statement.subquery())).one(), False
@@ -0,0 +1,157 @@
+"""
+Monthly range partitions of Postgres tables partitioned on a date column, foodlog on log_date.
+
+Every partition holds one calendar month and is named after it (foodlog_p2025_06); rows of
+months without one land in the DEFAULT partition (foodlog_default), and are moved to their
+month's partition when it is created. On other databases, and on tables that are not
+partitioned, the functions below do nothing.
+"""
+import re
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Connection, text
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after (or before, when negative) the one holding `month`"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """The month a partition named by partition_name holds, None for other names (the DEFAULT one)"""
+    match = re.fullmatch(rf"{re.escape(table)}_p(\d{{4}})_(\d{{2}})", name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def expired_months(months, keep_months: int, today: date) -> list[date]:
+    """Months older than the current one and the `keep_months` before it, oldest first"""
+    cutoff = add_months(month_start(today), -keep_months)
+    return sorted(month for month in months if month < cutoff)
+
+
+def is_partitioned(connection: Connection, table: str) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(text(
+        "SELECT EXISTS (SELECT FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+    ), {"table": table}).scalar()
+
+
+def list_partitions(connection: Connection, table: str) -> dict[date, str]:
+    """Monthly partitions attached to `table` by the month they hold"""
+    names = connection.execute(text(
+        "SELECT child.relname FROM pg_inherits JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(:table)"
+    ), {"table": table}).scalars()
+    return {month: name for name in names if (month := partition_month(table, name)) is not None}
+
+
+def _lock(connection: Connection, table: str) -> None:
+    """Serializes partition changes of `table` until the transaction ends, app instances start together"""
+    connection.execute(text("SELECT pg_advisory_xact_lock(hashtext(:table))"), {"table": f"partitions:{table}"})
+
+
+def _exists(connection: Connection, name: str) -> bool:
+    return connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None
+
+
+def _default_months(connection: Connection, table: str, column: str, before: Optional[date] = None) -> list[date]:
+    """Months of the rows in the DEFAULT partition, those before `before` only when given"""
+    if not _exists(connection, default_partition_name(table)):
+        return []
+    where = f" WHERE {column} < :before" if before is not None else ""
+    return list(connection.execute(text(
+        f"SELECT DISTINCT CAST(date_trunc('month', {column}) AS date) FROM {default_partition_name(table)}{where}"
+    ), {"before": before}).scalars())
+
+
+def create_partition(connection: Connection, table: str, column: str, month: date) -> str:
+    """
+    Attach the partition of `month`, moving its rows out of the DEFAULT partition first.
+
+    The partition is created detached with a CHECK constraint matching its bounds, so
+    attaching it validates the bounds without scanning it. Moving the rows out of the DEFAULT
+    partition and attaching the new one lock the DEFAULT partition against writes until the
+    transaction ends, so logs of months without a partition wait until then.
+    """
+    name, lower, upper = partition_name(table, month), month.isoformat(), add_months(month, 1).isoformat()
+    bounds = f"{column} >= '{lower}' AND {column} < '{upper}'"
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    connection.execute(text(f"ALTER TABLE {name} ADD CONSTRAINT {name}_bounds CHECK ({bounds})"))
+    if _exists(connection, default_partition_name(table)):
+        connection.execute(text(
+            f"WITH moved AS (DELETE FROM {default_partition_name(table)} WHERE {bounds} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ))
+    connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+    connection.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_bounds"))
+    return name
+
+
+def ensure_partitions(connection: Connection, table: str, column: str, months_ahead: int,
+                      today: Optional[date] = None) -> list[str]:
+    """
+    Create the partitions of the current month and the `months_ahead` after it, and of every
+    month with rows in the DEFAULT partition. Returns the names of the created partitions.
+    """
+    if not is_partitioned(connection, table):
+        return []
+    _lock(connection, table)
+    current = month_start(today or date.today())
+    wanted = {add_months(current, months) for months in range(months_ahead + 1)}
+    wanted.update(_default_months(connection, table, column))
+    existing = list_partitions(connection, table)
+    return [create_partition(connection, table, column, month) for month in sorted(wanted - existing.keys())]
+
+
+def detach_partitions(connection: Connection, table: str, column: str, keep_months: int, archive_schema: str,
+                      drop: bool = False, today: Optional[date] = None) -> list[str]:
+    """
+    Detach the partitions of the months before the current one and the `keep_months` before
+    it, rows of those months in the DEFAULT partition included. Detached partitions are moved
+    to `archive_schema` without their foreign keys, so they never hold back deleting a user,
+    or dropped with `drop`. Returns the names of the detached partitions.
+    """
+    if not is_partitioned(connection, table):
+        return []
+    _lock(connection, table)
+    today = today or date.today()
+    existing = list_partitions(connection, table)
+    before = add_months(month_start(today), -keep_months)
+    for month in sorted(set(_default_months(connection, table, column, before)) - existing.keys()):
+        existing[month] = create_partition(connection, table, column, month)
+
+    detached = [existing[month] for month in expired_months(existing, keep_months, today)]
+    if detached and not drop:
+        connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+    for name in detached:
+        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if drop:
+            connection.execute(text(f"DROP TABLE {name}"))
+            continue
+        foreign_keys = connection.execute(text(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:name) AND contype = 'f'"
+        ), {"name": name}).scalars().all()
+        for foreign_key in foreign_keys:
+            connection.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT "{foreign_key}"'))
+        if _exists(connection, f"{archive_schema}.{name}"):
+            # the month was archived before and logged again since
+            connection.execute(text(f"INSERT INTO {archive_schema}.{name} SELECT * FROM {name}"))
+            connection.execute(text(f"DROP TABLE {name}"))
+        else:
+            connection.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+    return detached
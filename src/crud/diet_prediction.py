@@ -0,0 +1,66 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import ColumnElement, exists, func
+from sqlmodel import Session, select
+
+from core.db_utils import dialect_insert, naive_utc
+from models.diet_prediction import DietPrediction
+from models.user_details import UserDetails
+from models.user_features import UserFeatures
+
+
+def _is_fresh(model_version: str) -> ColumnElement[bool]:
+    # a prediction goes stale with a new model or any change to the user's logs or details
+    return (DietPrediction.model_version == model_version) & (
+        DietPrediction.predicted_at >= func.coalesce(UserFeatures.updated_at, DietPrediction.predicted_at)
+    )
+
+
+def save_predictions(*, session: Session, predictions: dict[uuid.UUID, str], model_version: str,
+                     predicted_at: datetime) -> None:
+    """
+    Upsert the latest prediction of each user and commit. `predicted_at` is when the inputs
+    were read, so a change committed while they were being scored leaves the prediction stale.
+    It is stored as naive UTC, like UserFeatures.updated_at it is compared with.
+    """
+    if not predictions:
+        return
+    predicted_at = naive_utc(predicted_at)
+    table = DietPrediction.__table__
+    statement = dialect_insert(session, table).values([
+        {"user_id": user_id, "recommendation": str(recommendation), "model_version": model_version,
+         "predicted_at": predicted_at}
+        for user_id, recommendation in predictions.items()
+    ])
+    session.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={column: statement.excluded[column] for column in ("recommendation", "model_version", "predicted_at")},
+    ))
+    session.commit()
+
+
+def get_fresh_prediction(
+        *, session: Session, user_id: uuid.UUID, model_version: str, max_age: timedelta
+) -> Optional[str]:
+    """The stored prediction of a user, or None when it is missing, stale or older than `max_age`"""
+    statement = (
+        select(DietPrediction.recommendation, DietPrediction.predicted_at)
+        .outerjoin(UserFeatures, UserFeatures.user_id == DietPrediction.user_id)
+        .where(DietPrediction.user_id == user_id, _is_fresh(model_version))
+    )
+    row = session.exec(statement).first()
+    if row is None:
+        return None
+    if naive_utc() - row.predicted_at > max_age:
+        return None
+    return row.recommendation
+
+
+def without_fresh_prediction(model_version: str) -> ColumnElement[bool]:
+    """Filter for `iter_user_details_with_log_counts` keeping users that need a new prediction"""
+    return ~exists().where(
+        DietPrediction.user_id == UserDetails.user_id,
+        _is_fresh(model_version),
+    )
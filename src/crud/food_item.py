@@ -0,0 +1,81 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy import Row
+from sqlmodel import Session, select
+
+from core.db_utils import dialect_insert
+from models.food_item import FoodItem, FoodItemBase, FoodItemCreate, FoodItemUpdate, FoodLogFromCatalog
+from models.food_log import FoodLogCreate
+
+# nutrient fields shared by catalog items and food logs, scaled by the servings logged
+ITEM_NUTRIENTS = [name for name in FoodItemBase.model_fields if name not in ("name", "serving_grams")]
+
+# what the search index keeps of every item
+SEARCH_COLUMNS = (FoodItem.id, FoodItem.name, FoodItem.serving_grams, FoodItem.calories, FoodItem.is_active,
+                  FoodItem.updated_at)
+
+
+def create_food_item(*, session: Session, food_item: FoodItemCreate) -> FoodItem:
+    db_obj = FoodItem.model_validate(food_item)
+    session.add(db_obj)
+    session.commit()
+    session.refresh(db_obj)
+    return db_obj
+
+
+def update_food_item(*, session: Session, db_food_item: FoodItem, food_item_in: FoodItemUpdate) -> FoodItem:
+    food_item_data = food_item_in.model_dump(exclude_unset=True)
+    db_food_item.sqlmodel_update(food_item_data, update={"updated_at": datetime.now(timezone.utc)})
+    session.add(db_food_item)
+    session.commit()
+    session.refresh(db_food_item)
+    return db_food_item
+
+
+def upsert_food_items(*, session: Session, food_items: Sequence[FoodItemCreate]) -> int:
+    """Insert catalog items, replacing the nutrients of active items with the same name, and commit"""
+    existing = dict(session.exec(
+        select(FoodItem.name, FoodItem.id).where(FoodItem.name.in_([item.name for item in food_items]),
+                                                 FoodItem.is_active)
+    ).all())
+    now = datetime.now(timezone.utc)
+    rows = [{**item.model_dump(), "id": existing.get(item.name) or uuid.uuid4(), "is_active": True, "updated_at": now}
+            for item in food_items]
+    if not rows:
+        return 0
+    table = FoodItem.__table__
+    statement = dialect_insert(session, table).values(rows)
+    session.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={column: statement.excluded[column] for column in rows[0] if column != "id"},
+    ))
+    session.commit()
+    return len(rows)
+
+
+def iter_search_rows(*, session: Session, updated_since: Optional[datetime] = None,
+                     chunk_size: int = 10_000) -> Iterator[Sequence[Row]]:
+    """Stream (id, name, serving_grams, calories, is_active, updated_at) of every item, or those changed since a time"""
+    statement = select(*SEARCH_COLUMNS)
+    if updated_since is None:
+        statement = statement.where(FoodItem.is_active)
+    else:
+        statement = statement.where(FoodItem.updated_at > updated_since)
+    # a Core result on the session's connection, no ORM row processing for the plain columns
+    result = session.connection().execute(statement.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        if rows:
+            yield rows
+
+
+def food_log_from_item(food_item: FoodItem, request: FoodLogFromCatalog) -> FoodLogCreate:
+    """A food log of `request.servings` servings of a catalog item"""
+    nutrients = {name: getattr(food_item, name) for name in ITEM_NUTRIENTS}
+    return FoodLogCreate(
+        log_date=request.log_date,
+        food=food_item.name,
+        meal_type=request.meal_type,
+        **{name: value * request.servings if value is not None else None for name, value in nutrients.items()},
+    )
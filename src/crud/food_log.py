@@ -1,20 +1,234 @@
 import uuid
+from datetime import date
+from typing import Iterator, Optional, Sequence
 
+from sqlalchemy import CTE, Insert, Row, TypeDecorator, Update, func, insert, select, update
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import Session
 
-from crud.user_details import update_user_nutrition_summary
-from models.food_log import FoodLogCreate, FoodLog
+from config.config import EXPORT_CHUNK_SIZE
+
+from crud.food_log_daily import daily_delta_statement, daily_deltas_statement, food_log_values
+from crud.food_name import food_name_ids
+from crud.user_details import INTAKE_TOTALS, update_user_nutrition_summary
+from crud.user_features import NUTRIENTS, apply_food_log_delta, food_log_delta_statement, food_log_totals
+from models.food_log import FoodCount, FoodLogCreate, FoodLog, FoodLogUpdate
+from models.food_log_daily import FOOD_LOG_NUTRIENTS
+from models.food_name import FoodName
+from models.user_details import UserDetails
+from models.user_features import UserFeatures
+from models.message import Message
+
+# a food log as the API shows it, with its food name
+FOOD_LOG_COLUMNS = [FoodLog.id, FoodLog.user_id, FoodLog.log_date, FoodName.name.label("food"), FoodLog.meal_type,
+                    *(getattr(FoodLog, nutrient) for nutrient in FOOD_LOG_NUTRIENTS)]
+
+
+def iter_food_logs(
+        *,
+        session: Session,
+        user_id: Optional[uuid.UUID] = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[Sequence[Row]]:
+    """
+    Stream the food logs of a user, or of every user when `user_id` is None, `chunk_size`
+    rows at a time in (user_id, log_date, id) order. Rows are plain tuples read through a
+    server-side cursor, so memory stays flat however many logs there are.
+    """
+    statement = (
+        select(*FOOD_LOG_COLUMNS)
+        .join(FoodName, FoodName.id == FoodLog.food_id)
+        .order_by(FoodLog.user_id, FoodLog.log_date, FoodLog.id)
+    )
+    if user_id is not None:
+        statement = statement.where(FoodLog.user_id == user_id)
+
+    result = session.execute(statement.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        if rows:
+            yield rows
 
 
 def create_food_log(*, session: Session, food_log: FoodLogCreate, user_id: uuid.UUID) -> FoodLog:
-    db_obj = FoodLog.model_validate(food_log, update={"user_id": user_id})
+    """
+    Insert a food log and update the user's aggregates in one transaction.
+    Every column value is known up front, the id included, so nothing is read back.
+    """
+    food_id = food_name_ids.get(session, [food_log.food])[food_log.food]
+    db_obj = FoodLog.model_validate(food_log, update={"user_id": user_id, "food_id": food_id})
+    insert_log = insert(FoodLog.__table__).values(db_obj.model_dump())
+    daily = daily_delta_statement(session, user_id, db_obj.log_date, count=1, values=food_log_values(db_obj))
+    delta = food_log_delta_statement(session, user_id, count=1, totals=food_log_totals(db_obj),
+                                     log_date=db_obj.log_date)
+
+    if session.get_bind().dialect.name == "postgresql":
+        # a single statement: the insert and the upserts run as CTEs of the details update
+        session.execute(_copy_totals_to_details(delta, insert_log.cte("log"), daily.cte("daily")))
+    else:
+        session.execute(insert_log)
+        session.execute(daily)
+        session.execute(delta)
+        update_user_nutrition_summary(session, user_id)
+    session.commit()
+    # the row is committed, attach the object as its persistent instance without reading it back
+    make_transient_to_detached(db_obj)
+    set_committed_value(db_obj, "food", food_log.food)
     session.add(db_obj)
+
+    return db_obj
+
+
+def create_food_logs(*, session: Session, food_logs: Sequence[FoodLogCreate], user_id: uuid.UUID) -> list[FoodLog]:
+    """
+    Insert many food logs of a user in one transaction, COPY on Postgres and a multi-row INSERT
+    elsewhere. The daily rollup gets one upsert row per logged day and the user's aggregates
+    a single delta, however many logs there are.
+    """
+    if not food_logs:
+        return []
+    food_ids = food_name_ids.get(session, [food_log.food for food_log in food_logs])
+    db_objs = [FoodLog.model_validate(food_log, update={"user_id": user_id, "food_id": food_ids[food_log.food]})
+               for food_log in food_logs]
+    _insert_food_log_rows(session, [db_obj.model_dump() for db_obj in db_objs], user_id)
+
+    for db_obj, food_log in zip(db_objs, food_logs):
+        make_transient_to_detached(db_obj)
+        set_committed_value(db_obj, "food", food_log.food)
+    session.add_all(db_objs)
+    return db_objs
+
+
+def insert_food_log_rows(*, session: Session, rows: Sequence[dict], user_id: uuid.UUID) -> None:
+    """
+    `create_food_logs` for rows of FoodLogCreate fields plus id and user_id, when no ORM
+    objects are needed back, e.g. imports.
+    """
+    if not rows:
+        return
+    food_ids = food_name_ids.get(session, [row["food"] for row in rows])
+    rows = [{**{key: value for key, value in row.items() if key != "food"}, "food_id": food_ids[row["food"]]}
+            for row in rows]
+    _insert_food_log_rows(session, rows, user_id)
+
+
+def _insert_food_log_rows(session: Session, rows: Sequence[dict], user_id: uuid.UUID) -> None:
+    """Insert rows of foodlog column values, and apply them to the user's rollup and aggregates"""
+    _insert_rows(session, rows)
+
+    days: dict[date, dict] = {}
+    totals = dict.fromkeys(NUTRIENTS, 0.0)
+    for row in rows:
+        day = days.setdefault(row["log_date"], {"user_id": user_id, "log_date": row["log_date"], "log_count": 0})
+        day["log_count"] += 1
+        for nutrient in FOOD_LOG_NUTRIENTS:
+            day[nutrient] = day.get(nutrient, 0) + (row[nutrient] or 0)
+        for nutrient in NUTRIENTS:
+            totals[nutrient] += row[nutrient] or 0
+    session.execute(daily_deltas_statement(session, list(days.values())))
+    session.execute(food_log_delta_statement(session, user_id, count=len(rows), totals=totals,
+                                             log_date=min(days), last_log_date=max(days)))
+    update_user_nutrition_summary(session, user_id)
     session.commit()
-    session.refresh(db_obj)
 
-    # Update summary after insertion
+
+def _insert_rows(session: Session, rows: Sequence[dict]) -> None:
+    table = FoodLog.__table__
+    connection = session.connection()
+    if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg":
+        # COPY through the session's own connection, so it is part of the same transaction
+        columns = list(rows[0])
+        # COPY skips statement parameter processing, encode the meal type as an insert would
+        processors = [table.c[column].type.bind_processor(connection.dialect)
+                      if isinstance(table.c[column].type, TypeDecorator) else None for column in columns]
+        with connection.connection.driver_connection.cursor() as cursor:
+            with cursor.copy(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row([row[column] if processor is None else processor(row[column])
+                                    for column, processor in zip(columns, processors)])
+    else:
+        session.execute(insert(table), rows)
+
+
+def _copy_totals_to_details(delta: Insert, *ctes: CTE) -> Update:
+    """UPDATE of the user's details from the totals returned by the aggregate upsert, all as CTEs"""
+    features = delta.returning(
+        UserFeatures.user_id, *(total for total in INTAKE_TOTALS.values())
+    ).cte("features")
+    return (
+        update(UserDetails)
+        .where(UserDetails.user_id == features.c.user_id)
+        .values({column: features.c[total.key] for column, total in INTAKE_TOTALS.items()})
+        .add_cte(*ctes, features)
+    )
+
+
+def update_food_log(*, session: Session, db_food_log: FoodLog, food_log_in: FoodLogUpdate) -> FoodLog:
+    old_totals = food_log_totals(db_food_log)
+    old_date, old_values = db_food_log.log_date, food_log_values(db_food_log)
+
+    # Update only provided fields
+    update_data = food_log_in.dict(exclude_unset=True)
+    if "food" in update_data:
+        food = update_data.pop("food")
+        update_data["food_id"] = food_name_ids.get(session, [food])[food]
+    for field, value in update_data.items():
+        setattr(db_food_log, field, value)
+
+    session.add(db_food_log)
+    session.flush()
+    new_totals = food_log_totals(db_food_log)
+    new_values = food_log_values(db_food_log)
+    if db_food_log.log_date == old_date:
+        session.execute(daily_delta_statement(
+            session, db_food_log.user_id, old_date, count=0,
+            values={nutrient: new_values[nutrient] - old_values[nutrient] for nutrient in new_values}
+        ))
+    else:
+        # moved to another day
+        session.execute(daily_delta_statement(
+            session, db_food_log.user_id, old_date, count=-1,
+            values={nutrient: -value for nutrient, value in old_values.items()}
+        ))
+        session.execute(daily_delta_statement(
+            session, db_food_log.user_id, db_food_log.log_date, count=1, values=new_values
+        ))
+    apply_food_log_delta(
+        session, db_food_log.user_id, count=0,
+        totals={nutrient: new_totals[nutrient] - old_totals[nutrient] for nutrient in new_totals}
+    )
+    update_user_nutrition_summary(session, db_food_log.user_id)
+    session.commit()
+    session.refresh(db_food_log)
+    return db_food_log
+
+
+def delete_food_log(*, session: Session, db_food_log: FoodLog) -> Message:
+    user_id = db_food_log.user_id
+    session.delete(db_food_log)
+    session.flush()
+    session.execute(daily_delta_statement(session, user_id, db_food_log.log_date, count=-1,
+                                          values=food_log_values(db_food_log, sign=-1)))
+    apply_food_log_delta(session, user_id, count=-1, totals=food_log_totals(db_food_log, sign=-1))
     update_user_nutrition_summary(session, user_id)
+    session.commit()
 
-    return db_obj
+    return Message(message="Food log deleted successfully")
 
 
+def get_top_foods(*, session: Session, user_id: Optional[uuid.UUID], limit: int = 10,
+                  date_from: Optional[date] = None) -> list[FoodCount]:
+    """The most logged foods of a user, or of every user, grouped on the food ids and named afterwards"""
+    statement = select(FoodLog.food_id, func.count().label("log_count"))
+    if user_id is not None:
+        statement = statement.where(FoodLog.user_id == user_id)
+    if date_from is not None:
+        statement = statement.where(FoodLog.log_date >= date_from)
+    counts = statement.group_by(FoodLog.food_id).subquery()
+    rows = session.execute(
+        select(FoodName.name, counts.c.log_count)
+        .join(counts, counts.c.food_id == FoodName.id)
+        .order_by(counts.c.log_count.desc(), FoodName.name)
+        .limit(limit)
+    ).all()
+    return [FoodCount(food=name, log_count=log_count) for name, log_count in rows]
@@ -0,0 +1,170 @@
+import uuid
+from datetime import date, timedelta
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy import Insert, delete, func, insert
+from sqlmodel import Session, select
+
+from core.db_utils import date_bucket, dialect_insert
+from models.food_log import FoodLog
+from models.food_log_daily import FOOD_LOG_NUTRIENTS, FoodLogDaily
+
+
+def food_log_values(food_log: FoodLog, sign: int = 1) -> dict[str, float]:
+    """Every nutrient of a food log as a signed daily rollup delta, missing values count as 0"""
+    return {nutrient: sign * (getattr(food_log, nutrient) or 0) for nutrient in FOOD_LOG_NUTRIENTS}
+
+
+def daily_delta_statement(
+        session: Session,
+        user_id: uuid.UUID,
+        log_date: date,
+        *,
+        count: int,
+        values: dict[str, float]
+) -> Insert:
+    """Upsert adding a signed change to one user's rollup row of a day"""
+    return daily_deltas_statement(session, [{"user_id": user_id, "log_date": log_date, "log_count": count, **values}])
+
+
+def daily_deltas_statement(session: Session, deltas: Sequence[dict]) -> Insert:
+    """
+    Multi-row upsert adding signed changes to rollup rows, each delta holds `user_id`, `log_date`,
+    `log_count` and any nutrients. A (user_id, log_date) pair may appear only once.
+    """
+    table = FoodLogDaily.__table__
+    statement = dialect_insert(session, table).values([
+        {"user_id": delta["user_id"], "log_date": delta["log_date"], "log_count": delta["log_count"],
+         **{nutrient: delta.get(nutrient, 0) for nutrient in FOOD_LOG_NUTRIENTS}}
+        for delta in deltas
+    ])
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.log_date],
+        set_={column: table.c[column] + statement.excluded[column] for column in ["log_count", *FOOD_LOG_NUTRIENTS]},
+    )
+
+
+def get_nutrient_intake(
+        *,
+        session: Session,
+        date_from: date,
+        date_to: date,
+        nutrients: Sequence[str],
+        user_ids: Optional[Sequence[uuid.UUID]] = None
+) -> tuple[list[uuid.UUID], np.ndarray, np.ndarray]:
+    """
+    Nutrient totals and number of logged days per user between two dates, summed from the daily rollup.
+    Returns the user ids, their logged days (n_users,) and totals (n_users, len(nutrients)).
+    """
+    statement = (
+        select(
+            FoodLogDaily.user_id,
+            func.count(),
+            *(func.sum(getattr(FoodLogDaily, nutrient)) for nutrient in nutrients),
+        )
+        .where(FoodLogDaily.log_date >= date_from, FoodLogDaily.log_date <= date_to, FoodLogDaily.log_count > 0)
+        .group_by(FoodLogDaily.user_id)
+    )
+    if user_ids is not None:
+        statement = statement.where(FoodLogDaily.user_id.in_(user_ids))
+    rows = session.exec(statement).all()
+    if not rows:
+        return [], np.zeros(0), np.zeros((0, len(nutrients)))
+    values = np.array([row[1:] for row in rows], dtype=float)
+    return [row[0] for row in rows], values[:, 0], values[:, 1:]
+
+
+def get_windowed_intake(
+        *,
+        session: Session,
+        user_id: uuid.UUID,
+        date_to: date,
+        windows: Sequence[int],
+        nutrients: Sequence[str]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Nutrient totals and number of logged days of one user over several windows of days ending at
+    `date_to`, in one statement: every window is a FILTER on the same scan of the user's rollup rows.
+    Returns the logged days (n_windows,) and totals (n_windows, len(nutrients)).
+    """
+    columns = []
+    for days in windows:
+        in_window = FoodLogDaily.log_date >= date_to - timedelta(days=days - 1)
+        columns.append(func.count().filter(in_window))
+        columns.extend(func.coalesce(func.sum(getattr(FoodLogDaily, nutrient)).filter(in_window), 0)
+                       for nutrient in nutrients)
+    statement = select(*columns).where(
+        FoodLogDaily.user_id == user_id,
+        FoodLogDaily.log_date >= date_to - timedelta(days=max(windows) - 1),
+        FoodLogDaily.log_date <= date_to,
+        FoodLogDaily.log_count > 0,
+    )
+    values = np.array(session.exec(statement).one(), dtype=float).reshape(len(windows), len(nutrients) + 1)
+    return values[:, 0], values[:, 1:]
+
+
+def get_nutrient_trends(
+        *,
+        session: Session,
+        user_id: uuid.UUID,
+        date_from: date,
+        date_to: date,
+        nutrients: Sequence[str],
+        bucket: str = "day"
+) -> tuple[list[date], np.ndarray, np.ndarray]:
+    """
+    Nutrient totals of one user per day, week or month between two dates, grouped in the database
+    from the daily rollup. Returns the first day of every bucket with logs, the days logged in
+    each (n_buckets,) and their totals (n_buckets, len(nutrients)).
+    """
+    start = date_bucket(session, FoodLogDaily.log_date, bucket).label("start")
+    statement = (
+        select(start, func.count(), *(func.sum(getattr(FoodLogDaily, nutrient)) for nutrient in nutrients))
+        .where(
+            FoodLogDaily.user_id == user_id,
+            FoodLogDaily.log_date >= date_from,
+            FoodLogDaily.log_date <= date_to,
+            FoodLogDaily.log_count > 0,
+        )
+        .group_by(start)
+        .order_by(start)
+    )
+    rows = session.exec(statement).all()
+    if not rows:
+        return [], np.zeros(0), np.zeros((0, len(nutrients)))
+    values = np.array([row[1:] for row in rows], dtype=float)
+    dates = [row[0] if isinstance(row[0], date) else date.fromisoformat(row[0]) for row in rows]
+    return dates, values[:, 0], values[:, 1:]
+
+
+def backfill_daily(
+        session: Session,
+        user_ids: Optional[Sequence[uuid.UUID]] = None,
+        since: Optional[date] = None
+) -> int:
+    """
+    Rebuild rollup rows from foodlog with one INSERT ... SELECT, for every user or the given ones,
+    from `since` on or for all dates. Commits and returns the number of rows written.
+    """
+    table = FoodLogDaily.__table__
+    clear = delete(table)
+    logs = select(
+        FoodLog.user_id,
+        FoodLog.log_date,
+        func.count(),
+        *(func.coalesce(func.sum(getattr(FoodLog, nutrient)), 0) for nutrient in FOOD_LOG_NUTRIENTS),
+    ).group_by(FoodLog.user_id, FoodLog.log_date)
+    if user_ids is not None:
+        clear = clear.where(table.c.user_id.in_(user_ids))
+        logs = logs.where(FoodLog.user_id.in_(user_ids))
+    if since is not None:
+        clear = clear.where(table.c.log_date >= since)
+        logs = logs.where(FoodLog.log_date >= since)
+
+    session.execute(clear)
+    result = session.execute(
+        insert(table).from_select(["user_id", "log_date", "log_count", *FOOD_LOG_NUTRIENTS], logs)
+    )
+    session.commit()
+    return result.rowcount
@@ -0,0 +1,53 @@
+import threading
+from collections import OrderedDict
+from typing import Iterable
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Engine, select
+from sqlmodel import Session
+
+from config.config import FOOD_NAME_CACHE_SIZE
+from core.db_utils import dialect_insert
+from models.food_name import FoodName
+
+
+class FoodNameIds:
+    """
+    Ids of interned food names, the most recent `max_size` per database kept in memory.
+
+    New names are inserted and committed in a transaction of their own before any food log
+    refers to them, so a cached id stays valid whether the caller's transaction commits or not.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._caches: WeakKeyDictionary[Engine, OrderedDict[str, int]] = WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, session: Session, names: Iterable[str]) -> dict[str, int]:
+        engine = session.get_bind()
+        ids, missing = {}, []
+        with self._lock:
+            cache = self._caches.setdefault(engine, OrderedDict())
+            for name in set(names):
+                if name in cache:
+                    cache.move_to_end(name)
+                    ids[name] = cache[name]
+                else:
+                    missing.append(name)
+        if not missing:
+            return ids
+
+        table = FoodName.__table__
+        with engine.begin() as connection:
+            connection.execute(dialect_insert(session, table).values([{"name": name} for name in missing])
+                               .on_conflict_do_nothing(index_elements=[table.c.name]))
+            found = dict(connection.execute(select(table.c.name, table.c.id).where(table.c.name.in_(missing))).all())
+        with self._lock:
+            cache.update(found)
+            while len(cache) > self.max_size:
+                cache.popitem(last=False)
+        return ids | found
+
+
+food_name_ids = FoodNameIds(FOOD_NAME_CACHE_SIZE)
@@ -4,6 +4,7 @@ from typing import Any
 from pydantic import EmailStr
 from sqlmodel import Session, func, select
 
+from src.core.pagination import paginate
 from src.core.security import get_password_hash, verify_password
 from src.models.message import Message
 from src.models.user import User, UserCreate, UsersPublic, UserUpdate
@@ -56,11 +57,10 @@ def delete_user(*, session: Session, db_user: User) -> Message:
     return Message(message="User deleted successfully")
 
 
-def get_all_users(*, session: Session, skip: int, limit: int) -> UsersPublic:
+def get_all_users(*, session: Session, skip: int, limit: int, cursor: str | None = None) -> UsersPublic:
     count_statement = select(func.count()).select_from(User)
     count = session.exec(count_statement).one()
 
-    statement = select(User).offset(skip).limit(limit)
-    users = session.exec(statement).all()
+    users, next_cursor = paginate(session, select(User), [User.id], limit=limit, cursor=cursor, skip=skip)
 
-    return UsersPublic(data=users, count=count)
+    return UsersPublic(data=users, count=count, next_cursor=next_cursor)
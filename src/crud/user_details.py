@@ -1,44 +1,74 @@
 import uuid
+from typing import Iterator, Optional, Sequence
 
-from sqlmodel import Session, select
+from sqlalchemy import ColumnElement, Row, exists, update
+from sqlmodel import Session, func, select
 
+from crud.user_features import mark_features_stale
 from models.food_log import FoodLog
 from models.user_details import UserDetailsCreate, UserDetails
+from models.user_features import UserFeatures
 
 
 def create_user_details(*, session: Session, user_details: UserDetailsCreate, user_id: uuid.UUID) -> FoodLog:
     db_obj = UserDetails.model_validate(user_details, update={"user_id": user_id})
     session.add(db_obj)
+    update_user_nutrition_summary(session, user_id)
+    mark_features_stale(session, user_id)
     session.commit()
     session.refresh(db_obj)
     return db_obj
 
 
-def update_user_nutrition_summary(session: Session, user_id: uuid.UUID):
-    # Sum up the nutrition from all food logs of the user
+# UserDetails intake columns holding the food log totals kept in UserFeatures
+INTAKE_TOTALS = {
+    "calorie_intake": UserFeatures.total_calories,
+    "protein_intake": UserFeatures.total_protein,
+    "fat_intake": UserFeatures.total_fat,
+    "carbohydrate_intake": UserFeatures.total_carbs,
+}
+
+
+def update_user_nutrition_summary(session: Session, user_id: uuid.UUID) -> None:
+    """
+    Copy the user's food log totals into their details in the current transaction, the caller commits
+    and marks the user's features stale. The totals are maintained by `apply_food_log_delta`,
+    which must run first, so this is a single UPDATE whatever the size of the user's history.
+    """
+    session.execute(
+        update(UserDetails).where(
+            UserDetails.user_id == user_id,
+            # users who never logged food keep the intake they entered
+            exists().where(UserFeatures.user_id == user_id),
+        ).values({
+            column: func.coalesce(select(total).where(UserFeatures.user_id == user_id).scalar_subquery(), 0)
+            for column, total in INTAKE_TOTALS.items()
+        })
+    )
+
+
+def iter_user_details_with_log_counts(
+        *,
+        session: Session,
+        user_ids: Optional[Sequence[uuid.UUID]] = None,
+        where: Sequence[ColumnElement[bool]] = (),
+        chunk_size: int = 10_000
+) -> Iterator[Sequence[Row]]:
+    """
+    Stream user details joined with each user's food log count, `chunk_size` rows at a time.
+    Rows are plain tuples, not ORM objects, and are read through a server-side cursor,
+    so large cohorts stay cheap to load. `where` adds filters on UserDetails/UserFeatures.
+    """
     statement = select(
-        FoodLog.calories,
-        FoodLog.protein,
-        FoodLog.fat,
-        FoodLog.carbs
-    ).where(FoodLog.user_id == user_id)
-
-    results = session.exec(statement).all()
-
-    total_calories = sum(row.calories for row in results)
-    total_protein = sum(row.protein for row in results)
-    total_fat = sum(row.fat for row in results)
-    total_carbs = sum(row.carbs for row in results)
-
-    # Fetch user details to update
-    user_details = session.exec(select(UserDetails).where(UserDetails.user_id == user_id)).first()
-
-    if user_details:
-        user_details.calorie_intake = total_calories
-        user_details.protein_intake = total_protein
-        user_details.fat_intake = total_fat
-        user_details.carbohydrate_intake = total_carbs
-
-        session.add(user_details)
-        session.commit()
-        session.refresh(user_details)
+        *UserDetails.__table__.columns,
+        func.coalesce(UserFeatures.food_log_count, 0).label("food_log_count")
+    ).outerjoin(UserFeatures, UserFeatures.user_id == UserDetails.user_id)
+    if user_ids is not None:
+        statement = statement.where(UserDetails.user_id.in_(user_ids))
+    for condition in where:
+        statement = statement.where(condition)
+
+    result = session.exec(statement.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        if rows:
+            yield rows
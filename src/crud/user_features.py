@@ -0,0 +1,124 @@
+import uuid
+from datetime import date
+from typing import Optional, Union
+
+import numpy as np
+from sqlalchemy import Insert, Update, case, delete, func, update
+from sqlmodel import Session, select
+
+from config.config import RECOMMENDED_VALUES
+from core.db_utils import dialect_insert, naive_utc
+from models.diet_prediction import DietPrediction
+from models.food_log import FoodLog
+from models.user_features import UserFeatures
+
+NUTRIENTS = list(RECOMMENDED_VALUES)
+
+
+def food_log_totals(food_log: FoodLog, sign: int = 1) -> dict[str, float]:
+    """Nutrient values of a food log as feature store deltas, missing micronutrients count as 0"""
+    return {nutrient: sign * (getattr(food_log, nutrient) or 0) for nutrient in NUTRIENTS}
+
+
+def food_log_delta_statement(
+        session: Session,
+        user_id: uuid.UUID,
+        *,
+        count: int,
+        totals: dict[str, float],
+        log_date: Optional[date] = None,
+        last_log_date: Optional[date] = None
+) -> Union[Insert, Update]:
+    """
+    Statement applying a signed change to a user's food log aggregates:
+    insert +row (count=1), delete -row (count=-1), update new-old (count=0).
+    Inserts of many rows pass their summed totals and their earliest and latest log dates.
+    The intake totals are model inputs, so the encoded ones are cleared as well.
+    Deletes and updates must be flushed first, their log date bounds are re-read from foodlog.
+    """
+    table = UserFeatures.__table__
+    now = naive_utc()
+    set_ = {
+        "food_log_count": table.c.food_log_count + count,
+        **{f"total_{nutrient}": table.c[f"total_{nutrient}"] + totals.get(nutrient, 0) for nutrient in NUTRIENTS},
+        "bmi_class": None,
+        "encoded_features": None,
+        "model_version": None,
+        "updated_at": now,
+    }
+
+    if count <= 0:
+        set_["first_log_date"] = select(func.min(FoodLog.log_date)).where(FoodLog.user_id == user_id).scalar_subquery()
+        set_["last_log_date"] = select(func.max(FoodLog.log_date)).where(FoodLog.user_id == user_id).scalar_subquery()
+        return update(table).where(table.c.user_id == user_id).values(**set_)
+
+    last_log_date = last_log_date or log_date
+    set_["first_log_date"] = case(
+        (table.c.first_log_date.is_(None) | (table.c.first_log_date > log_date), log_date),
+        else_=table.c.first_log_date,
+    )
+    set_["last_log_date"] = case(
+        (table.c.last_log_date.is_(None) | (table.c.last_log_date < last_log_date), last_log_date),
+        else_=table.c.last_log_date,
+    )
+    statement = dialect_insert(session, table).values(
+        user_id=user_id,
+        food_log_count=count,
+        first_log_date=log_date,
+        last_log_date=last_log_date,
+        **{f"total_{nutrient}": totals.get(nutrient, 0) for nutrient in NUTRIENTS},
+        updated_at=now,
+    )
+    return statement.on_conflict_do_update(index_elements=[table.c.user_id], set_=set_)
+
+
+def apply_food_log_delta(
+        session: Session,
+        user_id: uuid.UUID,
+        *,
+        count: int,
+        totals: dict[str, float],
+        log_date: Optional[date] = None
+) -> None:
+    """Run `food_log_delta_statement` in the current transaction"""
+    session.execute(food_log_delta_statement(session, user_id, count=count, totals=totals, log_date=log_date))
+
+
+def get_user_features(*, session: Session, user_id: uuid.UUID) -> Optional[UserFeatures]:
+    return session.get(UserFeatures, user_id)
+
+
+def store_encoded_features(
+        *,
+        session: Session,
+        user_id: uuid.UUID,
+        bmi_class: str,
+        features: Optional[np.ndarray],
+        model_version: str
+) -> None:
+    """Cache the encoded model inputs of a user next to their aggregates"""
+    table = UserFeatures.__table__
+    session.execute(
+        update(table).where(table.c.user_id == user_id).values(
+            bmi_class=bmi_class,
+            encoded_features=None if features is None else features.ravel().tolist(),
+            model_version=model_version,
+        )
+    )
+    session.commit()
+
+
+def mark_features_stale(session: Session, user_id: uuid.UUID) -> None:
+    """
+    Clear the encoded model inputs of a user whose details changed, the caller commits.
+    Bumps `updated_at`, which also marks stored predictions of the user as stale. Users who
+    never logged food have no features row to bump, their stored prediction is deleted.
+    """
+    table = UserFeatures.__table__
+    bumped = session.execute(
+        update(table).where(table.c.user_id == user_id).values(
+            bmi_class=None, encoded_features=None, model_version=None, updated_at=naive_utc()
+        )
+    )
+    if not bumped.rowcount:
+        session.execute(delete(DietPrediction).where(DietPrediction.user_id == user_id))
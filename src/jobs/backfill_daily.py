@@ -0,0 +1,45 @@
+"""
+Rebuild the foodlog_daily rollup from the raw food logs.
+
+    python -m jobs.backfill_daily [--since 2025-01-01] [--user UUID ...]
+
+The rollup is maintained on every food log write; run this after loading logs outside
+the API, or to repair it. Rows in the selected range are replaced in one transaction.
+"""
+import argparse
+import logging
+import uuid
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from crud.food_log_daily import backfill_daily
+
+logger = logging.getLogger(__name__)
+
+
+def run(user_ids: Optional[list[uuid.UUID]] = None, since: Optional[date] = None,
+        engine: Optional[Engine] = None) -> int:
+    if engine is None:
+        from core.db import engine
+
+    with Session(engine) as session:
+        return backfill_daily(session, user_ids=user_ids, since=since)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the per user daily food log rollup.")
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="only rebuild days from this date")
+    parser.add_argument("--user", type=uuid.UUID, action="append", dest="user_ids", default=None,
+                        help="only rebuild this user, may be repeated")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    rows = run(user_ids=args.user_ids, since=args.since)
+    logger.info("%d daily rollup rows written", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Create the upcoming monthly foodlog partitions, and archive the old ones.
+
+    python -m jobs.food_log_partitions [--months-ahead 3] [--keep-months 24 [--drop]]
+
+Run this daily (cron) off-peak, with a role allowed to create tables, so a new month never
+starts without its partition; logs written meanwhile go to the DEFAULT partition and are
+moved out of it on the next run. Creating a partition locks the DEFAULT one against writes
+until its rows are moved, so logs of months without a partition wait for the job.
+
+`--keep-months` detaches the partitions of older months into the archive schema, or drops
+them with `--drop`. Their logs leave every query, while the user aggregates and the
+foodlog_daily rollup keep counting them: do not run jobs.reconcile_nutrition --fix or
+jobs.backfill_daily over archived months afterwards. Does nothing unless foodlog is
+partitioned (Postgres).
+"""
+import argparse
+import logging
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Engine
+
+from config.config import FOODLOG_ARCHIVE_SCHEMA, FOODLOG_PARTITION_MONTHS_AHEAD
+from core.partitions import detach_partitions, ensure_partitions
+from models.food_log import FoodLog
+
+logger = logging.getLogger(__name__)
+
+
+def run(months_ahead: int = FOODLOG_PARTITION_MONTHS_AHEAD, keep_months: Optional[int] = None, drop: bool = False,
+        archive_schema: str = FOODLOG_ARCHIVE_SCHEMA, today: Optional[date] = None,
+        engine: Optional[Engine] = None) -> dict[str, list[str]]:
+    if engine is None:
+        from core.db import engine
+
+    table = FoodLog.__tablename__
+    with engine.begin() as connection:
+        created = ensure_partitions(connection, table, "log_date", months_ahead, today)
+    detached = []
+    if keep_months is not None:
+        with engine.begin() as connection:
+            detached = detach_partitions(connection, table, "log_date", keep_months, archive_schema, drop, today)
+    return {"created": created, "detached": detached}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Create upcoming foodlog partitions and archive old ones.")
+    parser.add_argument("--months-ahead", type=int, default=FOODLOG_PARTITION_MONTHS_AHEAD,
+                        help="months after the current one to create partitions for")
+    parser.add_argument("--keep-months", type=int, default=None,
+                        help="detach the partitions of months before the current one and this many before it")
+    parser.add_argument("--drop", action="store_true", help="drop detached partitions instead of archiving them")
+    parser.add_argument("--archive-schema", default=FOODLOG_ARCHIVE_SCHEMA,
+                        help="schema detached partitions are moved to")
+    args = parser.parse_args(argv)
+    if args.drop and args.keep_months is None:
+        parser.error("--drop requires --keep-months")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    result = run(args.months_ahead, args.keep_months, args.drop, args.archive_schema)
+    logger.info("partitions created: %s", ", ".join(result["created"]) or "none")
+    if args.keep_months is not None:
+        logger.info("partitions %s: %s", "dropped" if args.drop else f"moved to {args.archive_schema}",
+                    ", ".join(result["detached"]) or "none")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Import a CSV export of another food diary as the food logs of one user.
+
+    python -m jobs.import_food_logs --user UUID diary.csv [--column "Energy (kJ)=calories" ...]
+
+Columns are matched to food log fields by name, `--column` maps the others. The file is
+read incrementally and written `--chunk-size` rows per transaction, invalid rows are
+skipped and reported. An interrupted import keeps the chunks already committed.
+"""
+import argparse
+import logging
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from config.config import IMPORT_CHUNK_SIZE
+from models.food_log import FoodLogImportJob
+from service.food_log_import import import_food_logs
+
+logger = logging.getLogger(__name__)
+
+
+def run(path: Path, user_id: uuid.UUID, columns: Optional[dict[str, str]] = None,
+        chunk_size: int = IMPORT_CHUNK_SIZE, engine: Optional[Engine] = None) -> FoodLogImportJob:
+    if engine is None:
+        from core.db import engine
+
+    started_at = time.perf_counter()
+
+    def report(job: FoodLogImportJob) -> None:
+        elapsed = time.perf_counter() - started_at
+        logger.info("%d rows read, %d imported, %d rejected, %.0f rows/s", job.rows_read, job.imported,
+                    job.rejected, job.rows_read / elapsed if elapsed else 0)
+
+    with Session(engine) as session, open(path, newline="", encoding="utf-8-sig") as lines:
+        return import_food_logs(session=session, user_id=user_id, lines=lines, columns=columns,
+                                chunk_size=chunk_size, on_chunk=report)
+
+
+def _column(value: str) -> tuple[str, str]:
+    header, sep, field = value.rpartition("=")
+    if not sep or not header:
+        raise argparse.ArgumentTypeError(f"expected HEADER=FIELD, got {value!r}")
+    return header, field
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Import a food diary CSV file for a user.")
+    parser.add_argument("path", type=Path, help="CSV file with a header row")
+    parser.add_argument("--user", type=uuid.UUID, required=True, dest="user_id", help="user to import the logs for")
+    parser.add_argument("--column", type=_column, action="append", dest="columns", default=[],
+                        help="map a CSV header to a food log field, HEADER=FIELD, may be repeated")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE,
+                        help=f"rows validated and written per transaction (default: {IMPORT_CHUNK_SIZE})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    job = run(args.path, args.user_id, dict(args.columns), args.chunk_size)
+    for error in job.errors:
+        logger.warning("row %d rejected: %s", error.index, error.errors)
+    if job.rejected > len(job.errors):
+        logger.warning("%d more rows rejected", job.rejected - len(job.errors))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Load a food catalog CSV file into the food items searched by `/foods/search`.
+
+    python -m jobs.load_food_catalog [catalog.csv] [--chunk-size 1000]
+
+Defaults to the catalog the recommendations use, with nutrients per 100 g. Columns named
+after food item fields are loaded, the others (cuisine, diets, ...) are ignored. Items are
+matched by name, so reloading a catalog updates the nutrients instead of adding duplicates;
+running servers pick the changes up on their next search index refresh.
+"""
+import argparse
+import csv
+import logging
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from crud.food_item import upsert_food_items
+from models.food_item import FoodItemBase, FoodItemCreate
+from utils.recommendations import CATALOG_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def run(path: Path = CATALOG_PATH, chunk_size: int = 1_000, engine: Optional[Engine] = None) -> int:
+    if engine is None:
+        from core.db import engine
+
+    loaded = 0
+    with Session(engine) as session, open(path, newline="", encoding="utf-8-sig") as catalog:
+        reader = csv.DictReader(catalog)
+        fields = [name for name in reader.fieldnames if name in FoodItemBase.model_fields]
+        chunk = []
+        for row in reader:
+            chunk.append(FoodItemCreate.model_validate({field: row[field] for field in fields if row[field] != ""}))
+            if len(chunk) == chunk_size:
+                loaded += upsert_food_items(session=session, food_items=chunk)
+                chunk = []
+        loaded += upsert_food_items(session=session, food_items=chunk)
+    logger.info("%d food items loaded from %s", loaded, path)
+    return loaded
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load a food catalog CSV file into the food items.")
+    parser.add_argument("path", type=Path, nargs="?", default=CATALOG_PATH, help="CSV file with a name column")
+    parser.add_argument("--chunk-size", type=int, default=1_000, help="items written per transaction")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    run(args.path, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Precompute the diet recommendation of every user with food logs into the dietprediction table.
+
+    python -m jobs.predict_all --shards 4
+
+User details are streamed in chunks through a server-side cursor and scored in batches.
+Each chunk is committed on its own and users whose stored prediction is still fresh for
+the current model are skipped, so an interrupted run picks up where it stopped.
+`--shards` splits the user id space into equal ranges scored by separate processes,
+`--shard K` scores a single range, e.g. one per machine.
+"""
+import argparse
+import logging
+import multiprocessing
+import time
+import uuid
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from config.config import PREDICTION_CHUNK_SIZE
+from crud.diet_prediction import save_predictions, without_fresh_prediction
+from crud.user_details import iter_user_details_with_log_counts
+from models.user_details import UserDetails
+from models.user_features import UserFeatures
+
+logger = logging.getLogger(__name__)
+
+
+def shard_range(shard: int, shards: int) -> tuple[uuid.UUID, Optional[uuid.UUID]]:
+    """Start (inclusive) and end (exclusive, None for the last shard) of a user id range"""
+    start = uuid.UUID(int=shard * (1 << 128) // shards)
+    end = uuid.UUID(int=(shard + 1) * (1 << 128) // shards) if shard < shards - 1 else None
+    return start, end
+
+
+def run_shard(shard: int, shards: int, chunk_size: int = PREDICTION_CHUNK_SIZE, force: bool = False,
+              engine: Optional[Engine] = None) -> int:
+    """Score the users of one id range, returns the number of predictions written"""
+    from prediction_engine import diet_predictor
+
+    if engine is None:
+        from core.db import engine
+
+    start, end = shard_range(shard, shards)
+    # users without logs get no recommendation, /predict/diet asks them to log food first
+    where = [UserDetails.user_id >= start, UserFeatures.food_log_count > 0]
+    if end is not None:
+        where.append(UserDetails.user_id < end)
+    if not force:
+        where.append(without_fresh_prediction(diet_predictor.model_version))
+
+    scored = 0
+    started_at = time.perf_counter()
+    # the read session holds the cursor open, so chunks are committed through a second one
+    with Session(engine) as read_session, Session(engine) as write_session:
+        # every chunk comes from the snapshot the cursor's query started with
+        read_at = datetime.now(timezone.utc)
+        for rows in iter_user_details_with_log_counts(session=read_session, where=where, chunk_size=chunk_size):
+            model_version = diet_predictor.model_version
+            predictions = diet_predictor.predict_rows(rows, chunk_size=chunk_size)
+            save_predictions(session=write_session, predictions=predictions, model_version=model_version,
+                             predicted_at=read_at)
+            scored += len(predictions)
+            logger.info("shard %d/%d: %d users scored in %.1fs", shard + 1, shards, scored,
+                        time.perf_counter() - started_at)
+    return scored
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Precompute diet recommendations for every user.")
+    parser.add_argument("--shards", type=int, default=1, help="number of user id ranges (default: 1)")
+    parser.add_argument("--shard", type=int, default=None,
+                        help="only score this range (0-based), otherwise every range in its own process")
+    parser.add_argument("--chunk-size", type=int, default=PREDICTION_CHUNK_SIZE,
+                        help=f"users read and scored per batch (default: {PREDICTION_CHUNK_SIZE})")
+    parser.add_argument("--force", action="store_true", help="re-score users whose prediction is still fresh")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(message)s")
+    if args.shard is not None:
+        if not 0 <= args.shard < args.shards:
+            parser.error("--shard must be between 0 and --shards - 1")
+        total = run_shard(args.shard, args.shards, args.chunk_size, args.force)
+    elif args.shards == 1:
+        total = run_shard(0, 1, args.chunk_size, args.force)
+    else:
+        with ProcessPoolExecutor(max_workers=args.shards, mp_context=multiprocessing.get_context("spawn")) as pool:
+            total = sum(pool.map(run_shard, range(args.shards), [args.shards] * args.shards,
+                                 [args.chunk_size] * args.shards, [args.force] * args.shards))
+    logger.info("%d predictions written", total)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Recompute food log aggregates from scratch and report where the maintained ones drifted.
+
+    python -m jobs.reconcile_nutrition [--fix]
+
+UserFeatures counts and totals are kept by signed deltas on every food log write and the
+UserDetails intake columns are copied from them. Both are checked against a full
+GROUP BY over foodlog; `--fix` rewrites the drifted users and marks their predictions stale.
+"""
+import argparse
+import json
+import logging
+import sys
+import uuid
+from typing import Iterator, Optional
+
+from sqlalchemy import Engine, func, union
+from sqlmodel import Session, select
+
+from config.config import PREDICTION_CHUNK_SIZE
+from core.db_utils import dialect_insert
+from crud.user_details import INTAKE_TOTALS, update_user_nutrition_summary
+from crud.user_features import NUTRIENTS, mark_features_stale
+from models.food_log import FoodLog
+from models.user_details import UserDetails
+from models.user_features import UserFeatures
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES = ["food_log_count", "first_log_date", "last_log_date", *(f"total_{nutrient}" for nutrient in NUTRIENTS)]
+
+
+def _actual_statement():
+    """Aggregates recomputed from foodlog next to the stored ones, for every user with either"""
+    logs = select(
+        FoodLog.user_id,
+        func.count().label("food_log_count"),
+        func.min(FoodLog.log_date).label("first_log_date"),
+        func.max(FoodLog.log_date).label("last_log_date"),
+        *(func.coalesce(func.sum(getattr(FoodLog, nutrient)), 0).label(f"total_{nutrient}") for nutrient in NUTRIENTS),
+    ).group_by(FoodLog.user_id).subquery()
+    user_ids = union(select(logs.c.user_id), select(UserFeatures.user_id)).subquery()
+
+    return (
+        select(
+            user_ids.c.user_id,
+            *((logs.c[column] if column.endswith("_date") else func.coalesce(logs.c[column], 0))
+              .label(f"actual_{column}") for column in AGGREGATES),
+            *(getattr(UserFeatures, column).label(f"stored_{column}") for column in AGGREGATES),
+            UserDetails.id.label("details_id"),
+            *(getattr(UserDetails, column).label(f"details_{column}") for column in INTAKE_TOTALS),
+        )
+        .select_from(user_ids)
+        .outerjoin(logs, logs.c.user_id == user_ids.c.user_id)
+        .outerjoin(UserFeatures, UserFeatures.user_id == user_ids.c.user_id)
+        .outerjoin(UserDetails, UserDetails.user_id == user_ids.c.user_id)
+    )
+
+
+def _differs(stored, actual, tolerance: float) -> bool:
+    if isinstance(actual, (int, float)) and isinstance(stored, (int, float)):
+        return abs(stored - actual) > tolerance
+    return stored != actual
+
+
+def find_drift(session: Session, tolerance: float = 1e-6,
+               chunk_size: int = PREDICTION_CHUNK_SIZE) -> Iterator[dict]:
+    """Yield one report per user whose stored aggregates differ from their food logs"""
+    result = session.exec(_actual_statement().execution_options(yield_per=chunk_size))
+    for row in result:
+        row = row._mapping
+        missing = row["stored_food_log_count"] is None
+        drift = {}
+        for column in AGGREGATES:
+            stored, actual = row[f"stored_{column}"], row[f"actual_{column}"]
+            if missing or _differs(stored, actual, tolerance):
+                drift[column] = {"stored": stored, "actual": actual}
+        # users without details have nothing the totals are copied into
+        for column, total in INTAKE_TOTALS.items() if row["details_id"] is not None else ():
+            stored, actual = row[f"details_{column}"], row[f"actual_{total.key}"]
+            if _differs(stored if stored is not None else 0, actual, tolerance):
+                drift[column] = {"stored": stored, "actual": actual}
+        if drift:
+            yield {"user_id": row["user_id"], "missing": missing, "drift": drift}
+
+
+def fix_drift(session: Session, user_id: uuid.UUID, drift: dict) -> None:
+    """Overwrite one user's aggregates with the recomputed values and commit"""
+    values = {column: change["actual"] for column, change in drift.items() if column in AGGREGATES}
+    if values:
+        table = UserFeatures.__table__
+        statement = dialect_insert(session, table).values(user_id=user_id, **values)
+        session.execute(statement.on_conflict_do_update(index_elements=[table.c.user_id], set_=values))
+    update_user_nutrition_summary(session, user_id)
+    mark_features_stale(session, user_id)
+    session.commit()
+
+
+def reconcile(fix: bool = False, tolerance: float = 1e-6, engine: Optional[Engine] = None) -> list[dict]:
+    """Report, and with `fix` repair, every user whose aggregates drifted"""
+    if engine is None:
+        from core.db import engine
+
+    # the read session holds the cursor open, so fixes are committed through a second one
+    with Session(engine) as read_session, Session(engine) as write_session:
+        reports = []
+        for report in find_drift(read_session, tolerance):
+            reports.append(report)
+            if fix:
+                fix_drift(write_session, report["user_id"], report["drift"])
+        return reports
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Check food log aggregates against a full recompute.")
+    parser.add_argument("--fix", action="store_true", help="rewrite the aggregates of drifted users")
+    parser.add_argument("--tolerance", type=float, default=1e-6, help="largest ignored difference of a total")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    reports = reconcile(fix=args.fix, tolerance=args.tolerance)
+    for report in reports:
+        print(json.dumps(report, default=str))
+    logger.info("%d users drifted%s", len(reports), ", fixed" if args.fix and reports else "")
+    if reports and not args.fix:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
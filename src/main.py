@@ -9,6 +9,8 @@ from core.security import get_password_hash
 from utils.recommendations import get_food_recommendations
 from api.v1.routes import routers as v1_routers
 from core.config import configs
+from prediction_engine import diet_predictor
+from service.food_search import food_index
 
 app = FastAPI()
 
@@ -28,6 +30,16 @@ async def root() -> dict[str, str]:
 
 app.include_router(v1_routers, prefix=configs.API_V1_STR)
 
+
+@app.on_event("startup")
+def load_food_search_index() -> None:
+    food_index.load_in_background(db.engine)
+
+
+@app.on_event("shutdown")
+def shutdown_inference_workers() -> None:
+    diet_predictor.shutdown()
+
 if __name__ == "__main__":
     import uvicorn
 
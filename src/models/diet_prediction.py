@@ -0,0 +1,31 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+from core.db_utils import naive_utc
+
+
+# Request Model (for batch predictions)
+class DietPredictionBatchRequest(SQLModel):
+    # None scores every user that has details
+    user_ids: Optional[list[uuid.UUID]] = None
+
+
+class DietPredictionPublic(SQLModel):
+    user_id: uuid.UUID
+    recommendation: str
+
+
+class DietPredictionsPublic(SQLModel):
+    data: list[DietPredictionPublic]
+    count: int
+
+
+# Database Model: latest precomputed prediction per user, written by jobs.predict_all
+class DietPrediction(SQLModel, table=True):
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True, ondelete="CASCADE")
+    recommendation: str = Field(max_length=50)
+    model_version: str = Field(max_length=64, index=True)
+    predicted_at: datetime = Field(default_factory=naive_utc)
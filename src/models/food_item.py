@@ -0,0 +1,92 @@
+import uuid
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from pydantic import validator
+from sqlmodel import Field, SQLModel
+
+from models.food_log import FoodLogBase
+
+
+# Nutrients per serving, the same fields a food log records
+class FoodItemBase(SQLModel):
+    name: str = Field(max_length=100)
+    serving_grams: float = Field(default=100, gt=0)
+    calories: float = Field(ge=0)
+    carbs: float = Field(ge=0, default=0)
+    protein: float = Field(ge=0, default=0)
+    fat: float = Field(ge=0, default=0)
+
+    # Micronutrients (optional fields)
+    sugar: Optional[float] = Field(default=None, ge=0)
+    sodium: Optional[float] = Field(default=None, ge=0)  # in mg
+    potassium: Optional[float] = Field(default=None, ge=0)  # in mg
+    fiber: Optional[float] = Field(default=None, ge=0)  # in g
+    iron: Optional[float] = Field(default=None, ge=0)  # in mg
+    calcium: Optional[float] = Field(default=None, ge=0)  # in mg
+    cholesterol: Optional[float] = Field(default=None, ge=0)  # in mg
+    vitamin_a: Optional[float] = Field(default=None, ge=0)  # in IU
+    vitamin_c: Optional[float] = Field(default=None, ge=0)  # in mg
+    saturated_fat: Optional[float] = Field(default=None, ge=0)  # in g
+    trans_fat: Optional[float] = Field(default=None, ge=0)  # in g
+    polyunsaturated_fat: Optional[float] = Field(default=None, ge=0)  # in g
+    monounsaturated_fat: Optional[float] = Field(default=None, ge=0)  # in g
+
+
+# Database Model: catalog items are deactivated rather than deleted, so search indexes see the change
+class FoodItem(FoodItemBase, table=True):
+    name: str = Field(max_length=100, index=True)
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    is_active: bool = True
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+
+
+class FoodItemCreate(FoodItemBase):
+    pass
+
+
+class FoodItemUpdate(SQLModel):
+    name: Optional[str] = Field(default=None, max_length=100)
+    serving_grams: Optional[float] = Field(default=None, gt=0)
+    calories: Optional[float] = Field(default=None, ge=0)
+    carbs: Optional[float] = Field(default=None, ge=0)
+    protein: Optional[float] = Field(default=None, ge=0)
+    fat: Optional[float] = Field(default=None, ge=0)
+    sugar: Optional[float] = Field(default=None, ge=0)
+    sodium: Optional[float] = Field(default=None, ge=0)
+    potassium: Optional[float] = Field(default=None, ge=0)
+    fiber: Optional[float] = Field(default=None, ge=0)
+    iron: Optional[float] = Field(default=None, ge=0)
+    calcium: Optional[float] = Field(default=None, ge=0)
+    cholesterol: Optional[float] = Field(default=None, ge=0)
+    vitamin_a: Optional[float] = Field(default=None, ge=0)
+    vitamin_c: Optional[float] = Field(default=None, ge=0)
+    saturated_fat: Optional[float] = Field(default=None, ge=0)
+    trans_fat: Optional[float] = Field(default=None, ge=0)
+    polyunsaturated_fat: Optional[float] = Field(default=None, ge=0)
+    monounsaturated_fat: Optional[float] = Field(default=None, ge=0)
+    is_active: Optional[bool] = None
+
+
+class FoodItemPublic(FoodItemBase):
+    id: uuid.UUID
+
+
+# Autocomplete suggestion, only what the search index keeps in memory
+class FoodSearchHit(SQLModel):
+    id: uuid.UUID
+    name: str
+    serving_grams: float
+    calories: float
+
+
+# Request to log servings of a catalog item, its nutrients fill in the food log
+class FoodLogFromCatalog(SQLModel):
+    food_item_id: uuid.UUID
+    log_date: date
+    meal_type: str = Field(max_length=20)
+    servings: float = Field(default=1, gt=0)
+
+    @validator('meal_type')
+    def validate_meal_type(cls, v):
+        return FoodLogBase.validate_meal_type(v)
@@ -1,14 +1,33 @@
 import uuid
-from datetime import date
+from datetime import date, datetime
 from typing import Optional
+from sqlalchemy import DDL, Index, SmallInteger, TypeDecorator, event, select
+from sqlalchemy.orm import column_property
 from sqlmodel import SQLModel, Field, Relationship
 from pydantic import validator
 
+from models.food_name import FoodName
 
-# Base Models
-class FoodLogBase(SQLModel):
+# stored as the index in this tuple
+MEAL_TYPES = ("breakfast", "lunch", "dinner", "snack")
+MEAL_TYPE_CODES = {name: code for code, name in enumerate(MEAL_TYPES)}
+
+
+class MealTypeCode(TypeDecorator):
+    """A meal type name in Python, its MEAL_TYPES index in the database. Unknown names match no rows"""
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else MEAL_TYPE_CODES.get(value, -1)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else MEAL_TYPES[value]
+
+
+# Fields stored in every food log row as they are
+class FoodLogValues(SQLModel):
     log_date: date = Field(index=True, alias='date')
-    food: str = Field(max_length=100)
     meal_type: str = Field(max_length=20)  # e.g., "breakfast", "lunch", "dinner", "snack"
     calories: float = Field(ge=0)
     carbs: float = Field(ge=0, default=0)
@@ -33,21 +52,47 @@ class FoodLogBase(SQLModel):
     # Validator example
     @validator('meal_type')
     def validate_meal_type(cls, v):
-        allowed = ["breakfast", "lunch", "dinner", "snack"]
+        allowed = list(MEAL_TYPES)
         if v.lower() not in allowed:
             raise ValueError(f"Meal type must be one of: {', '.join(allowed)}")
         return v.lower()
 
 
-# Database Model with Relationship
-class FoodLog(FoodLogBase, table=True):
+# Base Models
+class FoodLogBase(FoodLogValues):
+    food: str = Field(max_length=100)
+
+
+# Database Model with Relationship: the food name is interned in FoodName, the meal type stored as a small int
+class FoodLog(FoodLogValues, table=True):
+    # per user reads filter on user_id first, then on the meal type and date range
+    __table_args__ = (
+        Index("ix_foodlog_user_id_log_date", "user_id", "log_date"),
+        Index("ix_foodlog_user_id_meal_type_log_date", "user_id", "meal_type", "log_date"),
+        # monthly partitions on Postgres, see core.partitions
+        {"postgresql_partition_by": "RANGE (log_date)"},
+    )
+    # a partitioned table's primary key holds the partition key, the ORM still identifies logs by id
+    __mapper_args__ = {"primary_key": ["id"]}
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    log_date: date = Field(primary_key=True, index=True, alias='date')
     user_id: uuid.UUID = Field(foreign_key="user.id")
+    food_id: int = Field(foreign_key="foodname.id")
+    meal_type: str = Field(sa_type=MealTypeCode)
 
     # Relationship to User
     user: "User" = Relationship(back_populates="food_logs")  # Circular import fixed below
 
 
+# the food name, selected along with every loaded food log
+FoodLog.food = column_property(select(FoodName.name).where(FoodName.id == FoodLog.food_id).scalar_subquery())
+
+# logs of months without a partition yet go to the DEFAULT one
+event.listen(FoodLog.__table__, "after_create",
+             DDL("CREATE TABLE %(table)s_default PARTITION OF %(table)s DEFAULT").execute_if(dialect="postgresql"))
+
+
 # Create Model (for POST requests)
 class FoodLogCreate(FoodLogBase):
     pass
@@ -55,7 +100,7 @@ class FoodLogCreate(FoodLogBase):
 
 # Update Model (for PATCH requests)
 class FoodLogUpdate(SQLModel):
-    date: Optional[date] = None
+    log_date: Optional[date] = Field(default=None, alias='date')
     food: Optional[str] = None
     meal_type: Optional[str] = None
     calories: Optional[float] = None
@@ -81,7 +126,42 @@ class FoodLogPublic(FoodLogBase):
 
 class FoodLogsPublic(SQLModel):
     data: list[FoodLogPublic]
-    count: int
+    count: int  # items in this page
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None  # matching items across every page, when requested
+    total_estimated: bool = False
+
+
+# Times a food was logged
+class FoodCount(SQLModel):
+    food: str
+    log_count: int
+
+
+class FoodLogBulkError(SQLModel):
+    index: int
+    errors: list[dict]
+
+
+# Response of a bulk create: ids of the stored items in request order, and why the others were rejected
+class FoodLogBulkResult(SQLModel):
+    created: int
+    ids: list[uuid.UUID]
+    errors: list[FoodLogBulkError]
+
+
+# Progress of a CSV import, errors are indexed by data row (0 is the row after the header)
+class FoodLogImportJob(SQLModel):
+    id: uuid.UUID = Field(default_factory=uuid.uuid4)
+    user_id: uuid.UUID
+    status: str = "pending"  # pending, running, done or failed
+    rows_read: int = 0
+    imported: int = 0
+    rejected: int = 0
+    errors: list[FoodLogBulkError] = []
+    detail: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 # Fix circular import
 # from src.models.user import User  # noqa
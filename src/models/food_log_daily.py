@@ -0,0 +1,47 @@
+import uuid
+from datetime import date
+
+from sqlmodel import Field, SQLModel
+
+from models.food_log import FoodLogBase
+
+# every numeric field of a food log, summed per user and day
+FOOD_LOG_NUTRIENTS = [name for name, field in FoodLogBase.model_fields.items()
+                      if name not in ("log_date", "food", "meal_type")]
+
+
+# Database Model: per user and day rollup of food logs, maintained on every food log write
+class FoodLogDaily(SQLModel, table=True):
+    __tablename__ = "foodlog_daily"
+
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True, ondelete="CASCADE")
+    log_date: date = Field(primary_key=True)
+
+    # days whose logs were all deleted keep a row with a zero count
+    log_count: int = Field(default=0, ge=0)
+    calories: float = 0
+    carbs: float = 0
+    protein: float = 0
+    fat: float = 0
+    sugar: float = 0
+    sodium: float = 0  # in mg
+    potassium: float = 0  # in mg
+    fiber: float = 0  # in g
+    iron: float = 0  # in mg
+    calcium: float = 0  # in mg
+    cholesterol: float = 0  # in mg
+    vitamin_a: float = 0  # in IU
+    vitamin_c: float = 0  # in mg
+    saturated_fat: float = 0  # in g
+    trans_fat: float = 0  # in g
+    polyunsaturated_fat: float = 0  # in g
+    monounsaturated_fat: float = 0  # in g
+
+
+# Nutrient trend as parallel arrays: the first day of every bucket with logs, the days logged
+# in it and the average daily intake over those days per nutrient
+class FoodLogTrends(SQLModel):
+    bucket: str
+    dates: list[date]
+    days_logged: list[int]
+    values: dict[str, list[float]]
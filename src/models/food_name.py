@@ -0,0 +1,9 @@
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+
+# Database Model: every distinct food name once, food logs keep its id
+class FoodName(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(max_length=100, unique=True)
@@ -113,7 +113,7 @@ class UserDetailsBase(SQLModel):
 
 class UserDetails(UserDetailsBase, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    user_id: uuid.UUID = Field(foreign_key="user.id")
+    user_id: uuid.UUID = Field(foreign_key="user.id", unique=True, index=True)
 
     # Relationship
     user: "User" = Relationship(back_populates="user_details")
@@ -0,0 +1,37 @@
+import uuid
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import JSON, Column
+from sqlmodel import Field, SQLModel
+
+from core.db_utils import naive_utc
+
+
+# Database Model: per-user feature store, one row per user with logged food
+class UserFeatures(SQLModel, table=True):
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True, ondelete="CASCADE")
+
+    # Food log aggregates, maintained on every food log insert, update and delete
+    food_log_count: int = Field(default=0, ge=0)
+    first_log_date: Optional[date] = None
+    last_log_date: Optional[date] = None
+    total_calories: float = 0
+    total_protein: float = 0
+    total_fat: float = 0
+    total_carbs: float = 0
+    total_fiber: float = 0
+    total_sugar: float = 0
+    total_sodium: float = 0  # in mg
+    total_potassium: float = 0  # in mg
+    total_iron: float = 0  # in mg
+    total_calcium: float = 0  # in mg
+    total_vitamin_a: float = 0  # in IU
+    total_vitamin_c: float = 0  # in mg
+
+    # Encoded model inputs, cleared whenever the user's details change
+    bmi_class: Optional[str] = Field(default=None, max_length=20)
+    encoded_features: Optional[list[float]] = Field(default=None, sa_column=Column(JSON(none_as_null=True)))
+    model_version: Optional[str] = Field(default=None, max_length=64)
+
+    updated_at: datetime = Field(default_factory=naive_utc)
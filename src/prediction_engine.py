@@ -1,36 +1,87 @@
 import json
+import uuid
 from pathlib import Path
+from typing import Optional, Sequence
 
-import joblib
-from sqlmodel import SQLModel
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, SQLModel
 import pandas as pd
 import warnings
 
-from config.config import NUMERIC_FEATURES, BMI
+from core.config import configs
+from config.config import NUMERIC_FEATURES, CATEGORICAL_FEATURES, BMI, MIN_FOOD_LOGS, PREDICTION_CHUNK_SIZE
+from crud.user_details import iter_user_details_with_log_counts
+from service.feature_encoder import FeatureEncoder
+from service.inference_pool import InferencePool
+from service.inference_scheduler import InferenceScheduler
+from service.model_registry import LoadedModel, ModelRegistry
+from service.prediction_cache import prediction_cache
 
 # Suppress all warnings
 warnings.filterwarnings("ignore")
 
 
+BMI_CLASS = {'underweight': (0, 18.49),
+             'normal': (18.5, 24.99),
+             'overweight': (25, 29.99),
+             'obese': (30, 100)
+             }
+
+FALLBACK_DIET = {
+    "underweight": "Balanced",
+    "normal": "Balanced",
+    "overweight": "High Protein",
+    "obese": "Low Fat"
+}
+
+
 class DietPredictor:
     def __init__(self, model_path: str = "ml_model/meal_plan_pipeline.joblib"):
-        self.model = self._load_model(model_path)
-
-    @staticmethod
-    def _load_model(model_path: str):
-        """Load the trained model"""
+        # the model is loaded on first use, versions published next to it are picked up live
         model_file = Path(__file__).parent / model_path
-        if not model_file.exists():
-            raise FileNotFoundError(f"Model file not found at {model_file}")
-        return joblib.load(model_file)
+        self.registry = ModelRegistry(
+            model_file.parent,
+            model_file.name,
+            mmap_mode=configs.MODEL_MMAP_MODE,
+            check_interval=configs.MODEL_RELOAD_INTERVAL_SECONDS,
+        )
+        # coalesces concurrent single predictions into batched calls, disabled with a zero window
+        self.scheduler = None
+        if configs.INFERENCE_BATCH_WINDOW_MS > 0:
+            self.scheduler = InferenceScheduler(
+                self._predict_encoded,
+                max_batch_size=configs.INFERENCE_MAX_BATCH_SIZE,
+                max_wait_ms=configs.INFERENCE_BATCH_WINDOW_MS,
+            )
+        # worker processes for `predict_async`, none runs inference on the request threadpool
+        self.pool = None
+        if configs.INFERENCE_WORKERS > 0:
+            self.pool = InferencePool(
+                workers=configs.INFERENCE_WORKERS,
+                max_pending=configs.INFERENCE_MAX_PENDING,
+                mmap_mode=configs.MODEL_MMAP_MODE,
+            )
+
+    @property
+    def model(self) -> dict:
+        return self.registry.current().model
+
+    @property
+    def model_version(self) -> str:
+        return self.registry.current().version
+
+    @property
+    def encoder(self) -> Optional[FeatureEncoder]:
+        return self.registry.current().encoder
+
+    def _predict_encoded(self, features: np.ndarray) -> np.ndarray:
+        # a batch queued across a hot swap is scored by the new version, retrained
+        # pipelines keep the feature layout so the encoded rows stay valid
+        return self.encoder.predict(features)
 
     @staticmethod
     def _get_bmi_class(bmi: int) -> str:
-        BMI_CLASS = {'underweight': (0, 18.49),
-               'normal': (18.5, 24.99),
-               'overweight': (25, 29.99),
-               'obese': (30, 100)
-               }
         for category, rnge in BMI_CLASS.items():
             start, end = rnge
 
@@ -38,6 +89,18 @@ class DietPredictor:
                 return category
         return 'None'
 
+    @staticmethod
+    def _get_bmi_classes(bmi: np.ndarray) -> np.ndarray:
+        """Vectorized `_get_bmi_class`; missing or out-of-range values map to 'None'"""
+        bmi = np.asarray(bmi, dtype=float)
+        conditions = [(start <= bmi) & (bmi <= end) for start, end in BMI_CLASS.values()]
+        return np.select(conditions, list(BMI_CLASS), default='None')
+
+    @staticmethod
+    def _uses_model(bmi_class: str, food_log_count: int) -> bool:
+        """Whether a user is scored by the model, `predict_frame` decides the same for many users at once"""
+        return food_log_count >= MIN_FOOD_LOGS and bmi_class != 'None'
+
     def _preprocess_input(self, user_details: dict):
         user_details = {k.lower(): v for k, v in user_details.items()}
 
@@ -50,28 +113,155 @@ class DietPredictor:
 
     def predict(self, user_details: SQLModel, food_log_count: int) -> str:
         """Predict diet plan"""
-        input_data = json.loads(user_details.json())
-        input_data[BMI] = self._get_bmi_class(input_data[BMI])
+        bmi_class = self._get_bmi_class(user_details.bmi)
+
+        # if log count is less, or the BMI has no class the model knows, go to fallback
+        if not self._uses_model(bmi_class, food_log_count):
+            return self._fallback_diet(bmi_class)
+
+        loaded = self.registry.current()
+        if loaded.encoder is None:
+            return self._predict_dataframe(user_details, bmi_class)
+
+        features = loaded.encoder.encode(user_details, bmi=bmi_class)
+        return self._infer(loaded, features)
+
+    def encode(self, user_details: SQLModel) -> tuple[str, Optional[np.ndarray]]:
+        """BMI class and encoded model inputs of a user, features are None when they can't be encoded"""
+        bmi_class = self._get_bmi_class(user_details.bmi)
+        encoder = self.encoder
+        if encoder is None or bmi_class == 'None':
+            return bmi_class, None
+        return bmi_class, encoder.encode(user_details, bmi=bmi_class)
+
+    async def predict_encoded_async(self, bmi_class: str, features: Optional[np.ndarray],
+                                    food_log_count: int) -> str:
+        """Predict diet plan from inputs already encoded by `encode`"""
+        if not self._uses_model(bmi_class, food_log_count):
+            return self._fallback_diet(bmi_class)
+        return await self._infer_async(self.registry.current(), features)
+
+    def _infer(self, loaded: LoadedModel, features: np.ndarray) -> str:
+        fingerprint = prediction_cache.fingerprint(features, loaded.version)
+        prediction = prediction_cache.get(fingerprint)
+        if prediction is None:
+            if self.scheduler is not None:
+                prediction = str(self.scheduler.submit(features).result())
+            else:
+                prediction = str(loaded.encoder.predict(features)[0])
+            prediction_cache.put(fingerprint, prediction)
+        return prediction
 
-        # if log count is less go to fallback
-        if food_log_count < 21:
-            return self._fallback_diet(input_data[BMI])
+    async def _infer_async(self, loaded: LoadedModel, features: np.ndarray) -> str:
+        if self.pool is None:
+            return await run_in_threadpool(self._infer, loaded, features)
 
-        pipeline = self.model["pipeline"]
-        record = self._preprocess_input(input_data)
+        fingerprint = prediction_cache.fingerprint(features, loaded.version)
+        prediction = prediction_cache.get(fingerprint)
+        if prediction is None:
+            prediction = str((await self.pool.predict(loaded.path, loaded.version, features))[0])
+            prediction_cache.put(fingerprint, prediction)
+        return prediction
+
+    async def predict_async(self, user_details: SQLModel, food_log_count: int) -> str:
+        """
+        Predict diet plan without blocking the event loop. Inference is awaited on the
+        worker pool when one is configured, otherwise `predict` runs on the threadpool.
+        Raises `InferencePoolFull` when the pool has no room for another prediction.
+        """
+        if self.pool is None:
+            return await run_in_threadpool(self.predict, user_details, food_log_count)
+
+        bmi_class = self._get_bmi_class(user_details.bmi)
+
+        if not self._uses_model(bmi_class, food_log_count):
+            return self._fallback_diet(bmi_class)
+
+        loaded = self.registry.current()
+        if loaded.encoder is None:
+            record = self._dataframe_record(user_details, bmi_class)
+            return (await self.pool.predict(loaded.path, loaded.version, record))[0]
+
+        features = loaded.encoder.encode(user_details, bmi=bmi_class)
+        return await self._infer_async(loaded, features)
+
+    def _dataframe_record(self, user_details: SQLModel, bmi_class: str) -> pd.DataFrame:
+        input_data = json.loads(user_details.json())
+        input_data[BMI] = bmi_class
+        return self._preprocess_input(input_data)
+
+    def _predict_dataframe(self, user_details: SQLModel, bmi_class: str) -> str:
+        """Predict through the full pipeline from a one-row DataFrame"""
+        pipeline = self.registry.current().pipeline
+        record = self._dataframe_record(user_details, bmi_class)
         prediction = pipeline.predict(record)[0]
 
         return prediction
 
+    def predict_frame(self, records: pd.DataFrame, food_log_counts: np.ndarray,
+                      chunk_size: int = PREDICTION_CHUNK_SIZE) -> np.ndarray:
+        """
+        Predict diet plans for many users at once.
+
+        `records` holds one row per user with the raw feature columns, `food_log_counts`
+        the matching log counts. Users below the log threshold, or whose BMI has no class,
+        get the fallback diet; everyone else is scored by the pipeline in chunks.
+        """
+        records = records.copy()
+        for col in NUMERIC_FEATURES:
+            records[col] = pd.to_numeric(records[col], errors='coerce')
+        bmi_classes = self._get_bmi_classes(records[BMI].to_numpy(dtype=float, na_value=np.nan))
+        records[BMI] = bmi_classes
+
+        predictions = self._fallback_diets(bmi_classes).astype(object)
+        use_model = (np.asarray(food_log_counts) >= MIN_FOOD_LOGS) & (bmi_classes != 'None')
+        model_rows = np.flatnonzero(use_model)
+        if model_rows.size:
+            loaded = self.registry.current()
+            for start in range(0, model_rows.size, chunk_size):
+                rows = model_rows[start:start + chunk_size]
+                if loaded.encoder is None:
+                    predictions[rows] = loaded.pipeline.predict(records.iloc[rows])
+                else:
+                    predictions[rows] = loaded.encoder.predict(loaded.encoder.encode_frame(records.iloc[rows]))
+
+        return predictions
+
+    def predict_many(self, session: Session, user_ids: Optional[Sequence[uuid.UUID]] = None,
+                     chunk_size: int = PREDICTION_CHUNK_SIZE) -> dict[uuid.UUID, str]:
+        """Predict diet plans for the given users, or for every user with details"""
+        results = {}
+        for rows in iter_user_details_with_log_counts(session=session, user_ids=user_ids,
+                                                      chunk_size=chunk_size):
+            results.update(self.predict_rows(rows, chunk_size=chunk_size))
+        return results
+
+    def predict_rows(self, rows: Sequence, chunk_size: int = PREDICTION_CHUNK_SIZE) -> dict[uuid.UUID, str]:
+        """Predict diet plans for rows from `iter_user_details_with_log_counts`"""
+        frame = pd.DataFrame.from_records(rows, columns=list(rows[0]._fields))
+        for col in CATEGORICAL_FEATURES:
+            if col != BMI:
+                frame[col] = frame[col].map(_enum_value)
+        food_log_counts = frame.pop("food_log_count").to_numpy()
+        predictions = self.predict_frame(frame, food_log_counts, chunk_size=chunk_size)
+        return dict(zip(frame["user_id"], predictions))
+
+    def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+
     @staticmethod
     def _fallback_diet(bmi_class: str) -> str:
-        fallback_map = {
-            "underweight": "Balanced",
-            "normal": "Balanced",
-            "overweight": "High Protein",
-            "obese": "Low Fat"
-        }
-        return fallback_map.get(bmi_class, "Balanced")
+        return FALLBACK_DIET.get(bmi_class, "Balanced")
+
+    @staticmethod
+    def _fallback_diets(bmi_classes: np.ndarray) -> np.ndarray:
+        """Vectorized `_fallback_diet`"""
+        return pd.Series(bmi_classes).map(FALLBACK_DIET).fillna("Balanced").to_numpy()
+
+
+def _enum_value(value):
+    return getattr(value, "value", value)
 
 
 # Singleton instance
@@ -0,0 +1,121 @@
+import uuid
+from datetime import date, timedelta
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlmodel import Session
+
+from config.config import DEFICIENCY_THRESHOLD, NUTRITION_WINDOW_DAYS, RECOMMENDED_VALUES, UPPER_LIMIT_NUTRIENTS
+from crud.food_log_daily import get_nutrient_intake, get_windowed_intake
+from crud.user_features import get_user_features
+from service.food_history import FoodHistory
+
+NUTRIENTS = tuple(RECOMMENDED_VALUES)
+_RECOMMENDED = np.array([RECOMMENDED_VALUES[nutrient] for nutrient in NUTRIENTS], dtype=float)
+_UPPER_LIMIT = np.array([nutrient in UPPER_LIMIT_NUTRIENTS for nutrient in NUTRIENTS])
+
+
+class DeficiencyScores:
+    """
+    Daily intake of many users scored against `RECOMMENDED_VALUES`.
+
+    Rows are users and columns follow `NUTRIENTS`. `severity` is the missing share of the
+    recommended value, 0 when it is met and 1 when nothing was eaten; a nutrient is
+    deficient once its severity passes `1 - threshold`. `UPPER_LIMIT_NUTRIENTS` are never
+    deficient: they are in excess above their recommended value, their severity being the
+    share above it, capped at 1.
+    """
+
+    def __init__(self, user_ids: list[uuid.UUID], average: np.ndarray, threshold: float = DEFICIENCY_THRESHOLD,
+                 days: Optional[np.ndarray] = None):
+        self.user_ids = user_ids
+        self.average = average
+        self.days = days  # logged days averaged per row, when built from totals
+        ratio = average / _RECOMMENDED
+        self.severity = np.clip(np.where(_UPPER_LIMIT, ratio - 1, 1 - ratio), 0, 1)
+        self.deficient = (ratio < threshold) & ~_UPPER_LIMIT
+        self.excess = (ratio > 1) & _UPPER_LIMIT
+
+    @classmethod
+    def from_totals(cls, user_ids: list[uuid.UUID], days: np.ndarray, totals: np.ndarray,
+                    threshold: float = DEFICIENCY_THRESHOLD) -> "DeficiencyScores":
+        average = totals / np.maximum(days, 1)[:, None]
+        return cls(user_ids, average, threshold, days)
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def flags(self, row: int = 0) -> dict[str, int]:
+        """`{nutrient}_deficient` flags of one user, as `get_food_recommendations` expects them"""
+        return {f"{nutrient}_deficient": int(flag)
+                for nutrient, flag, limit in zip(NUTRIENTS, self.deficient[row], _UPPER_LIMIT) if not limit}
+
+    def excess_flags(self, row: int = 0) -> dict[str, int]:
+        """`{nutrient}_excess` flags of one user for the `UPPER_LIMIT_NUTRIENTS`"""
+        return {f"{nutrient}_excess": int(flag)
+                for nutrient, flag, limit in zip(NUTRIENTS, self.excess[row], _UPPER_LIMIT) if limit}
+
+    def report(self, row: int = 0) -> dict:
+        return {
+            "average": {nutrient: round(float(value), 2) for nutrient, value in zip(NUTRIENTS, self.average[row])},
+            "deficiencies": self.flags(row),
+            "excesses": self.excess_flags(row),
+            "severity": {nutrient: round(float(value), 3) for nutrient, value in zip(NUTRIENTS, self.severity[row])},
+        }
+
+    def cohort_report(self) -> dict:
+        """Deficient (or in excess, for upper limits) user counts and mean severity per nutrient"""
+        return {
+            "users": len(self),
+            "deficient": {nutrient: int(count) for nutrient, count, limit
+                          in zip(NUTRIENTS, self.deficient.sum(axis=0), _UPPER_LIMIT) if not limit},
+            "excess": {nutrient: int(count) for nutrient, count, limit
+                       in zip(NUTRIENTS, self.excess.sum(axis=0), _UPPER_LIMIT) if limit},
+            "mean_severity": {
+                nutrient: round(float(value), 3)
+                for nutrient, value in zip(NUTRIENTS, self.severity.mean(axis=0) if len(self) else np.zeros(len(NUTRIENTS)))
+            },
+        }
+
+
+def score_user(session: Session, user_id: uuid.UUID) -> Optional[tuple[tuple[date, date], DeficiencyScores]]:
+    """Deficiencies of one user over their latest window, a few rollup rows, None without logs"""
+    scored = score_user_windows(session, user_id, [NUTRITION_WINDOW_DAYS])
+    if scored is None:
+        return None
+    last_log_date, scores = scored
+    return (last_log_date - timedelta(days=NUTRITION_WINDOW_DAYS - 1), last_log_date), scores
+
+
+def score_user_windows(session: Session, user_id: uuid.UUID, windows: Sequence[int],
+                       meal_type: Optional[str] = None) -> Optional[tuple[date, DeficiencyScores]]:
+    """
+    Deficiencies of one user over windows of several lengths ending at their latest log, one
+    row of scores per window, summed by a single statement over the daily rollup. The rollup
+    doesn't split meal types, with `meal_type` the logs are loaded as columns and summed instead.
+    None without logs.
+    """
+    features = get_user_features(session=session, user_id=user_id)
+    if features is None or not features.last_log_date:
+        return None
+    if meal_type is None:
+        days, totals = get_windowed_intake(session=session, user_id=user_id, date_to=features.last_log_date,
+                                           windows=windows, nutrients=NUTRIENTS)
+    else:
+        history = FoodHistory.load(session, user_id, meal_type=meal_type, nutrients=NUTRIENTS,
+                                   date_from=features.last_log_date - timedelta(days=max(windows) - 1),
+                                   date_to=features.last_log_date)
+        days, totals = history.window_totals(features.last_log_date, windows, NUTRIENTS)
+    return features.last_log_date, DeficiencyScores.from_totals([user_id] * len(windows), days, totals)
+
+
+def score_cohort(session: Session, as_of: date, user_ids: Optional[Sequence[uuid.UUID]] = None) -> DeficiencyScores:
+    """
+    Deficiencies of every user with logs in the `NUTRITION_WINDOW_DAYS` days ending at `as_of`,
+    summed from the daily rollup by one grouped query and scored in one pass.
+    """
+    user_ids, days, totals = get_nutrient_intake(
+        session=session, date_from=as_of - timedelta(days=NUTRITION_WINDOW_DAYS - 1), date_to=as_of,
+        nutrients=NUTRIENTS, user_ids=user_ids,
+    )
+    return DeficiencyScores.from_totals(user_ids, days, totals)
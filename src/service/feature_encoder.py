@@ -0,0 +1,162 @@
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+
+class _NumericBlock:
+    """Imputation with a fitted statistic followed by standard scaling"""
+
+    def __init__(self, columns: list[str], imputer: SimpleImputer, scaler: StandardScaler):
+        self.columns = columns
+        self.width = len(columns)
+        self.fill = imputer.statistics_.astype(float)
+        self.mean = scaler.mean_ if scaler.with_mean else np.zeros(self.width)
+        self.scale = scaler.scale_ if scaler.with_std else np.ones(self.width)
+
+    def transform(self, values: np.ndarray) -> np.ndarray:
+        values = np.where(np.isnan(values), self.fill, values)
+        values -= self.mean
+        values /= self.scale
+        return values
+
+    def encode_row(self, out: np.ndarray, offset: int, get) -> None:
+        values = np.array([get(column) for column in self.columns], dtype=float)
+        out[offset:offset + self.width] = self.transform(values)
+
+    def encode_frame(self, out: np.ndarray, offset: int, frame: pd.DataFrame) -> None:
+        values = frame[self.columns].to_numpy(dtype=float, na_value=np.nan)
+        out[:, offset:offset + self.width] = self.transform(values)
+
+
+class _CategoricalBlock:
+    """Constant imputation followed by one-hot encoding"""
+
+    def __init__(self, columns: list[str], imputer: SimpleImputer, encoder: OneHotEncoder):
+        self.columns = columns
+        self.fill = imputer.fill_value
+        self.ignore_unknown = encoder.handle_unknown == "ignore"
+        self.categories = encoder.categories_
+        # category -> output column within the block, dropped categories encode to all zeros
+        self.lookups = []
+        self.positions = []
+        offset = 0
+        for i, categories in enumerate(encoder.categories_):
+            drop = encoder.drop_idx_[i] if encoder.drop_idx_ is not None else None
+            positions = np.full(len(categories), -1)
+            for j in range(len(categories)):
+                if j != drop:
+                    positions[j] = offset
+                    offset += 1
+            self.positions.append(positions)
+            self.lookups.append({category: positions[j] for j, category in enumerate(categories)})
+        self.width = offset
+
+    def _unknown(self, column: str, value: Any) -> None:
+        if not self.ignore_unknown:
+            raise ValueError(f"Found unknown categories [{value!r}] in column '{column}' during transform")
+
+    def encode_row(self, out: np.ndarray, offset: int, get) -> None:
+        out[offset:offset + self.width] = 0
+        for column, lookup in zip(self.columns, self.lookups):
+            value = get(column)
+            if value is None:
+                value = self.fill
+            position = lookup.get(getattr(value, "value", value))
+            if position is None:
+                self._unknown(column, value)
+            elif position >= 0:
+                out[offset + position] = 1
+
+    def encode_frame(self, out: np.ndarray, offset: int, frame: pd.DataFrame) -> None:
+        out[:, offset:offset + self.width] = 0
+        rows = np.arange(len(frame))
+        for column, categories, positions in zip(self.columns, self.categories, self.positions):
+            values = frame[column].astype(object).where(frame[column].notna(), self.fill)
+            codes = pd.Categorical(values, categories=categories).codes
+            if not self.ignore_unknown and (codes < 0).any():
+                self._unknown(column, values[codes < 0].iloc[0])
+            known = codes >= 0
+            selected = positions[codes[known]]
+            hot = selected >= 0
+            out[rows[known][hot], offset + selected[hot]] = 1
+
+
+class FeatureEncoder:
+    """
+    Plain numpy replay of the fitted preprocessor of a diet pipeline.
+
+    Turns a `UserDetails` row (or a frame of them) straight into the matrix the final
+    estimator was trained on, skipping the DataFrame round trip of `pipeline.predict`.
+    Use `compile` to build one; it returns None for pipelines it does not understand.
+    """
+
+    def __init__(self, blocks: list, estimator: Any):
+        self.blocks = blocks
+        self.estimator = estimator
+        self.n_features = sum(block.width for block in blocks)
+
+    @classmethod
+    def compile(cls, pipeline: Any) -> Optional["FeatureEncoder"]:
+        if not isinstance(pipeline, Pipeline) or len(pipeline.steps) != 2:
+            return None
+        preprocessor, estimator = pipeline.steps[0][1], pipeline.steps[1][1]
+        if not isinstance(preprocessor, ColumnTransformer) or preprocessor.sparse_output_:
+            return None
+
+        blocks = []
+        for name, transformer, columns in preprocessor.transformers_:
+            if name == "remainder":
+                if transformer == "drop" or len(columns) == 0:
+                    continue
+                return None
+            block = cls._compile_block(transformer, list(columns))
+            if block is None:
+                return None
+            blocks.append(block)
+        return cls(blocks, estimator)
+
+    @staticmethod
+    def _compile_block(transformer: Any, columns: list[str]):
+        if not isinstance(transformer, Pipeline) or len(transformer.steps) != 2:
+            return None
+        if not all(isinstance(column, str) for column in columns):
+            return None
+        imputer, step = transformer.steps[0][1], transformer.steps[1][1]
+        if not isinstance(imputer, SimpleImputer) or imputer.add_indicator:
+            return None
+
+        if isinstance(step, StandardScaler) and imputer.strategy in ("mean", "median", "most_frequent"):
+            return _NumericBlock(columns, imputer, step)
+        if (isinstance(step, OneHotEncoder) and imputer.strategy == "constant"
+                and not step.sparse_output and not getattr(step, "_infrequent_enabled", False)):
+            return _CategoricalBlock(columns, imputer, step)
+        return None
+
+    def encode(self, record: Any, **overrides: Any) -> np.ndarray:
+        """Encode one record read by attribute; `overrides` replace individual attributes"""
+        def get(column: str) -> Any:
+            return overrides[column] if column in overrides else getattr(record, column)
+
+        out = np.empty((1, self.n_features))
+        offset = 0
+        for block in self.blocks:
+            block.encode_row(out[0], offset, get)
+            offset += block.width
+        return out
+
+    def encode_frame(self, frame: pd.DataFrame) -> np.ndarray:
+        """Encode every row of a frame holding the raw feature columns"""
+        out = np.empty((len(frame), self.n_features))
+        offset = 0
+        for block in self.blocks:
+            block.encode_frame(out, offset, frame)
+            offset += block.width
+        return out
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return self.estimator.predict(features)
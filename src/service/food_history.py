@@ -0,0 +1,123 @@
+import uuid
+from datetime import date
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy import SmallInteger, type_coerce
+from sqlmodel import Session, select
+
+from config.config import EXPORT_CHUNK_SIZE
+from core.db_utils import epoch_days
+from models.food_log import MEAL_TYPES, FoodLog
+from models.food_log_daily import FOOD_LOG_NUTRIENTS
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def _to_days(day: date) -> int:
+    return int((np.datetime64(day, "D") - _EPOCH).astype(int))
+
+
+class FoodHistory:
+    """
+    A user's food logs as a struct of arrays: `days` since 1970-01-01 (int32), `meal_types`
+    as indexes into MEAL_TYPES (int8) and one float64 array per nutrient, NaN where a
+    micronutrient was not logged. Rows are in log date order.
+
+    Loading fetches plain numeric tuples, so a chunk of rows becomes arrays in one NumPy
+    call without building ORM objects; summaries then run as vector operations.
+    """
+
+    def __init__(self, days: np.ndarray, meal_types: np.ndarray, values: dict[str, np.ndarray]):
+        self.days = days
+        self.meal_types = meal_types
+        self.values = values
+
+    @classmethod
+    def load(cls, session: Session, user_id: uuid.UUID, date_from: Optional[date] = None,
+             date_to: Optional[date] = None, meal_type: Optional[str] = None,
+             nutrients: Sequence[str] = FOOD_LOG_NUTRIENTS, chunk_size: int = EXPORT_CHUNK_SIZE) -> "FoodHistory":
+        # the stored MEAL_TYPES index, not the name it decodes to
+        meal_code = type_coerce(FoodLog.meal_type, SmallInteger)
+        statement = (
+            select(epoch_days(session, FoodLog.log_date), meal_code, *(getattr(FoodLog, nutrient) for nutrient in nutrients))
+            .where(FoodLog.user_id == user_id)
+            .order_by(FoodLog.log_date)
+        )
+        if date_from is not None:
+            statement = statement.where(FoodLog.log_date >= date_from)
+        if date_to is not None:
+            statement = statement.where(FoodLog.log_date <= date_to)
+        if meal_type is not None:
+            statement = statement.where(FoodLog.meal_type == meal_type)
+
+        # a Core result on the session's connection, the ORM adds nothing to plain numbers
+        result = session.connection().execute(statement.execution_options(yield_per=chunk_size))
+        # rows as tuples, NumPy probes Row objects for array interfaces; None converts to NaN
+        chunks = [np.array([tuple(row) for row in rows], dtype=float) for rows in result.partitions() if rows]
+        table = np.concatenate(chunks) if chunks else np.zeros((0, len(nutrients) + 2))
+        return cls(
+            days=table[:, 0].astype(np.int32),
+            meal_types=table[:, 1].astype(np.int8),
+            values={nutrient: np.ascontiguousarray(table[:, column + 2]) for column, nutrient in enumerate(nutrients)},
+        )
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def nbytes(self) -> int:
+        return self.days.nbytes + self.meal_types.nbytes + sum(values.nbytes for values in self.values.values())
+
+    @property
+    def dates(self) -> np.ndarray:
+        return _EPOCH + self.days
+
+    def select(self, date_from: Optional[date] = None, date_to: Optional[date] = None,
+               meal_type: Optional[str] = None) -> "FoodHistory":
+        """The rows between two dates and of one meal type, as a new history"""
+        mask = np.ones(len(self), dtype=bool)
+        if date_from is not None:
+            mask &= self.days >= _to_days(date_from)
+        if date_to is not None:
+            mask &= self.days <= _to_days(date_to)
+        if meal_type is not None:
+            mask &= self.meal_types == MEAL_TYPES.index(meal_type)
+        return FoodHistory(self.days[mask], self.meal_types[mask],
+                           {nutrient: values[mask] for nutrient, values in self.values.items()})
+
+    def totals(self, nutrients: Sequence[str]) -> np.ndarray:
+        """(len(self), len(nutrients)) matrix, missing values count as 0"""
+        return np.column_stack([np.nan_to_num(self.values[nutrient]) for nutrient in nutrients]) \
+            if len(self) else np.zeros((0, len(nutrients)))
+
+    def grouped(self, nutrients: Sequence[str], bucket: str = "day") -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Nutrient totals per day, ISO week or month, same shape as `get_nutrient_trends`: the first
+        day of every bucket with logs (datetime64), the days logged in each and their totals.
+        """
+        starts = self.days
+        if bucket == "week":
+            # 1970-01-01 was a Thursday
+            starts = starts - (starts + 3) % 7
+        elif bucket == "month":
+            starts = (self.dates.astype("datetime64[M]").astype("datetime64[D]") - _EPOCH).astype(np.int32)
+        if not len(self):
+            return self.dates, np.zeros(0), np.zeros((0, len(nutrients)))
+
+        # rows are in date order, so every bucket and day is one contiguous run
+        bucket_edges = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+        day_edges = np.r_[True, self.days[1:] != self.days[:-1]]
+        days_logged = np.add.reduceat(day_edges.astype(int), bucket_edges)
+        totals = np.add.reduceat(self.totals(nutrients), bucket_edges, axis=0)
+        return _EPOCH + starts[bucket_edges], days_logged, totals
+
+    def window_totals(self, date_to: date, windows: Sequence[int],
+                      nutrients: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Logged days (n_windows,) and totals (n_windows, len(nutrients)) of windows ending at `date_to`"""
+        day_starts, _, daily = self.grouped(nutrients)
+        day_numbers = (day_starts - _EPOCH).astype(int)
+        end = _to_days(date_to)
+        in_window = np.array([(day_numbers > end - days) & (day_numbers <= end) for days in windows],
+                             dtype=float).reshape(len(windows), len(day_numbers))
+        return in_window.sum(axis=1), in_window @ daily
@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+import uuid
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy import Engine, Row
+from sqlmodel import Session
+
+from config.config import EXPORT_CHUNK_SIZE
+from crud.food_log import FOOD_LOG_COLUMNS, iter_food_logs
+
+EXPORT_COLUMNS = [column.key for column in FOOD_LOG_COLUMNS]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def ndjson_chunks(chunks: Iterator[Sequence[Row]]) -> Iterator[str]:
+    """One JSON object per line, dates and ids as strings"""
+    for rows in chunks:
+        yield "".join(json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n" for row in rows)
+
+
+def csv_chunks(chunks: Iterator[Sequence[Row]]) -> Iterator[str]:
+    """A header line then one line per row, missing micronutrients as empty fields"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # no rows at all, still send the header
+        yield buffer.getvalue()
+
+
+_ENCODERS = {
+    "ndjson": ndjson_chunks,
+    "csv": csv_chunks,
+}
+
+
+def export_food_logs(engine: Engine, format: str, user_id: Optional[uuid.UUID] = None,
+                     chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Encoded export of the food logs of a user, or of every user, one chunk at a time.
+
+    The generator opens its own session: a streamed response is sent after the request's
+    dependencies, and so its session, have been closed.
+    """
+    with Session(engine) as session:
+        yield from _ENCODERS[format](iter_food_logs(session=session, user_id=user_id, chunk_size=chunk_size))
@@ -0,0 +1,200 @@
+import csv
+import logging
+import re
+import threading
+import uuid
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from config.config import IMPORT_CHUNK_SIZE, IMPORT_JOBS_KEPT, IMPORT_MAX_ERRORS
+from crud.food_log import insert_food_log_rows
+from models.food_log import FoodLogBase, FoodLogBulkError, FoodLogCreate, FoodLogImportJob
+
+logger = logging.getLogger(__name__)
+
+_food_logs_adapter = TypeAdapter(list[FoodLogCreate])
+
+# header names other trackers use for FoodLogBase fields, after normalization
+COLUMN_ALIASES = {
+    "date": "log_date",
+    "day": "log_date",
+    "logged_on": "log_date",
+    "food_name": "food",
+    "item": "food",
+    "name": "food",
+    "description": "food",
+    "meal": "meal_type",
+    "meal_name": "meal_type",
+    "energy": "calories",
+    "kcal": "calories",
+    "carbohydrates": "carbs",
+    "total_carbohydrates": "carbs",
+    "total_fat": "fat",
+    "sugars": "sugar",
+    "dietary_fiber": "fiber",
+    "saturated": "saturated_fat",
+    "polyunsaturated": "polyunsaturated_fat",
+    "monounsaturated": "monounsaturated_fat",
+    "vitamin_a_iu": "vitamin_a",
+}
+
+REQUIRED_FIELDS = [name for name, field in FoodLogBase.model_fields.items() if field.is_required()]
+
+_UNIT_SUFFIX = re.compile(r"_(g|mg|mcg|ug|kcal|cal|iu)$")
+
+
+def _normalize(header: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", header.strip().lower()).strip("_")
+
+
+def map_columns(header: list[str], columns: Optional[dict[str, str]] = None) -> list[Optional[str]]:
+    """
+    FoodLogBase field of every CSV column, None for the columns that are not imported.
+    `columns` maps header names to fields explicitly, other headers are matched by name,
+    e.g. "Carbohydrates (g)" to carbs. Raises ValueError when a required field has no column.
+    """
+    columns = columns or {}
+    unknown = set(columns.values()) - set(FoodLogBase.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown food log fields: {', '.join(sorted(unknown))}")
+
+    fields = []
+    for name in header:
+        if name in columns:
+            fields.append(columns[name])
+            continue
+        key = _normalize(name)
+        key = COLUMN_ALIASES.get(key, key)
+        if key not in FoodLogBase.model_fields:
+            key = _UNIT_SUFFIX.sub("", key)
+            key = COLUMN_ALIASES.get(key, key)
+        fields.append(key if key in FoodLogBase.model_fields else None)
+
+    missing = [field for field in REQUIRED_FIELDS if field not in fields]
+    if missing:
+        raise ValueError(f"No column for: {', '.join(missing)}")
+    return fields
+
+
+def read_chunks(lines: Iterable[str], columns: Optional[dict[str, str]] = None,
+                chunk_size: int = IMPORT_CHUNK_SIZE) -> Iterator[list[dict]]:
+    """
+    Parse CSV lines incrementally into lists of `chunk_size` food log dicts.
+    Empty cells are left out so the field defaults apply.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("The file is empty")
+    fields = map_columns(header, columns)
+    date_column = fields.index("log_date")
+
+    chunk = []
+    for row in reader:
+        if date_column < len(row):
+            # timestamps keep their date part
+            row[date_column] = row[date_column].strip().split("T")[0].split(" ")[0]
+        chunk.append({field: value for field, value in zip(fields, row) if field and value != ""})
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_food_logs(items: list[Any]) -> tuple[list[tuple[int, FoodLogCreate]], list[FoodLogBulkError]]:
+    """Validate every item in one pass, only a failed pass re-validates the items that passed"""
+    try:
+        return list(enumerate(_food_logs_adapter.validate_python(items))), []
+    except ValidationError as exc:
+        failed: dict[int, list[dict]] = defaultdict(list)
+        for error in exc.errors(include_url=False, include_input=False, include_context=False):
+            failed[error["loc"][0]].append({"loc": list(error["loc"][1:]), "msg": error["msg"], "type": error["type"]})
+
+    passed = [index for index in range(len(items)) if index not in failed]
+    food_logs = _food_logs_adapter.validate_python([items[index] for index in passed])
+    errors = [FoodLogBulkError(index=index, errors=item_errors) for index, item_errors in sorted(failed.items())]
+    return list(zip(passed, food_logs)), errors
+
+
+def import_food_logs(
+        *,
+        session: Session,
+        user_id: uuid.UUID,
+        lines: Iterable[str],
+        columns: Optional[dict[str, str]] = None,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        job: Optional[FoodLogImportJob] = None,
+        on_chunk: Optional[Callable[[FoodLogImportJob], None]] = None
+) -> FoodLogImportJob:
+    """
+    Import CSV lines as food logs of the user, `chunk_size` rows per transaction.
+    Progress is kept on `job`, passed to `on_chunk` after each write. Invalid rows are skipped and reported,
+    a failure stops the import with the chunks written so far committed.
+    """
+    job = job or FoodLogImportJob(user_id=user_id)
+    job.status = "running"
+    job.started_at = datetime.now(timezone.utc)
+    try:
+        for chunk in read_chunks(lines, columns, chunk_size):
+            valid, errors = validate_food_logs(chunk)
+            rows = [{"id": uuid.uuid4(), "user_id": user_id, **food_log.model_dump()} for _, food_log in valid]
+            insert_food_log_rows(session=session, rows=rows, user_id=user_id)
+
+            for error in errors[:IMPORT_MAX_ERRORS - len(job.errors)]:
+                job.errors.append(FoodLogBulkError(index=job.rows_read + error.index, errors=error.errors))
+            job.rows_read += len(chunk)
+            job.imported += len(valid)
+            job.rejected += len(errors)
+            if on_chunk is not None:
+                on_chunk(job)
+    except Exception as exc:
+        job.status = "failed"
+        job.detail = str(exc)
+        raise
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+    job.status = "done"
+    return job
+
+
+def run_import_job(engine: Engine, job: FoodLogImportJob, path: Path,
+                   columns: Optional[dict[str, str]] = None) -> None:
+    """Import an uploaded file saved at `path` in the background, then delete it"""
+    try:
+        with Session(engine) as session, open(path, newline="", encoding="utf-8-sig") as lines:
+            import_food_logs(session=session, user_id=job.user_id, lines=lines, columns=columns, job=job)
+        logger.info("import %s: %d rows imported, %d rejected", job.id, job.imported, job.rejected)
+    except Exception:
+        logger.exception("import %s failed after %d rows", job.id, job.rows_read)
+    finally:
+        path.unlink(missing_ok=True)
+
+
+class ImportJobs:
+    """The most recent `max_size` import jobs of this process by id"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._jobs: OrderedDict[uuid.UUID, FoodLogImportJob] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, user_id: uuid.UUID) -> FoodLogImportJob:
+        job = FoodLogImportJob(user_id=user_id)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_size:
+                self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: uuid.UUID) -> Optional[FoodLogImportJob]:
+        return self._jobs.get(job_id)
+
+
+import_jobs = ImportJobs(IMPORT_JOBS_KEPT)
@@ -0,0 +1,285 @@
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from config.config import FOOD_INDEX_REFRESH_SECONDS
+from crud.food_item import iter_search_rows
+from models.food_item import FoodSearchHit
+
+# words of a name that start a prefix key, later words are only matched as part of a key
+MAX_KEY_WORDS = 4
+
+# most results a search returns
+MAX_LIMIT = 50
+
+# prefix ranges up to this many keys are ranked per query, the best results of wider ones are cached
+MAX_SCAN = 2_000
+
+# share of common trigrams (Jaccard) a misspelled word needs with a catalog word
+MIN_SIMILARITY = 0.3
+
+# catalog words tried as the correction of a misspelled query word
+MAX_CORRECTIONS = 3
+
+
+def normalize(text: str) -> str:
+    """Lower case ASCII words separated by single spaces"""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def trigrams(word: str) -> set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FoodSearchIndex:
+    """
+    In-process autocomplete over the active food catalog items.
+
+    Every normalized name is keyed from each of its first words ("chicken breast", "breast"),
+    and the keys are kept in one sorted list: a flattened prefix trie in which the names with
+    a word starting with the query are a single bisect range. Each key has a score, names
+    starting with the query first then shorter names, so a range is ranked with one NumPy
+    sort; the best results of ranges too wide for that are cached per prefix.
+    Misspelled words are corrected against the catalog's vocabulary with a trigram index
+    and searched again.
+
+    The index is loaded from the catalog on first use, then every `refresh_interval` seconds
+    picks up the items updated since. Updated and removed items are tombstoned and the index
+    is rebuilt once they make up a quarter of it. Searches hold the lock refreshes change
+    the index under, so a rebuild never swaps the lists out from under a running search.
+    """
+
+    def __init__(self, refresh_interval: float = FOOD_INDEX_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._checked_at = 0.0
+        self._clear()
+
+    def _clear(self) -> None:
+        # sorted keys ("chicken breast\x00{document}") with their documents and scores, replaced together
+        self._sorted: tuple[list[str], np.ndarray, np.ndarray] = ([], np.zeros(0, np.int32), np.zeros(0, np.int16))
+        self._broad: dict[str, list[int]] = {}
+        # per document, ids are None once removed
+        self._ids: list[Optional[uuid.UUID]] = []
+        self._names: list[str] = []
+        self._normalized: list[str] = []
+        self._servings: list[float] = []
+        self._calories: list[float] = []
+        self._documents: dict[uuid.UUID, int] = {}
+        self._removed = 0
+        # vocabulary for spelling corrections
+        self._words: dict[str, int] = {}
+        self._word_list: list[str] = []
+        self._word_trigrams = array("i")
+        self._postings: dict[str, array] = {}
+        self._synced_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    # Loading
+
+    def load(self, session: Session) -> None:
+        """Index every active item of the catalog, replacing the current contents"""
+        with self._lock:
+            self._load(session)
+
+    def _load(self, session: Session) -> None:
+        self._clear()
+        keys = []
+        for rows in iter_search_rows(session=session):
+            for row in rows:
+                keys.extend(self._add_document(row))
+        keys.sort()
+        self._sorted = (keys, *self._key_arrays(keys))
+        self._loaded = True
+        self._checked_at = time.monotonic()
+
+    def refresh(self, session: Session) -> int:
+        """Apply the catalog changes since the last load or refresh, returns the items changed"""
+        with self._lock:
+            if not self._loaded:
+                self._load(session)
+                return len(self)
+            changed, added = 0, []
+            for rows in iter_search_rows(session=session, updated_since=self._synced_at):
+                for row in rows:
+                    self._remove_document(row.id)
+                    if row.is_active:
+                        added.extend(self._add_document(row))
+                    changed += 1
+            self._checked_at = time.monotonic()
+            if self._removed * 4 > len(self._ids):
+                self._load(session)
+            elif changed:
+                self._insert_keys(sorted(added))
+            return changed
+
+    def load_in_background(self, engine: Engine) -> threading.Thread:
+        """Load at startup without holding up the first requests, which wait for it only if they search"""
+        def load() -> None:
+            with Session(engine) as session:
+                self.load(session)
+
+        thread = threading.Thread(target=load, name="food-search-load", daemon=True)
+        thread.start()
+        return thread
+
+    def _add_document(self, row) -> list[str]:
+        document = len(self._ids)
+        normalized = normalize(row.name)
+        self._ids.append(row.id)
+        self._names.append(row.name)
+        self._normalized.append(normalized)
+        self._servings.append(row.serving_grams)
+        self._calories.append(row.calories)
+        self._documents[row.id] = document
+        if self._synced_at is None or row.updated_at > self._synced_at:
+            self._synced_at = row.updated_at
+
+        words = normalized.split(" ")
+        for word in words:
+            # numbers are matched as typed, never corrected
+            if word not in self._words and not word.isdigit():
+                self._add_word(word)
+        return [f"{' '.join(words[start:])}\0{document}" for start in range(min(len(words), MAX_KEY_WORDS))
+                if words[start]]
+
+    def _add_word(self, word: str) -> None:
+        self._words[word] = len(self._word_list)
+        grams = trigrams(word)
+        for gram in grams:
+            self._postings.setdefault(gram, array("i")).append(len(self._word_list))
+        self._word_list.append(word)
+        self._word_trigrams.append(len(grams))
+
+    def _remove_document(self, item_id: uuid.UUID) -> None:
+        document = self._documents.pop(item_id, None)
+        if document is not None:
+            self._ids[document] = None
+            self._removed += 1
+
+    def _key_arrays(self, keys: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Document and score of every key: the name's length, plus 128 unless the key is the whole name"""
+        separators = [key.rindex("\0") for key in keys]
+        documents = np.fromiter((int(key[separator + 1:]) for key, separator in zip(keys, separators)),
+                                dtype=np.int32, count=len(keys))
+        name_lengths = np.fromiter((len(self._normalized[document]) for document in documents.tolist()),
+                                   dtype=np.int32, count=len(keys))
+        # later keys of a name are shorter than the name
+        partial = np.array(separators, dtype=np.int32) < name_lengths
+        return documents, (np.minimum(name_lengths, 127) + 128 * partial).astype(np.int16)
+
+    def _insert_keys(self, added: list[str]) -> None:
+        keys, documents, scores = self._sorted
+        positions = [bisect_left(keys, key) for key in added]
+        merged = list(keys)
+        for position, key in zip(reversed(positions), reversed(added)):
+            merged.insert(position, key)
+        added_documents, added_scores = self._key_arrays(added)
+        self._sorted = (merged, np.insert(documents, positions, added_documents),
+                        np.insert(scores, positions, added_scores))
+        self._broad = {}
+
+    # Searching
+
+    def search(self, session: Session, query: str, limit: int = 10) -> list[FoodSearchHit]:
+        """Items with words starting with the query's words, best first, else with the closest spelling"""
+        if not self._loaded or time.monotonic() - self._checked_at >= self.refresh_interval:
+            self.refresh(session)
+        query = normalize(query)
+        limit = min(limit, MAX_LIMIT)
+        if not query:
+            return []
+        with self._lock:
+            documents = self._matches(query, limit)
+            if len(documents) < limit:
+                for corrected in self._corrections(query):
+                    documents += [document for document in self._matches(corrected, limit)
+                                  if document not in documents]
+                    if len(documents) >= limit:
+                        break
+            return [FoodSearchHit.model_construct(id=self._ids[document], name=self._names[document],
+                                                  serving_grams=self._servings[document],
+                                                  calories=self._calories[document])
+                    for document in documents[:limit]]
+
+    def _matches(self, query: str, limit: int) -> list[int]:
+        # one sorted key list for the whole query
+        sorted_keys = self._sorted
+        # consecutive words as typed are one key prefix
+        documents = self._top(sorted_keys, query, limit)
+        words = query.split(" ")
+        if len(documents) < limit and len(words) > 1:
+            # in any order: every word's key range holds the matches, scan the narrowest
+            keys = sorted_keys[0]
+            ranges = [(bisect_left(keys, word), bisect_left(keys, word + "\uffff")) for word in words]
+            low, high = min(ranges, key=lambda bounds: bounds[1] - bounds[0])
+            if high - low <= MAX_SCAN:
+                for document in self._ranked(sorted_keys, low, high, high - low):
+                    name = f" {self._normalized[document]}"
+                    if document not in documents and all(f" {word}" in name for word in words):
+                        documents.append(document)
+                        if len(documents) == limit:
+                            break
+        return documents
+
+    def _top(self, sorted_keys: tuple, prefix: str, limit: int) -> list[int]:
+        keys = sorted_keys[0]
+        low, high = bisect_left(keys, prefix), bisect_left(keys, prefix + "\uffff")
+        if high - low <= MAX_SCAN:
+            return self._ranked(sorted_keys, low, high, limit)
+        broad = self._broad
+        if prefix not in broad:
+            broad[prefix] = self._ranked(sorted_keys, low, high, MAX_LIMIT)
+        return broad[prefix][:limit]
+
+    def _ranked(self, sorted_keys: tuple, low: int, high: int, limit: int) -> list[int]:
+        """The first `limit` live documents of a range of `sorted_keys` by score"""
+        _, key_documents, scores = sorted_keys
+        order = np.argsort(scores[low:high], kind="stable") + low
+        documents, seen = [], set()
+        for start in range(0, len(order), 256):
+            for document in key_documents[order[start:start + 256]].tolist():
+                if self._ids[document] is not None and document not in seen:
+                    seen.add(document)
+                    documents.append(document)
+                    if len(documents) == limit:
+                        return documents
+        return documents
+
+    def _corrections(self, query: str) -> list[str]:
+        """The query with its first unknown word replaced by the closest catalog words, closest first"""
+        words = query.split(" ")
+        for position, word in enumerate(words):
+            if word in self._words or word.isdigit():
+                continue
+            grams = trigrams(word)
+            postings = [self._postings[gram] for gram in grams if gram in self._postings]
+            if not postings:
+                return []
+            shared = np.bincount(np.concatenate([np.frombuffer(posting, dtype=np.int32) for posting in postings]))
+            candidates = np.flatnonzero(shared)
+            counts = np.frombuffer(self._word_trigrams, dtype=np.int32)[candidates]
+            similarity = shared[candidates] / (len(grams) + counts - shared[candidates])
+            best = np.argsort(-similarity, kind="stable")[:MAX_CORRECTIONS]
+            return [" ".join(words[:position] + [self._word_list[candidates[index]]] + words[position + 1:])
+                    for index in best if similarity[index] >= MIN_SIMILARITY]
+        return []
+
+
+food_index = FoodSearchIndex()
@@ -0,0 +1,98 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+import joblib
+import pandas as pd
+
+from service.feature_encoder import FeatureEncoder
+
+
+class InferencePoolFull(RuntimeError):
+    """Raised when the pool already has `max_pending` predictions queued or running"""
+
+
+# Per worker process state: how it memory-maps artifacts, the model version it last loaded
+# and its pipeline and encoder
+_mmap_mode: Optional[str] = "r"
+_model_key: Optional[tuple[str, str]] = None
+_pipeline = None
+_encoder: Optional[FeatureEncoder] = None
+
+
+def _init_worker(mmap_mode: Optional[str]) -> None:
+    global _mmap_mode
+    _mmap_mode = mmap_mode
+
+
+def _load(model_file: str, version: str) -> None:
+    global _model_key, _pipeline, _encoder
+    _pipeline = joblib.load(model_file, mmap_mode=_mmap_mode)["pipeline"]
+    _encoder = FeatureEncoder.compile(_pipeline)
+    _model_key = (model_file, version)
+
+
+def _predict(model_file: str, version: str, payload: Any) -> list:
+    """Run in a worker: raw DataFrames go through the pipeline, encoded rows to the estimator"""
+    if (model_file, version) != _model_key:
+        # first task, or a new model version was published since the last one
+        _load(model_file, version)
+    if isinstance(payload, pd.DataFrame) or _encoder is None:
+        return list(_pipeline.predict(payload))
+    return list(_encoder.predict(payload))
+
+
+class InferencePool:
+    """
+    Runs model inference in dedicated worker processes, so sklearn holds their GIL
+    instead of the one shared by the request threads.
+
+    Every worker loads a model version once, on the first task that names its artifact,
+    so hot-swapped versions reach the workers without a restart. At most `max_pending` predictions
+    may be queued or running; beyond that `submit` raises `InferencePoolFull` instead of
+    letting the queue grow without bound. Workers load artifacts with `mmap_mode`, as
+    `ModelRegistry` does.
+    """
+
+    def __init__(self, workers: int, max_pending: int, mmap_mode: Optional[str] = "r"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.mmap_mode = mmap_mode
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.mmap_mode,),
+                )
+            return self._executor
+
+    def submit(self, model_file: Path, version: str, payload: Any) -> Future:
+        """Queue a prediction with the given model version; resolves to the list of predicted labels"""
+        if not self._slots.acquire(blocking=False):
+            raise InferencePoolFull(f"{self.max_pending} predictions already pending")
+        try:
+            future = self._get_executor().submit(_predict, str(model_file), version, payload)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def predict(self, model_file: Path, version: str, payload: Any) -> list:
+        return await asyncio.wrap_future(self.submit(model_file, version, payload))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,111 @@
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import Callable
+
+import numpy as np
+
+
+class _Request:
+    __slots__ = ("features", "future", "enqueued_at")
+
+    def __init__(self, features: np.ndarray):
+        self.features = features
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class InferenceScheduler:
+    """
+    Coalesces concurrent single-row predictions into batched model calls.
+
+    `submit` queues one encoded feature row and returns a future. A worker thread takes
+    the oldest request, keeps collecting until `max_batch_size` rows are queued or
+    `max_wait_ms` has passed since that request arrived, then runs `predict_batch` once
+    on the stacked rows and resolves every future with its own row of the result.
+    """
+
+    def __init__(self, predict_batch: Callable[[np.ndarray], np.ndarray],
+                 max_batch_size: int = 64, max_wait_ms: float = 2.0, wait_samples: int = 10_000):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: queue.Queue[_Request] = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: Counter = Counter()
+        self._waits = deque(maxlen=wait_samples)
+        self._requests = 0
+        self._batches = 0
+
+    def submit(self, features: np.ndarray) -> Future:
+        """Queue one encoded row (shape (1, n_features)) for prediction"""
+        self._ensure_started()
+        request = _Request(features)
+        self._queue.put(request)
+        return request.future
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> list[_Request]:
+        first = self._queue.get()
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            started_at = time.perf_counter()
+            self._record(batch, started_at)
+            try:
+                predictions = self.predict_batch(np.vstack([request.features for request in batch]))
+            except Exception as exc:
+                for request in batch:
+                    request.future.set_exception(exc)
+                continue
+            for request, prediction in zip(batch, predictions):
+                request.future.set_result(prediction)
+
+    def _record(self, batch: list[_Request], started_at: float) -> None:
+        bucket = 1
+        while bucket < len(batch):
+            bucket *= 2
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._batch_sizes[min(bucket, self.max_batch_size)] += 1
+            self._waits.extend((started_at - request.enqueued_at) * 1000 for request in batch)
+
+    def stats(self) -> dict:
+        """Batch-size distribution (power-of-two buckets) and queue wait percentiles in ms"""
+        with self._stats_lock:
+            waits = np.array(self._waits)
+            return {
+                "requests": self._requests,
+                "batches": self._batches,
+                "mean_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "batch_size_distribution": {f"<={size}": count for size, count in sorted(self._batch_sizes.items())},
+                "queue_wait_ms": {
+                    "p50": round(float(np.percentile(waits, 50)), 3) if waits.size else 0.0,
+                    "p95": round(float(np.percentile(waits, 95)), 3) if waits.size else 0.0,
+                    "p99": round(float(np.percentile(waits, 99)), 3) if waits.size else 0.0,
+                    "max": round(float(waits.max()), 3) if waits.size else 0.0,
+                },
+                "pending": self._queue.qsize(),
+            }
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import joblib
+
+from service.feature_encoder import FeatureEncoder
+
+
+def _resident_bytes() -> Optional[int]:
+    """Resident set size of this process, None where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class LoadedModel:
+    """One loaded model version with the artifacts derived from it"""
+
+    def __init__(self, version: str, path: Path, model: dict, load_seconds: float,
+                 resident_bytes: Optional[int]):
+        self.version = version
+        self.path = path
+        self.model = model
+        # None when the pipeline has steps the encoder can't replay, predictions then use pandas
+        self.encoder = FeatureEncoder.compile(model["pipeline"])
+        self.load_seconds = load_seconds
+        self.resident_bytes = resident_bytes
+        self.loaded_at = datetime.now(timezone.utc)
+
+    @property
+    def pipeline(self) -> Any:
+        return self.model["pipeline"]
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "path": str(self.path),
+            "artifact_bytes": self.path.stat().st_size if self.path.exists() else None,
+            "load_seconds": round(self.load_seconds, 4),
+            "resident_bytes": self.resident_bytes,
+            "loaded_at": self.loaded_at.isoformat(),
+        }
+
+
+class ModelRegistry:
+    """
+    Lazily loads the diet model and hot-swaps it when a new version is published.
+
+    Versions live in sub directories of `root`, each holding `artifact_name`; the
+    directory with the greatest name is the current version, e.g.
+    `ml_model/2025-06-01/meal_plan_pipeline.joblib`. Without version directories the
+    artifact in `root` itself is used, versioned by a hash of its content.
+
+    Publish a version by writing its directory under a temporary name and renaming it
+    into place, the registry only picks up directories that already hold the artifact.
+    `mmap_mode` is passed to `joblib.load` so processes loading the same version share
+    the pages of its numpy arrays.
+    """
+
+    def __init__(self, root: Path, artifact_name: str, mmap_mode: Optional[str] = "r",
+                 check_interval: float = 30.0):
+        self.root = root
+        self.artifact_name = artifact_name
+        self.mmap_mode = mmap_mode
+        self.check_interval = check_interval
+        self._current: Optional[LoadedModel] = None
+        self._history: list[dict] = []
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> LoadedModel:
+        """The current model, loading it on first use and after a new version appears"""
+        current = self._current
+        if current is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return current
+        with self._lock:
+            if self._current is None or time.monotonic() - self._checked_at >= self.check_interval:
+                self._refresh()
+            return self._current
+
+    def reload(self) -> LoadedModel:
+        """Check for a new version right away"""
+        with self._lock:
+            self._refresh()
+            return self._current
+
+    def _refresh(self) -> None:
+        self._checked_at = time.monotonic()
+        version, path = self._discover()
+        if self._current is not None and self._current.version == version:
+            return
+        # the previous version keeps serving until the new one is fully loaded
+        self._current = self._load(version, path)
+        self._history.append(self._current.stats())
+
+    def _discover(self) -> tuple[str, Path]:
+        versions = sorted(
+            (entry.name for entry in self.root.iterdir()
+             if entry.is_dir() and not entry.name.startswith(".") and (entry / self.artifact_name).is_file()),
+            reverse=True,
+        ) if self.root.is_dir() else []
+        if versions:
+            return versions[0], self.root / versions[0] / self.artifact_name
+
+        path = self.root / self.artifact_name
+        if not path.exists():
+            raise FileNotFoundError(f"Model file not found at {path}")
+        if self._current is not None and self._current.path == path \
+                and self._current.loaded_at.timestamp() >= path.stat().st_mtime:
+            return self._current.version, path
+        return hashlib.sha256(path.read_bytes()).hexdigest()[:12], path
+
+    def _load(self, version: str, path: Path) -> LoadedModel:
+        resident_before = _resident_bytes()
+        started_at = time.perf_counter()
+        model = joblib.load(path, mmap_mode=self.mmap_mode)
+        load_seconds = time.perf_counter() - started_at
+        resident_after = _resident_bytes()
+        resident = resident_after - resident_before if resident_before is not None and resident_after is not None else None
+        return LoadedModel(version, path, model, load_seconds, resident)
+
+    def stats(self) -> dict:
+        """Load time and resident size of every version loaded by this process"""
+        return {
+            "current": self._current.version if self._current is not None else None,
+            "loaded": list(self._history),
+        }
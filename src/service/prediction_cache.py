@@ -0,0 +1,93 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import numpy as np
+
+from core.config import configs
+
+
+class _LRUTTLCache:
+    """
+    Bounded LRU map whose entries also expire `ttl` seconds after they were stored.
+    """
+
+    def __init__(self, max_size: int, ttl: float, clock: Callable[[], float]):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[object]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self.clock():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value: object) -> None:
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class PredictionCache:
+    """
+    Diet predictions by fingerprint of the encoded feature vector and model version, shared by
+    every user with identical inputs. Never stale: changed inputs have another fingerprint.
+    A user's latest prediction is stored in dietprediction instead, see crud.diet_prediction.
+    """
+
+    def __init__(self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self._features = _LRUTTLCache(max_size, ttl, clock)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(features: np.ndarray, model_version: str) -> str:
+        digest = hashlib.blake2b(np.ascontiguousarray(features).tobytes(), digest_size=16)
+        digest.update(model_version.encode())
+        return digest.hexdigest()
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        with self._lock:
+            return self._features.get(fingerprint)
+
+    def put(self, fingerprint: str, prediction: str) -> None:
+        with self._lock:
+            self._features.put(fingerprint, prediction)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._features.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"features": self._features.stats()}
+
+
+prediction_cache = PredictionCache(
+    max_size=configs.PREDICTION_CACHE_SIZE,
+    ttl=configs.PREDICTION_CACHE_TTL_SECONDS,
+)
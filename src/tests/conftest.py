@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+# register every table on the shared metadata
+from src.models.user import User  # noqa: F401
+from models.food_log import FoodLog  # noqa: F401
+from models.user_details import UserDetails  # noqa: F401
+from models.user_features import UserFeatures  # noqa: F401
+from models.diet_prediction import DietPrediction  # noqa: F401
+from models.food_log_daily import FoodLogDaily  # noqa: F401
+from models.food_item import FoodItem  # noqa: F401
+from models.food_name import FoodName  # noqa: F401
+
+
+@pytest.fixture
+def db_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    with Session(db_engine) as session:
+        yield session
+
+
+@pytest.fixture
+def db_user(db_session):
+    user = User(email="features@example.com", hashed_password="hashed")
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+@pytest.fixture
+def round_trips(db_engine):
+    """SQL statements and commits sent to the test database, in order"""
+    sent = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement.split(None, 1)[0].upper())
+
+    def on_commit(conn):
+        sent.append("COMMIT")
+
+    event.listen(db_engine, "before_cursor_execute", on_execute)
+    event.listen(db_engine, "commit", on_commit)
+    yield sent
+    event.remove(db_engine, "before_cursor_execute", on_execute)
+    event.remove(db_engine, "commit", on_commit)
@@ -0,0 +1,50 @@
+import json
+
+from benchmarks import food_dimension, food_history, food_search
+from benchmarks.inference import compare, run
+from benchmarks.synthetic import ENUM_FIELDS, user_details
+
+
+def test_synthetic_users_cover_every_enum_member():
+    users = user_details(max(len(enum) for enum in ENUM_FIELDS.values()), seed=3)
+
+    for field, enum in ENUM_FIELDS.items():
+        assert {getattr(user, field) for user in users} == set(enum)
+    assert all(user.bmi for user in users)
+
+
+def test_run_reports_json_results():
+    results = run(iterations=5, warmup=1, batch_sizes=[1, 8], min_seconds=0, load_repeats=1)
+
+    json.dumps(results)
+    assert set(results["latency"]) == {"predict", "predict_dataframe", "preprocess_input", "get_bmi_class"}
+    assert results["latency"]["predict"]["calls"] == 5
+    assert set(results["throughput"]) == {"1", "8"}
+    assert results["cold_load"]["mmap"]["p50_ms"] > 0
+
+    changes = compare(results, results)
+    assert changes["latency.predict.p99_ms"] == 0
+    assert changes["throughput.8.rows_per_second"] == 0
+
+
+def test_food_history_benchmark_reports_both_paths():
+    results = food_history.run(rows=200, repeats=1)
+
+    json.dumps(results)
+    assert results["orm"]["peak_bytes"] > 0 and results["columnar"]["column_bytes"] == 200 * (4 + 1 + 12 * 8)
+
+
+def test_food_search_benchmark_times_every_query_kind():
+    results = food_search.run(items=500, repeats=1)
+
+    json.dumps(results)
+    assert results["prefix"]["queries"] == len(food_search.PREFIX_QUERIES)
+    assert results["fuzzy"]["p50_ms"] > 0
+
+
+def test_food_dimension_benchmark_reports_both_layouts():
+    results = food_dimension.run(rows=500, foods=20, repeats=1)
+
+    json.dumps(results)
+    assert results["before"]["table_bytes"] > results["after"]["table_bytes"] > 0
+    assert results["after"]["top_foods_all_ms"] > 0
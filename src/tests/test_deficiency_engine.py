@@ -0,0 +1,95 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from api.v1.endpoints.food_log import get_nutrition_summary
+from service.deficiency_engine import NUTRIENTS, DeficiencyScores, score_cohort, score_user
+from tests.test_predict_all import add_user
+from tests.test_user_features import log_food
+from utils.recommendations import get_food_recommendations
+
+
+def test_scores_are_vectorized_over_users():
+    average = np.array([
+        [2000, 50, 70, 300, 30, 50, 2300, 4700, 18, 1000, 3000, 90],
+        [1000, 10, 70, 300, 0, 50, 2300, 4700, 18, 1000, 3000, 90],
+    ], dtype=float)
+
+    scores = DeficiencyScores([1, 2], average)
+
+    assert not scores.deficient[0].any()
+    assert scores.flags(1) == {f"{nutrient}_deficient": int(nutrient in ("calories", "protein", "fiber"))
+                               for nutrient in NUTRIENTS if nutrient not in ("sugar", "sodium")}
+    assert scores.report(1)["severity"]["protein"] == 0.8
+    assert get_food_recommendations(scores.flags(1)).keys() == {"calories", "protein", "fiber"}
+
+
+def test_upper_limits_are_in_excess_never_deficient():
+    average = np.array([
+        [2000, 50, 70, 300, 30, 0, 100, 4700, 18, 1000, 3000, 90],
+        [2000, 50, 70, 300, 30, 75, 2300, 4700, 18, 1000, 3000, 90],
+    ], dtype=float)
+
+    scores = DeficiencyScores([1, 2], average)
+
+    assert not scores.deficient.any()
+    report = scores.report(0)
+    assert "sodium_deficient" not in report["deficiencies"]
+    assert report["excesses"] == {"sugar_excess": 0, "sodium_excess": 0}
+    assert report["severity"]["sodium"] == 0
+    assert scores.report(1)["excesses"] == {"sugar_excess": 1, "sodium_excess": 0}
+    assert scores.report(1)["severity"]["sugar"] == 0.5
+    assert scores.cohort_report()["excess"] == {"sugar": 1, "sodium": 0}
+
+
+def test_score_user_averages_latest_window(db_session, db_user):
+    log_food(db_session, db_user.id, date(2025, 5, 1), 5000, protein=500)  # outside the window
+    log_food(db_session, db_user.id, date(2025, 6, 1), 1000, protein=40, iron=20)
+    log_food(db_session, db_user.id, date(2025, 6, 1), 1000, protein=40)
+    log_food(db_session, db_user.id, date(2025, 6, 7), 2000, protein=20)
+
+    (date_from, date_to), scores = score_user(db_session, db_user.id)
+
+    assert (date_from, date_to) == (date(2025, 6, 1), date(2025, 6, 7))
+    report = scores.report()
+    assert report["average"]["calories"] == 2000
+    assert report["average"]["protein"] == 50
+    assert report["deficiencies"]["iron_deficient"] == 1
+    assert report["deficiencies"]["protein_deficient"] == 0
+
+
+def test_score_cohort(db_session):
+    users = [add_user(db_session, seed, food_logs=0) for seed in range(3)]
+    log_food(db_session, users[0].id, date(2025, 6, 7), 2000, protein=60)
+    log_food(db_session, users[1].id, date(2025, 6, 6), 500, protein=5)
+
+    report = score_cohort(db_session, as_of=date(2025, 6, 7)).cohort_report()
+
+    assert report["users"] == 2
+    assert report["deficient"]["protein"] == 1
+    assert report["deficient"]["calories"] == 1
+    assert report["deficient"]["iron"] == 2
+
+
+def test_summary_windows_in_one_statement(db_session, db_user, round_trips):
+    log_food(db_session, db_user.id, date(2025, 3, 9), 50000)  # outside every window
+    log_food(db_session, db_user.id, date(2025, 4, 1), 9000)  # in the 90 day window only
+    log_food(db_session, db_user.id, date(2025, 5, 10), 600, protein=30)
+    log_food(db_session, db_user.id, date(2025, 6, 1), 1000, protein=40)
+    log_food(db_session, db_user.id, date(2025, 6, 7), 2000, protein=20)
+    db_session.refresh(db_user)
+    round_trips.clear()
+
+    summary = get_nutrition_summary(session=db_session, current_user=db_user, windows="7,30,90")
+
+    # the user's aggregates for the latest log date, then every window summed at once
+    assert round_trips == ["SELECT", "SELECT"]
+    assert [(window["days"], window["days_logged"]) for window in summary["windows"]] == [(7, 2), (30, 3), (90, 4)]
+    assert [window["average"]["calories"] for window in summary["windows"]] == [1500, 1200, 3150]
+    assert summary["windows"][1]["date_from"] == date(2025, 5, 9)
+    assert summary["average"] == summary["windows"][0]["average"]
+
+    with pytest.raises(HTTPException):
+        get_nutrition_summary(session=db_session, current_user=db_user, windows="7,a")
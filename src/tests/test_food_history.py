@@ -0,0 +1,57 @@
+from datetime import date
+
+import numpy as np
+
+from api.v1.endpoints.food_log import get_nutrition_summary, read_trends
+from crud.food_log import create_food_log
+from crud.food_log_daily import get_nutrient_trends
+from models.food_log import FoodLogCreate
+from service.food_history import FoodHistory
+from tests.test_user_features import log_food
+
+
+def log_history(session, user_id):
+    log_food(session, user_id, date(2025, 5, 30), 400, protein=10, iron=3)
+    log_food(session, user_id, date(2025, 6, 1), 300, protein=20)
+    log_food(session, user_id, date(2025, 6, 1), 500)
+    log_food(session, user_id, date(2025, 6, 2), 700, protein=30)
+
+
+def test_columns_match_the_rollup(db_session, db_user):
+    log_history(db_session, db_user.id)
+    history = FoodHistory.load(db_session, db_user.id)
+
+    assert len(history) == 4 and history.days.dtype == np.int32
+    assert history.dates[0] == np.datetime64("2025-05-30")
+    assert np.isnan(history.values["iron"][1:]).all()
+    assert history.nbytes < 4 * 20 * 8
+
+    for bucket in ("day", "week", "month"):
+        starts, days_logged, totals = history.grouped(["calories", "iron"], bucket)
+        expected = get_nutrient_trends(session=db_session, user_id=db_user.id, date_from=date(2025, 1, 1),
+                                       date_to=date(2025, 12, 31), nutrients=["calories", "iron"], bucket=bucket)
+        assert starts.tolist() == expected[0]
+        np.testing.assert_array_equal(days_logged, expected[1])
+        np.testing.assert_array_equal(totals, expected[2])
+
+    days, totals = history.window_totals(date(2025, 6, 2), [2, 7], ["calories", "protein"])
+    np.testing.assert_array_equal(days, [2, 3])
+    np.testing.assert_array_equal(totals, [[1500, 50], [1900, 60]])
+
+    breakfasts = history.select(date_from=date(2025, 6, 1), meal_type="breakfast")
+    assert breakfasts.values["calories"].tolist() == [300, 500, 700]
+
+
+def test_meal_type_summaries_use_columns(db_session, db_user):
+    log_history(db_session, db_user.id)
+    create_food_log(session=db_session, user_id=db_user.id, food_log=FoodLogCreate(
+        log_date=date(2025, 6, 2), food="Rice", meal_type="lunch", calories=1000))
+
+    summary = get_nutrition_summary(session=db_session, current_user=db_user, windows="7", meal_type="lunch")
+    assert summary["windows"][0]["days_logged"] == 1
+    assert summary["average"]["calories"] == 1000
+
+    trends = read_trends(session=db_session, current_user=db_user, meal_type="breakfast",
+                         date_from=date(2025, 5, 1), date_to=date(2025, 6, 30))
+    assert trends.dates == [date(2025, 5, 30), date(2025, 6, 1), date(2025, 6, 2)]
+    assert trends.values["calories"] == [400, 800, 700]
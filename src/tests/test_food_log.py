@@ -1,8 +1,17 @@
 import uuid
 import pytest
 from unittest.mock import MagicMock, patch
-from models.food_log import FoodLogCreate
-from crud.food_log import create_food_log
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlmodel import select
+
+from models.food_log import FoodLog, FoodLogCreate, FoodLogPublic, FoodLogUpdate
+from models.food_name import FoodName
+from models.user_details import UserDetailsCreate
+from crud.food_log import create_food_log, get_top_foods, update_food_log
+from crud.food_name import food_name_ids
+from crud.user_details import create_user_details
 
 
 @pytest.fixture
@@ -35,25 +44,83 @@ def test_create_food_log(mock_session):
         fat=0.3
     )
 
-    # Patch FoodLog.model_validate to return a mock FoodLog instance
-    with patch("crud.food_log.FoodLog") as MockFoodLog, \
-         patch("crud.food_log.update_user_nutrition_summary") as mock_update_summary:
+    mock_session.get_bind.return_value.dialect.name = "sqlite"
 
-        mock_food_log_instance = make_mock_food_log(user_id=user_id, food="Banana", calories=100)
-        MockFoodLog.model_validate.return_value = mock_food_log_instance
+    with patch("crud.food_log.food_name_ids") as mock_food_name_ids, \
+         patch("crud.food_log.food_log_delta_statement") as mock_delta, \
+         patch("crud.food_log.update_user_nutrition_summary") as mock_update_summary, \
+         patch("crud.food_log.make_transient_to_detached"):
 
+        mock_food_name_ids.get.return_value = {"Banana": 7}
         result = create_food_log(session=mock_session, food_log=food_log_data, user_id=user_id)
 
-        # Ensure model_validate was called with the FoodLogCreate and user_id in update
-        MockFoodLog.model_validate.assert_called_once_with(food_log_data, update={"user_id": user_id})
+        assert result.user_id == user_id
+        assert result.food == "Banana"
 
-        # Assert session methods called correctly
-        mock_session.add.assert_called_once_with(mock_food_log_instance)
+        # the log insert, daily rollup and aggregate deltas, committed once and never read back
+        assert mock_session.execute.call_count == 3
+        mock_delta.assert_called_once()
         mock_session.commit.assert_called_once()
-        mock_session.refresh.assert_called_once_with(mock_food_log_instance)
+        mock_session.refresh.assert_not_called()
+        mock_session.add.assert_called_once_with(result)
 
         # update_user_nutrition_summary should be called once with session and user_id
         mock_update_summary.assert_called_once_with(mock_session, user_id)
 
-        # Result should be the mocked FoodLog instance
-        assert result == mock_food_log_instance
+
+def test_create_food_log_round_trips(db_session, db_user, round_trips):
+    create_user_details(session=db_session, user_details=UserDetailsCreate(height_cm=175, weight_kg=70),
+                        user_id=db_user.id)
+    food_log = FoodLogCreate(log_date="2025-06-01", food="Banana", meal_type="breakfast", calories=100)
+    user_id = db_user.id
+    # interned by an earlier log, new names cost an INSERT and a SELECT once
+    food_name_ids.get(db_session, ["Banana"])
+    round_trips.clear()
+
+    db_food_log = create_food_log(session=db_session, food_log=food_log, user_id=user_id)
+    assert db_food_log.calories == 100
+
+    # log insert, daily rollup and aggregate upserts, details update and the commit; reading the result costs nothing.
+    # The insert used to be committed and refreshed, then the summary scanned every log of the user,
+    # read and updated the details, committed and refreshed again
+    assert round_trips == ["INSERT", "INSERT", "INSERT", "UPDATE", "COMMIT"]
+
+
+def test_create_food_log_is_one_statement_on_postgres():
+    session = MagicMock()
+    session.get_bind.return_value.dialect = postgresql.dialect()
+    food_log = FoodLogCreate(log_date="2025-06-01", food="Banana", meal_type="breakfast", calories=100)
+
+    with patch("crud.food_log.food_name_ids") as food_name_ids:
+        food_name_ids.get.return_value = {"Banana": 7}
+        create_food_log(session=session, food_log=food_log, user_id=uuid.uuid4())
+
+    session.execute.assert_called_once()
+    sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH log AS")
+    assert "INSERT INTO foodlog" in sql
+    assert "INSERT INTO foodlog_daily" in sql
+    assert "ON CONFLICT (user_id) DO UPDATE" in sql and "RETURNING" in sql
+    assert "UPDATE userdetails SET" in sql
+    session.commit.assert_called_once()
+
+
+def test_food_names_are_interned_and_meal_types_coded(db_session, db_user):
+    for food, meal_type in [("Banana", "breakfast"), ("Rice", "dinner"), ("Banana", "snack"), ("Banana", "lunch")]:
+        create_food_log(session=db_session, user_id=db_user.id,
+                        food_log=FoodLogCreate(log_date="2025-06-01", food=food, meal_type=meal_type, calories=100))
+    user_id = db_user.id
+    db_session.expunge_all()
+
+    assert sorted(db_session.exec(select(FoodName.name)).all()) == ["Banana", "Rice"]
+    stored = db_session.execute(text("SELECT meal_type FROM foodlog ORDER BY meal_type")).scalars().all()
+    assert stored == [0, 1, 2, 3]
+
+    logs = db_session.exec(select(FoodLog).where(FoodLog.meal_type == "snack")).all()
+    assert [(log.food, log.meal_type) for log in logs] == [("Banana", "snack")]
+    assert FoodLogPublic.model_validate(logs[0]).food == "Banana"
+
+    updated = update_food_log(session=db_session, db_food_log=logs[0], food_log_in=FoodLogUpdate(food="Apple"))
+    assert updated.food == "Apple"
+    assert [(food.food, food.log_count) for food in get_top_foods(session=db_session, user_id=user_id)] == \
+        [("Banana", 2), ("Apple", 1), ("Rice", 1)]
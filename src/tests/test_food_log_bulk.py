@@ -0,0 +1,54 @@
+from datetime import date
+
+from sqlmodel import select
+
+from crud.food_log import create_food_logs
+from crud.user_details import create_user_details
+from crud.user_features import get_user_features
+from models.food_log import FoodLog
+from models.food_log_daily import FoodLogDaily
+from models.user_details import UserDetails, UserDetailsCreate
+from service.food_log_import import validate_food_logs
+
+
+def meal(day, calories, **fields):
+    return {"log_date": f"2025-06-{day:02d}", "food": "Rice", "meal_type": "lunch", "calories": calories, **fields}
+
+
+def test_validation_reports_errors_per_item():
+    items = [meal(1, 300), meal(1, -5), "not a meal", meal(2, 400, meal_type="brunch"), meal(3, 500)]
+
+    valid, errors = validate_food_logs(items)
+
+    assert [index for index, _ in valid] == [0, 4]
+    assert [food_log.calories for _, food_log in valid] == [300, 500]
+    assert [error.index for error in errors] == [1, 2, 3]
+    assert errors[0].errors[0]["loc"] == ["calories"]
+
+
+def test_bulk_insert_updates_aggregates_once_per_day(db_session, db_user, round_trips):
+    create_user_details(session=db_session, user_details=UserDetailsCreate(height_cm=175, weight_kg=70),
+                        user_id=db_user.id)
+    user_id = db_user.id
+    valid, _ = validate_food_logs([meal(day, 100 * day, protein=day) for day in (3, 1, 2, 1, 3, 3)])
+    round_trips.clear()
+
+    food_logs = create_food_logs(session=db_session, food_logs=[food_log for _, food_log in valid], user_id=user_id)
+
+    # "Rice" is interned first, in its own transaction; then one multi-row insert, one upsert for the
+    # three days, one aggregate upsert and the details update
+    assert round_trips == ["INSERT", "SELECT", "COMMIT", "INSERT", "INSERT", "INSERT", "UPDATE", "COMMIT"]
+    assert len(food_logs) == 6 and food_logs[0].calories == 300 and food_logs[0].food == "Rice"
+
+    assert len(db_session.exec(select(FoodLog)).all()) == 6
+    days = {row.log_date: (row.log_count, row.calories) for row in db_session.exec(select(FoodLogDaily))}
+    assert days == {date(2025, 6, 1): (2, 200), date(2025, 6, 2): (1, 200), date(2025, 6, 3): (3, 900)}
+    features = get_user_features(session=db_session, user_id=user_id)
+    assert (features.food_log_count, features.total_calories, features.total_protein) == (6, 1300, 13)
+    assert (features.first_log_date, features.last_log_date) == (date(2025, 6, 1), date(2025, 6, 3))
+    assert db_session.exec(select(UserDetails)).one().calorie_intake == 1300
+
+    # known names are not looked up again
+    round_trips.clear()
+    create_food_logs(session=db_session, food_logs=[valid[0][1]], user_id=user_id)
+    assert round_trips == ["INSERT", "INSERT", "INSERT", "UPDATE", "COMMIT"]
@@ -0,0 +1,90 @@
+from datetime import date
+
+from sqlmodel import select
+
+from api.v1.endpoints.food_log import read_trends
+from crud.food_log import delete_food_log, update_food_log
+from crud.food_log_daily import backfill_daily
+from jobs.backfill_daily import run
+from models.food_log import FoodLogUpdate
+from models.food_log_daily import FoodLogDaily
+from tests.test_user_features import log_food
+
+
+def read_days(session, user_id):
+    session.expire_all()
+    rows = session.exec(select(FoodLogDaily).where(FoodLogDaily.user_id == user_id)
+                        .order_by(FoodLogDaily.log_date)).all()
+    return {row.log_date: (row.log_count, row.calories, row.protein, row.cholesterol) for row in rows}
+
+
+def test_writes_maintain_daily_rollup(db_session, db_user):
+    breakfast = log_food(db_session, db_user.id, date(2025, 6, 1), 300, protein=10, cholesterol=50)
+    log_food(db_session, db_user.id, date(2025, 6, 1), 500, protein=20)
+    dinner = log_food(db_session, db_user.id, date(2025, 6, 2), 700)
+
+    assert read_days(db_session, db_user.id) == {
+        date(2025, 6, 1): (2, 800, 30, 50),
+        date(2025, 6, 2): (1, 700, 0, 0),
+    }
+
+    update_food_log(session=db_session, db_food_log=breakfast, food_log_in=FoodLogUpdate(calories=350))
+    delete_food_log(session=db_session, db_food_log=dinner)
+
+    assert read_days(db_session, db_user.id) == {
+        date(2025, 6, 1): (2, 850, 30, 50),
+        date(2025, 6, 2): (0, 0, 0, 0),
+    }
+
+
+def test_moving_a_log_to_another_day_moves_it_between_rollup_rows(db_session, db_user):
+    lunch = log_food(db_session, db_user.id, date(2025, 6, 1), 300, protein=10, cholesterol=50)
+    log_food(db_session, db_user.id, date(2025, 6, 1), 500, protein=20)
+
+    # as a PATCH body is parsed
+    moved = FoodLogUpdate.model_validate({"log_date": "2025-06-02", "calories": 350})
+    update_food_log(session=db_session, db_food_log=lunch, food_log_in=moved)
+
+    assert lunch.log_date == date(2025, 6, 2)
+    assert read_days(db_session, db_user.id) == {
+        date(2025, 6, 1): (1, 500, 20, 0),
+        date(2025, 6, 2): (1, 350, 10, 50),
+    }
+
+
+def test_backfill_rebuilds_rollup(db_engine, db_session, db_user):
+    log_food(db_session, db_user.id, date(2025, 6, 1), 300, protein=10)
+    log_food(db_session, db_user.id, date(2025, 6, 3), 400)
+    maintained = read_days(db_session, db_user.id)
+
+    db_session.exec(select(FoodLogDaily)).first().calories = 1
+    db_session.commit()
+
+    assert backfill_daily(db_session, since=date(2025, 6, 2)) == 1
+    assert read_days(db_session, db_user.id)[date(2025, 6, 1)][1] == 1
+    assert run(engine=db_engine) == 2
+    assert read_days(db_session, db_user.id) == maintained
+
+
+def test_trends_are_bucketed_in_the_database(db_session, db_user):
+    log_food(db_session, db_user.id, date(2025, 6, 1), 300, protein=10)  # Sunday
+    log_food(db_session, db_user.id, date(2025, 6, 1), 500)
+    log_food(db_session, db_user.id, date(2025, 6, 2), 700, protein=30)  # Monday
+    log_food(db_session, db_user.id, date(2025, 7, 3), 100)
+
+    daily = read_trends(session=db_session, current_user=db_user, nutrients="calories,protein",
+                        date_from=date(2025, 6, 1), date_to=date(2025, 6, 30))
+    assert daily.dates == [date(2025, 6, 1), date(2025, 6, 2)]
+    assert daily.values == {"calories": [800, 700], "protein": [10, 30]}
+
+    weekly = read_trends(session=db_session, current_user=db_user, bucket="week", date_from=date(2025, 5, 1))
+    assert weekly.dates == [date(2025, 5, 26), date(2025, 6, 2), date(2025, 6, 30)]
+    assert weekly.days_logged == [1, 1, 1]
+
+    monthly = read_trends(session=db_session, current_user=db_user, bucket="month", nutrients="protein",
+                          date_from=date(2025, 1, 1))
+    assert (monthly.dates, monthly.values["protein"]) == ([date(2025, 6, 1), date(2025, 7, 1)], [20, 0])
+
+    # about three years of days are returned by week
+    wide = read_trends(session=db_session, current_user=db_user, date_from=date(2023, 1, 1))
+    assert wide.bucket == "week"
@@ -0,0 +1,35 @@
+import csv
+import io
+import json
+from datetime import date
+
+from api.v1.endpoints.food_log import export_food_logs
+from service.food_log_export import EXPORT_COLUMNS, export_food_logs as export_chunks
+from tests.test_user_features import log_food
+
+
+def test_exports_stream_in_chunks(db_engine, db_session, db_user):
+    for day in (2, 1, 3):
+        log_food(db_session, db_user.id, date(2025, 6, day), 100 * day, iron=day)
+    user_id = db_user.id
+
+    chunks = list(export_chunks(db_engine, "ndjson", user_id, chunk_size=2))
+    assert len(chunks) == 2
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [row["log_date"] for row in rows] == ["2025-06-01", "2025-06-02", "2025-06-03"]
+    assert rows[0]["calories"] == 100 and rows[0]["sodium"] is None and rows[0]["user_id"] == str(user_id)
+
+    rows = list(csv.reader(io.StringIO("".join(export_chunks(db_engine, "csv", chunk_size=2)))))
+    assert rows[0] == EXPORT_COLUMNS
+    assert [row[EXPORT_COLUMNS.index("calories")] for row in rows[1:]] == ["100.0", "200.0", "300.0"]
+
+
+def test_empty_csv_export_has_header(db_engine):
+    assert list(export_chunks(db_engine, "csv")) == [",".join(EXPORT_COLUMNS) + "\r\n"]
+
+
+def test_export_endpoint_streams(db_session, db_user):
+    response = export_food_logs(session=db_session, current_user=db_user, format="csv")
+
+    assert response.media_type == "text/csv"
+    assert response.headers["content-disposition"] == 'attachment; filename="food_logs.csv"'
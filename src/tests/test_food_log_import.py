@@ -0,0 +1,57 @@
+import io
+from datetime import date
+
+import pytest
+from sqlmodel import select
+
+from crud.user_features import get_user_features
+from jobs.import_food_logs import run
+from models.food_log import FoodLog
+from service.food_log_import import import_food_logs, map_columns
+
+DIARY = """Date,Meal,Food Name,Energy (kcal),Carbohydrates (g),Protein (g),Sodium (mg),Notes
+2025-06-01 08:10,Breakfast,Oats,300,50,10,,quick
+2025-06-01,Lunch,Rice,-5,80,5,200,
+2025-06-02,Brunch,Eggs,200,1,12,150,
+2025-06-02,dinner,Soup,400,30,20,900,
+2025-06-03T19:00:00,Snack,Apple,80,21,0,,
+"""
+
+
+def test_map_columns():
+    header = ["Date", "Meal", "Food Name", "Energy (kcal)", "Carbohydrates (g)", "Kilojoules", "Notes"]
+    assert map_columns(header) == ["log_date", "meal_type", "food", "calories", "carbs", None, None]
+    assert map_columns(["Day", "Item", "Type", "kJ"], {"Type": "meal_type", "kJ": "calories"}) == \
+        ["log_date", "food", "meal_type", "calories"]
+    with pytest.raises(ValueError, match="meal_type"):
+        map_columns(["Date", "Food", "Calories"])
+
+
+def test_import_writes_valid_rows_per_chunk(db_session, db_user):
+    user_id = db_user.id
+    progress = []
+
+    job = import_food_logs(session=db_session, user_id=user_id, lines=io.StringIO(DIARY), chunk_size=2,
+                           on_chunk=lambda job: progress.append(job.rows_read))
+
+    assert progress == [2, 4, 5]
+    assert (job.status, job.rows_read, job.imported, job.rejected) == ("done", 5, 3, 2)
+    assert [error.index for error in job.errors] == [1, 2]
+    assert job.errors[0].errors[0]["loc"] == ["calories"]
+
+    logs = db_session.exec(select(FoodLog).where(FoodLog.user_id == user_id).order_by(FoodLog.log_date)).all()
+    assert [(log.log_date, log.food, log.meal_type, log.sodium) for log in logs] == [
+        (date(2025, 6, 1), "Oats", "breakfast", None),
+        (date(2025, 6, 2), "Soup", "dinner", 900),
+        (date(2025, 6, 3), "Apple", "snack", None),
+    ]
+    assert get_user_features(session=db_session, user_id=user_id).food_log_count == 3
+
+
+def test_cli_import(tmp_path, db_engine, db_user):
+    path = tmp_path / "diary.csv"
+    path.write_text(DIARY.replace("Meal,", "Course,"))
+
+    job = run(path, db_user.id, {"Course": "meal_type"}, engine=db_engine)
+
+    assert job.imported == 3
@@ -0,0 +1,91 @@
+import os
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlmodel import Session, SQLModel
+
+from core.partitions import add_months, expired_months, partition_month, partition_name
+from crud.food_log import create_food_logs
+from jobs.food_log_partitions import run
+from models.food_log import FoodLog, FoodLogCreate
+from src.models.user import User
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+def test_month_arithmetic_and_names():
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2025, 1, 1), -13) == date(2023, 12, 1)
+    assert partition_name("foodlog", date(2025, 6, 1)) == "foodlog_p2025_06"
+    assert partition_month("foodlog", "foodlog_p2025_06") == date(2025, 6, 1)
+    assert partition_month("foodlog", "foodlog_default") is None
+    assert partition_month("foodlog", "foodlog_daily") is None
+
+
+def test_expired_months_keep_the_current_one_and_those_before():
+    months = [date(2024, month, 1) for month in range(1, 13)]
+    assert expired_months(months, keep_months=3, today=date(2024, 6, 30)) == months[:2]
+    assert expired_months(months, keep_months=0, today=date(2024, 1, 15)) == []
+
+
+def test_does_nothing_unless_partitioned(db_engine, db_session, db_user):
+    create_food_logs(session=db_session, user_id=db_user.id, food_logs=[
+        FoodLogCreate(log_date=date(2020, 1, 1), food="Rice", meal_type="lunch", calories=200)])
+
+    assert run(keep_months=0, engine=db_engine) == {"created": [], "detached": []}
+    assert db_session.scalar(select(func.count()).select_from(FoodLog)) == 1
+
+
+@pytest.fixture
+def pg_engine():
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    schema = f"partitions_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(POSTGRES_URL)
+    try:
+        with admin.begin() as conn:
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+    except Exception as exc:  # no server listening, wrong credentials...
+        admin.dispose()
+        pytest.skip(f"Postgres unavailable: {exc}")
+
+    engine = create_engine(POSTGRES_URL, connect_args={"options": f"-csearch_path={schema}"})
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {schema}_archive CASCADE"))
+    admin.dispose()
+
+
+def test_partitions_are_created_and_archived(pg_engine):
+    with Session(pg_engine) as session:
+        schema = session.execute(text("SELECT current_schema()")).scalar()
+        user_id = uuid.uuid4()
+        session.execute(insert(User), [{"id": user_id, "email": "partitions@example.com", "hashed_password": "x"}])
+        session.commit()
+        # before any partition exists every log goes to the DEFAULT one
+        create_food_logs(session=session, user_id=user_id, food_logs=[
+            FoodLogCreate(log_date=date(2024, month, 10), food="Rice", meal_type="lunch", calories=200)
+            for month in range(1, 13)])
+
+    result = run(months_ahead=1, today=date(2024, 12, 20), engine=pg_engine)
+    assert result["created"] == [f"foodlog_p2024_{month:02d}" for month in range(1, 13)] + ["foodlog_p2025_01"]
+
+    with pg_engine.connect() as connection:
+        def rows(table):
+            return connection.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+
+        assert rows("foodlog_default") == 0 and rows("foodlog_p2024_03") == 1
+
+        result = run(months_ahead=1, keep_months=6, archive_schema=f"{schema}_archive", today=date(2024, 12, 20),
+                     engine=pg_engine)
+        assert result == {"created": [], "detached": [f"foodlog_p2024_{month:02d}" for month in range(1, 6)]}
+        assert rows("foodlog") == 7 and rows(f"{schema}_archive.foodlog_p2024_01") == 1
+
+        # the user can still be deleted, archives keep no foreign keys
+        connection.execute(text("DELETE FROM foodlog"))
+        connection.execute(text('DELETE FROM "user"'))
@@ -0,0 +1,108 @@
+import threading
+import uuid
+from datetime import date
+
+import pytest
+from pydantic import ValidationError
+from sqlmodel import Session
+
+from api.v1.endpoints.food_log import create_food_log_from_catalog
+from crud.food_item import create_food_item, update_food_item, upsert_food_items
+from jobs.load_food_catalog import run
+from models.food_item import FoodItemCreate, FoodItemUpdate, FoodLogFromCatalog
+from service.food_search import FoodSearchIndex, normalize
+
+
+@pytest.fixture
+def index(db_session, db_engine):
+    run(engine=db_engine)
+    index = FoodSearchIndex(refresh_interval=0)
+    index.load(db_session)
+    return index
+
+
+def names(hits):
+    return [hit.name for hit in hits]
+
+
+def test_normalize():
+    assert normalize("  Crème Brûlée (Vanilla)-2 ") == "creme brulee vanilla 2"
+
+
+def test_prefix_search_ranks_name_starts_first(index, db_session):
+    assert names(index.search(db_session, "whole w", limit=5)) == ["Whole wheat bread", "Whole wheat pasta",
+                                                                   "Whole grains"]
+    # any word of the name may match, names starting with the query first
+    assert names(index.search(db_session, "BREAD", limit=1)) == ["Whole wheat bread"]
+    assert names(index.search(db_session, "pasta wh", limit=5)) == ["Whole wheat pasta"]
+    assert names(index.search(db_session, "b", limit=3)) == ["Beans", "Bananas", "Bok choy"]
+
+
+def test_fuzzy_search_finds_misspellings(index, db_session):
+    assert names(index.search(db_session, "spinnach", limit=1)) == ["Spinach"]
+    assert index.search(db_session, "xyzzy") == []
+    assert index.search(db_session, "  ") == []
+
+
+def test_refresh_applies_catalog_changes(index, db_session):
+    loaded = len(index)
+    item = create_food_item(session=db_session, food_item=FoodItemCreate(name="Crème fraîche", calories=290))
+    assert names(index.search(db_session, "creme")) == ["Crème fraîche"]
+
+    update_food_item(session=db_session, db_food_item=item, food_item_in=FoodItemUpdate(name="Sour cream"))
+    assert index.search(db_session, "creme") == []
+    assert names(index.search(db_session, "sour")) == ["Sour cream"]
+
+    update_food_item(session=db_session, db_food_item=item, food_item_in=FoodItemUpdate(is_active=False))
+    assert index.search(db_session, "sour") == []
+    assert len(index) == loaded
+
+
+def test_reloading_the_catalog_updates_items(index, db_session, db_engine):
+    loaded = len(index)
+    assert upsert_food_items(session=db_session, food_items=[FoodItemCreate(name="Spinach", calories=25)]) == 1
+    hits = index.search(db_session, "spinach")
+    assert len(index) == loaded and [hit.calories for hit in hits] == [25]
+
+
+def test_searches_run_safely_during_reloads(index, db_engine):
+    errors = []
+
+    def search():
+        with Session(db_engine) as session:
+            for _ in range(200):
+                try:
+                    hits = names(index.search(session, "whole w", limit=2))
+                    assert hits == ["Whole wheat bread", "Whole wheat pasta"]
+                except Exception as exc:  # collected, raised on the test thread
+                    errors.append(exc)
+
+    searches = [threading.Thread(target=search) for _ in range(4)]
+    for thread in searches:
+        thread.start()
+    with Session(db_engine) as session:
+        for _ in range(20):
+            index.load(session)
+    for thread in searches:
+        thread.join()
+
+    assert errors == []
+
+
+def test_log_from_catalog_scales_servings(index, db_session, db_user):
+    hit = index.search(db_session, "oats", limit=1)[0]
+    request = FoodLogFromCatalog(food_item_id=hit.id, log_date=date(2025, 6, 1), meal_type="breakfast", servings=0.5)
+
+    food_log = create_food_log_from_catalog(session=db_session, current_user=db_user, request=request)
+
+    assert (food_log.food, food_log.calories, food_log.sodium) == ("Oats", hit.calories / 2, 1)
+    assert food_log.cholesterol is None
+
+    # rejected with the request, a 422, not by the handler
+    with pytest.raises(ValidationError, match="Meal type must be one of"):
+        FoodLogFromCatalog(food_item_id=hit.id, log_date=date(2025, 6, 1), meal_type="brunch")
+    assert FoodLogFromCatalog(food_item_id=hit.id, log_date=date(2025, 6, 1), meal_type="Lunch").meal_type == "lunch"
+
+    with pytest.raises(Exception, match="does not exist"):
+        create_food_log_from_catalog(session=db_session, current_user=db_user,
+                                     request=request.model_copy(update={"food_item_id": uuid.uuid4()}))
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from prediction_engine import DietPredictor, diet_predictor
+from service import inference_pool
+from service.inference_pool import InferencePool, InferencePoolFull
+from tests.test_prediction_engine import make_user_details
+
+MODEL_FILE = Path(__file__).parent.parent / "ml_model" / "meal_plan_pipeline.joblib"
+
+
+@pytest.fixture
+def pool():
+    pool = InferencePool(workers=1, max_pending=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_predictions_match_in_process_predictions(pool):
+    details = make_user_details(1)
+    bmi_class = DietPredictor._get_bmi_class(details.bmi)
+    features = diet_predictor.encoder.encode(details, bmi=bmi_class)
+
+    assert pool.submit(MODEL_FILE, "v1", features).result(timeout=60) == [diet_predictor.predict(details, food_log_count=30)]
+    record = diet_predictor._dataframe_record(details, bmi_class)
+    assert pool.submit(MODEL_FILE, "v1", record).result(timeout=60) == [diet_predictor._predict_dataframe(details, bmi_class)]
+
+
+def test_pool_rejects_work_beyond_max_pending(pool):
+    features = diet_predictor.encoder.encode(make_user_details(2), bmi="normal")
+    first = pool.submit(MODEL_FILE, "v1", features)
+
+    with pytest.raises(InferencePoolFull):
+        pool.submit(MODEL_FILE, "v1", features)
+    first.result(timeout=60)
+
+
+@pytest.mark.parametrize("mmap_mode, array_type", [("r", np.memmap), (None, np.ndarray)])
+def test_workers_load_models_with_the_configured_mmap_mode(monkeypatch, mmap_mode, array_type):
+    # what a worker runs, in this process
+    for name in ("_mmap_mode", "_model_key", "_pipeline", "_encoder"):
+        monkeypatch.setattr(inference_pool, name, getattr(inference_pool, name))
+    inference_pool._init_worker(mmap_mode)
+    inference_pool._load(str(MODEL_FILE), "v1")
+
+    assert type(inference_pool._pipeline.steps[-1][1].final_estimator_.coef_) is array_type
@@ -0,0 +1,48 @@
+import threading
+
+import numpy as np
+import pytest
+
+from service.inference_scheduler import InferenceScheduler
+
+
+def test_concurrent_requests_are_coalesced_into_batches():
+    batch_sizes = []
+    release = threading.Event()
+
+    def predict_batch(features):
+        release.wait(1)
+        batch_sizes.append(len(features))
+        return features[:, 0] * 10
+
+    scheduler = InferenceScheduler(predict_batch, max_batch_size=4, max_wait_ms=200)
+    futures = [scheduler.submit(np.array([[float(i)]])) for i in range(8)]
+    release.set()
+
+    assert [future.result(timeout=2) for future in futures] == [i * 10 for i in range(8)]
+    assert batch_sizes == [4, 4]
+
+    stats = scheduler.stats()
+    assert stats["requests"] == 8
+    assert stats["batches"] == 2
+    assert stats["batch_size_distribution"] == {"<=4": 2}
+    assert stats["queue_wait_ms"]["max"] >= 0
+
+
+def test_lone_request_is_flushed_after_window():
+    scheduler = InferenceScheduler(lambda features: features[:, 0], max_batch_size=64, max_wait_ms=5)
+
+    assert scheduler.submit(np.array([[3.0]])).result(timeout=2) == 3.0
+    assert scheduler.stats()["batch_size_distribution"] == {"<=1": 1}
+
+
+def test_batch_errors_are_raised_to_every_caller():
+    def predict_batch(features):
+        raise ValueError("bad batch")
+
+    scheduler = InferenceScheduler(predict_batch, max_batch_size=2, max_wait_ms=50)
+    futures = [scheduler.submit(np.array([[1.0]])), scheduler.submit(np.array([[2.0]]))]
+
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=2)
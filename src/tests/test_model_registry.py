@@ -0,0 +1,66 @@
+import os
+
+import joblib
+import pytest
+
+from service.model_registry import ModelRegistry
+
+ARTIFACT = "meal_plan_pipeline.joblib"
+
+
+def publish(root, version, pipeline):
+    # written under a temporary name and renamed into place, like a real release
+    staging = root / f".{version}.tmp"
+    staging.mkdir()
+    joblib.dump({"pipeline": pipeline}, staging / ARTIFACT)
+    os.rename(staging, root / version)
+
+
+def test_model_is_loaded_lazily(tmp_path):
+    publish(tmp_path, "2025-06-01", "first")
+
+    registry = ModelRegistry(tmp_path, ARTIFACT)
+    assert registry.stats()["current"] is None
+
+    loaded = registry.current()
+    assert loaded.version == "2025-06-01"
+    assert loaded.pipeline == "first"
+    assert loaded.encoder is None
+
+
+def test_new_version_is_hot_swapped(tmp_path):
+    publish(tmp_path, "2025-06-01", "first")
+    registry = ModelRegistry(tmp_path, ARTIFACT, check_interval=3600)
+    registry.current()
+
+    publish(tmp_path, "2025-07-01", "second")
+    assert registry.current().version == "2025-06-01"
+
+    assert registry.reload().pipeline == "second"
+    stats = registry.stats()
+    assert stats["current"] == "2025-07-01"
+    assert [model["version"] for model in stats["loaded"]] == ["2025-06-01", "2025-07-01"]
+    assert all(model["load_seconds"] >= 0 for model in stats["loaded"])
+
+
+def test_incomplete_version_directory_is_ignored(tmp_path):
+    publish(tmp_path, "2025-06-01", "first")
+    (tmp_path / "2025-07-01").mkdir()
+
+    assert ModelRegistry(tmp_path, ARTIFACT).current().version == "2025-06-01"
+
+
+def test_flat_artifact_is_versioned_by_content(tmp_path):
+    joblib.dump({"pipeline": "first"}, tmp_path / ARTIFACT)
+    registry = ModelRegistry(tmp_path, ARTIFACT, mmap_mode=None, check_interval=0)
+    first = registry.current().version
+
+    assert registry.current().version == first
+    joblib.dump({"pipeline": "second"}, tmp_path / ARTIFACT)
+    os.utime(tmp_path / ARTIFACT, (registry.current().loaded_at.timestamp() + 1,) * 2)
+    assert registry.current().version != first
+
+
+def test_missing_model_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ModelRegistry(tmp_path, ARTIFACT).current()
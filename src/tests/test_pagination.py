@@ -0,0 +1,45 @@
+from datetime import date
+
+import pytest
+from sqlmodel import select
+
+from core.pagination import InvalidCursor, count_rows, encode_cursor, paginate
+from models.food_log import FoodLog
+from tests.test_user_features import log_food
+
+
+def test_cursor_pages_cover_every_row_once(db_session, db_user):
+    for day in (3, 1, 2, 1, 3, 2, 1):
+        log_food(db_session, db_user.id, date(2025, 6, day), 100 * day)
+    query = select(FoodLog).where(FoodLog.user_id == db_user.id)
+    order_by = [FoodLog.log_date, FoodLog.id]
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = paginate(db_session, query, order_by, limit=3, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    expected = db_session.exec(query.order_by(*order_by)).all()
+    assert [log.id for log in seen] == [log.id for log in expected]
+    assert len({log.id for log in seen}) == 7
+
+    # offsets still page the same order
+    page, _ = paginate(db_session, query, order_by, limit=3, skip=3)
+    assert [log.id for log in page] == [log.id for log in expected[3:6]]
+    assert count_rows(db_session, query) == (7, False)
+
+
+def test_empty_limit_gives_an_empty_last_page(db_session, db_user):
+    log_food(db_session, db_user.id, date(2025, 6, 1), 100)
+    query = select(FoodLog).where(FoodLog.user_id == db_user.id)
+
+    assert paginate(db_session, query, [FoodLog.log_date, FoodLog.id], limit=0) == ([], None)
+
+
+def test_invalid_cursor(db_session):
+    order_by = [FoodLog.log_date, FoodLog.id]
+    for cursor in ("not a cursor", encode_cursor([1]), encode_cursor(["yesterday", "x"])):
+        with pytest.raises(InvalidCursor):
+            paginate(db_session, select(FoodLog), order_by, limit=10, cursor=cursor)
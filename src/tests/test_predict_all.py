@@ -0,0 +1,96 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+from sqlmodel import select
+
+from crud.diet_prediction import get_fresh_prediction, save_predictions
+from crud.user_details import create_user_details
+from crud.user_features import mark_features_stale
+from jobs.predict_all import run_shard, shard_range
+from models.diet_prediction import DietPrediction
+from src.models.user import User
+from prediction_engine import diet_predictor
+from tests.test_prediction_engine import make_user_details
+from tests.test_user_features import log_food
+
+
+def add_user(session, seed, food_logs):
+    user = User(email=f"user{seed}@example.com", hashed_password="hashed")
+    session.add(user)
+    session.commit()
+    create_user_details(session=session, user_details=make_user_details(seed), user_id=user.id)
+    for day in range(food_logs):
+        log_food(session, user.id, date(2025, 6, 1) + timedelta(days=day), 2000)
+    return user
+
+
+def test_shard_ranges_cover_id_space():
+    ranges = [shard_range(shard, 3) for shard in range(3)]
+
+    assert ranges[0][0] == uuid.UUID(int=0)
+    assert ranges[-1][1] is None
+    assert [end for _, end in ranges[:-1]] == [start for start, _ in ranges[1:]]
+
+
+def test_predictions_are_stored_in_naive_utc(db_session):
+    user = add_user(db_session, 0, food_logs=3)
+    read_at = datetime(2025, 6, 1, 14, 30, tzinfo=timezone(timedelta(hours=2)))
+
+    save_predictions(session=db_session, predictions={user.id: "Balanced"},
+                     model_version=diet_predictor.model_version, predicted_at=read_at)
+
+    assert db_session.get(DietPrediction, user.id).predicted_at == datetime(2025, 6, 1, 12, 30)
+
+
+def test_run_shard_stores_and_resumes(db_engine, db_session):
+    users = [add_user(db_session, seed, food_logs=25 if seed % 2 else 3) for seed in range(4)]
+
+    assert run_shard(0, 1, chunk_size=3, engine=db_engine) == 4
+    stored = {row.user_id: row for row in db_session.exec(select(DietPrediction))}
+    expected = diet_predictor.predict_many(db_session)
+    assert {user_id: row.recommendation for user_id, row in stored.items()} == expected
+    assert {row.model_version for row in stored.values()} == {diet_predictor.model_version}
+
+    # fresh predictions are skipped, a new food log makes one user's prediction stale
+    assert run_shard(0, 1, engine=db_engine) == 0
+    log_food(db_session, users[0].id, date(2025, 7, 1), 1800)
+    assert get_fresh_prediction(session=db_session, user_id=users[0].id, model_version=diet_predictor.model_version,
+                                max_age=timedelta(hours=1)) is None
+    assert run_shard(0, 1, engine=db_engine) == 1
+    assert run_shard(0, 1, engine=db_engine, force=True) == 4
+
+
+def fresh(session, user_id):
+    return get_fresh_prediction(session=session, user_id=user_id, model_version=diet_predictor.model_version,
+                                max_age=timedelta(hours=1))
+
+
+def test_changes_made_while_scoring_leave_the_prediction_stale(db_session):
+    user = add_user(db_session, 0, food_logs=3)
+    read_at = datetime.now(timezone.utc)
+    # committed after the inputs were read, before the prediction is saved
+    log_food(db_session, user.id, date(2025, 7, 1), 1800)
+
+    save_predictions(session=db_session, predictions={user.id: "Balanced"},
+                     model_version=diet_predictor.model_version, predicted_at=read_at)
+
+    assert fresh(db_session, user.id) is None
+
+
+def test_users_without_logs_get_no_stored_prediction(db_engine, db_session):
+    user = add_user(db_session, 0, food_logs=0)
+
+    assert run_shard(0, 1, engine=db_engine) == 0
+    assert fresh(db_session, user.id) is None
+
+
+def test_details_changes_stale_predictions_of_users_without_logs(db_session):
+    user = add_user(db_session, 0, food_logs=0)
+    save_predictions(session=db_session, predictions={user.id: "Balanced"},
+                     model_version=diet_predictor.model_version, predicted_at=datetime.now(timezone.utc))
+    assert fresh(db_session, user.id) is not None
+
+    mark_features_stale(db_session, user.id)
+    db_session.commit()
+
+    assert fresh(db_session, user.id) is None
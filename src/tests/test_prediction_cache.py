@@ -0,0 +1,60 @@
+import numpy as np
+
+from service.prediction_cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fingerprint_depends_on_features_and_model_version():
+    features = np.array([[1.0, 2.0, 0.0]])
+
+    key = PredictionCache.fingerprint(features, "v1")
+
+    assert key == PredictionCache.fingerprint(features.copy(), "v1")
+    assert key != PredictionCache.fingerprint(features, "v2")
+    assert key != PredictionCache.fingerprint(np.array([[1.0, 2.0, 1.0]]), "v1")
+
+
+def test_get_counts_hits_and_misses():
+    cache = PredictionCache(max_size=10, ttl=60)
+
+    assert cache.get("a") is None
+    cache.put("a", "balanced")
+    assert cache.get("a") == "balanced"
+
+    stats = cache.stats()["features"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(max_size=2, ttl=60)
+    cache.put("a", "balanced")
+    cache.put("b", "low-fat")
+    cache.get("a")
+
+    cache.put("c", "low-carb")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "balanced"
+    assert cache.get("c") == "low-carb"
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = PredictionCache(max_size=10, ttl=60, clock=clock)
+    cache.put("a", "balanced")
+
+    clock.now = 59
+    assert cache.get("a") == "balanced"
+    clock.now = 60
+    assert cache.get("a") is None
+    assert cache.stats()["features"]["size"] == 0
+
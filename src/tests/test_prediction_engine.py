@@ -0,0 +1,135 @@
+import asyncio
+import json
+import random
+import uuid
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from unittest.mock import MagicMock, patch
+
+from config.config import BMI, MIN_FOOD_LOGS
+
+from models.user_details import (UserDetailsCreate, Gender, ChronicDisease, GeneticRiskFactor, Allergy,
+                                 AlcoholConsumption, SmokingHabit, DietaryHabit, PreferredCuisine,
+                                 FoodAversion)
+from prediction_engine import DietPredictor, diet_predictor
+from service.feature_encoder import FeatureEncoder
+
+
+def make_user_details(seed):
+    rnd = random.Random(seed)
+    height_cm, weight_kg = rnd.uniform(150, 200), rnd.uniform(45, 130)
+    return UserDetailsCreate(
+        age=rnd.randint(18, 80),
+        gender=rnd.choice(list(Gender)),
+        height_cm=height_cm,
+        weight_kg=weight_kg,
+        bmi=round(weight_kg / ((height_cm / 100) ** 2), 1),
+        chronic_disease=rnd.choice(list(ChronicDisease)),
+        cholesterol_level=rnd.uniform(150, 300),
+        blood_sugar_level=rnd.uniform(70, 250),
+        calorie_intake=rnd.uniform(1200, 3500),
+        protein_intake=rnd.uniform(40, 200),
+        fat_intake=rnd.uniform(20, 150),
+        carbohydrate_intake=rnd.uniform(100, 400),
+        genetic_risk_factor=rnd.choice(list(GeneticRiskFactor)),
+        allergies=rnd.choice(list(Allergy)),
+        daily_steps=rnd.randint(1000, 15000),
+        exercise_frequency=rnd.randint(0, 7),
+        sleep_hours=rnd.uniform(4, 10),
+        alcohol_consumption=rnd.choice(list(AlcoholConsumption)),
+        smoking_habit=rnd.choice(list(SmokingHabit)),
+        dietary_habits=rnd.choice(list(DietaryHabit)),
+        preferred_cuisine=rnd.choice(list(PreferredCuisine)),
+        food_aversions=rnd.choice(list(FoodAversion)),
+    )
+
+
+def test_get_bmi_classes_matches_scalar():
+    bmis = [10, 18.49, 18.495, 18.5, 24.99, 25, 29.99, 30, 100, 120]
+
+    classes = DietPredictor._get_bmi_classes(np.array(bmis + [np.nan]))
+
+    assert list(classes[:-1]) == [DietPredictor._get_bmi_class(bmi) for bmi in bmis]
+    assert classes[-1] == 'None'
+
+
+def test_predict_frame_matches_single_predictions():
+    details = [make_user_details(seed) for seed in range(40)]
+    food_log_counts = np.array([0 if seed % 4 == 0 else 30 for seed in range(40)])
+    frame = pd.DataFrame([json.loads(d.json()) for d in details])
+
+    predictions = diet_predictor.predict_frame(frame, food_log_counts, chunk_size=7)
+
+    expected = [diet_predictor.predict(d, food_log_count=count) for d, count in zip(details, food_log_counts)]
+    assert list(predictions) == expected
+
+
+def test_bmi_between_classes_gets_the_fallback_on_every_path():
+    details = [make_user_details(seed) for seed in range(2)]
+    details[0].bmi, details[1].bmi = 24.995, 18.495
+    frame = pd.DataFrame([json.loads(d.json()) for d in details])
+
+    batch = diet_predictor.predict_frame(frame, np.array([MIN_FOOD_LOGS, 30]))
+
+    single = [diet_predictor.predict(d, food_log_count=30) for d in details]
+    awaited = [asyncio.run(diet_predictor.predict_async(d, food_log_count=30)) for d in details]
+    encoded = [asyncio.run(diet_predictor.predict_encoded_async(*diet_predictor.encode(d), food_log_count=30))
+               for d in details]
+    assert list(batch) == single == awaited == encoded == ["Balanced", "Balanced"]
+
+
+def test_predict_many_keys_results_by_user():
+    details = [make_user_details(seed) for seed in range(3)]
+    user_ids = [uuid.uuid4() for _ in details]
+    Row = namedtuple("Row", [*UserDetailsCreate.model_fields, "user_id", "food_log_count"])
+    rows = [Row(**d.model_dump(), user_id=user_id, food_log_count=30)
+            for d, user_id in zip(details, user_ids)]
+
+    with patch("prediction_engine.iter_user_details_with_log_counts", return_value=iter([rows[:2], rows[2:]])):
+        result = diet_predictor.predict_many(MagicMock(), user_ids=user_ids)
+
+    assert result == {user_id: diet_predictor.predict(d, food_log_count=30) for d, user_id in zip(details, user_ids)}
+
+
+def test_feature_encoder_matches_pipeline_preprocessor():
+    details = [make_user_details(seed) for seed in range(50)]
+    details[0].cholesterol_level = None
+    details[1].sleep_hours = None
+    pipeline = diet_predictor.model["pipeline"]
+    frame = pd.DataFrame([json.loads(d.json()) for d in details])
+    frame[BMI] = DietPredictor._get_bmi_classes(frame[BMI])
+
+    expected = pipeline.steps[0][1].transform(frame)
+
+    rows = np.vstack([diet_predictor.encoder.encode(d, bmi=bmi) for d, bmi in zip(details, frame[BMI])])
+    np.testing.assert_array_equal(rows, expected)
+    np.testing.assert_array_equal(diet_predictor.encoder.encode_frame(frame), expected)
+
+
+def test_encoder_and_dataframe_paths_give_identical_predictions():
+    details = [make_user_details(seed) for seed in range(200)]
+
+    fast = [diet_predictor.predict(d, food_log_count=30) for d in details]
+    slow = [diet_predictor._predict_dataframe(d, DietPredictor._get_bmi_class(d.bmi)) for d in details]
+
+    assert fast == slow
+
+
+def test_feature_encoder_unknown_category_raises():
+    details = make_user_details(0)
+
+    with pytest.raises(ValueError):
+        diet_predictor.encoder.encode(details, bmi='None')
+
+
+def test_feature_encoder_does_not_compile_unsupported_pipeline():
+    pipeline = Pipeline([("scaler", StandardScaler()), ("classifier", LogisticRegression())])
+
+    assert FeatureEncoder.compile(pipeline) is None
+    assert FeatureEncoder.compile(object()) is None
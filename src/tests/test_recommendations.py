@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from models.user_details import Allergy, DietaryHabit, FoodAversion, PreferredCuisine
+from utils.recommendations import FoodRecommender, food_recommender, get_food_recommendations
+
+
+def make_details(allergies=Allergy.NA, dietary_habits=DietaryHabit.REGULAR,
+                 preferred_cuisine=PreferredCuisine.WESTERN, food_aversions=FoodAversion.NA):
+    return SimpleNamespace(allergies=allergies, dietary_habits=dietary_habits,
+                           preferred_cuisine=preferred_cuisine, food_aversions=food_aversions)
+
+
+def tags(recommender, name):
+    index = list(recommender.names).index(name)
+    return recommender.allergens[index], recommender.diets[index], recommender.flavors[index]
+
+
+def test_foods_are_ranked_by_density():
+    recommender = food_recommender()
+    column = recommender.nutrients.index("vitamin_c")
+    ranked = recommender.ranked["vitamin_c"]
+
+    assert np.all(np.diff(recommender.density[ranked, column]) <= 0)
+    assert get_food_recommendations({"vitamin_c_deficient": 1, "iron_deficient": 0}).keys() == {"vitamin_c"}
+
+
+def test_upper_limit_nutrients_get_no_foods():
+    assert get_food_recommendations({"sugar_deficient": 1, "sodium_deficient": 1, "fiber_deficient": 1}).keys() \
+        == {"fiber"}
+    assert "Whole grains" in food_recommender().recommend(["fiber"], limit=100)["fiber"]
+
+
+def test_constraints_filter_recommendations():
+    recommender = food_recommender()
+    details = make_details(allergies=Allergy.NUT, dietary_habits=DietaryHabit.VEGAN,
+                           food_aversions=FoodAversion.SWEET)
+
+    recommendations = recommender.recommend(["protein", "calcium", "vitamin_c", "iron"], details)
+
+    for foods in recommendations.values():
+        assert foods
+        for food in foods:
+            allergens, diets, flavors = tags(recommender, food)
+            assert not allergens & 2
+            assert diets & 1
+            assert not flavors & 2
+    assert "Almonds" not in recommendations["calcium"]
+    assert "Milk" not in recommendations["calcium"]
+
+
+def test_preferred_cuisine_is_boosted():
+    recommender = FoodRecommender(
+        names=["Plain", "Local"], nutrients=["calories", "iron"],
+        amounts=np.array([[100.0, 5.0], [100.0, 4.5]]),
+        allergens=np.zeros(2, dtype=int), diets=np.full(2, 7), flavors=np.zeros(2, dtype=int),
+        cuisines=np.array([4, 1]),
+    )
+
+    assert recommender.recommend(["iron"])["iron"] == ["Plain", "Local"]
+    assert recommender.recommend(["iron"], make_details(preferred_cuisine=PreferredCuisine.INDIAN))["iron"] \
+        == ["Local", "Plain"]
@@ -0,0 +1,51 @@
+from datetime import date
+
+from sqlalchemy import update
+from sqlmodel import select
+
+from crud.food_log import update_food_log
+from crud.user_details import create_user_details
+from jobs.reconcile_nutrition import reconcile
+from models.food_log import FoodLogUpdate
+from models.user_details import UserDetails, UserDetailsCreate
+from models.user_features import UserFeatures
+from tests.test_user_features import log_food
+
+
+def read_details(session, user_id):
+    session.expire_all()
+    return session.exec(select(UserDetails).where(UserDetails.user_id == user_id)).one()
+
+
+def test_writes_keep_details_totals_in_sync(db_engine, db_session, db_user):
+    create_user_details(session=db_session, user_id=db_user.id,
+                        user_details=UserDetailsCreate(height_cm=175, weight_kg=70, calorie_intake=2500))
+    # the intake entered before any log is kept
+    assert read_details(db_session, db_user.id).calorie_intake == 2500
+
+    first = log_food(db_session, db_user.id, date(2025, 6, 1), 300, protein=10)
+    log_food(db_session, db_user.id, date(2025, 6, 2), 500, protein=20)
+    update_food_log(session=db_session, db_food_log=first, food_log_in=FoodLogUpdate(calories=350))
+
+    details = read_details(db_session, db_user.id)
+    assert (details.calorie_intake, details.protein_intake) == (850, 30)
+    assert reconcile(engine=db_engine) == []
+
+
+def test_reconcile_reports_and_fixes_drift(db_engine, db_session, db_user):
+    create_user_details(session=db_session, user_id=db_user.id,
+                        user_details=UserDetailsCreate(height_cm=175, weight_kg=70))
+    log_food(db_session, db_user.id, date(2025, 6, 1), 300, iron=2)
+    db_session.execute(update(UserFeatures).values(total_calories=999, total_iron=0, food_log_count=5))
+    db_session.commit()
+
+    reports = reconcile(engine=db_engine)
+
+    assert len(reports) == 1
+    assert reports[0]["user_id"] == db_user.id
+    assert set(reports[0]["drift"]) == {"food_log_count", "total_calories", "total_iron"}
+    assert reports[0]["drift"]["total_calories"] == {"stored": 999, "actual": 300}
+
+    assert len(reconcile(fix=True, engine=db_engine)) == 1
+    assert reconcile(engine=db_engine) == []
+    assert read_details(db_session, db_user.id).calorie_intake == 300
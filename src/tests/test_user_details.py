@@ -38,7 +38,8 @@ def test_create_user_details(mock_session):
         bmi=22.9,
     )
 
-    with patch("crud.user_details.UserDetails") as MockUserDetails:
+    with patch("crud.user_details.UserDetails") as MockUserDetails, \
+         patch("crud.user_details.update_user_nutrition_summary") as mock_update_summary:
         mock_user_details_instance = make_mock_user_details(user_id=user_id)
         MockUserDetails.model_validate.return_value = mock_user_details_instance
 
@@ -48,49 +49,17 @@ def test_create_user_details(mock_session):
         mock_session.add.assert_called_once_with(mock_user_details_instance)
         mock_session.commit.assert_called_once()
         mock_session.refresh.assert_called_once_with(mock_user_details_instance)
+        mock_update_summary.assert_called_once_with(mock_session, user_id)
 
         assert result == mock_user_details_instance
 
 
-def test_update_user_nutrition_summary_with_details(mock_session):
+def test_update_user_nutrition_summary_is_a_single_update(mock_session):
     user_id = uuid.uuid4()
 
-    # Mock food log results with dummy nutrition values
-    mock_food_log1 = MagicMock(calories=100, protein=5, fat=2, carbs=20)
-    mock_food_log2 = MagicMock(calories=200, protein=10, fat=3, carbs=30)
-
-    # Mock the query for food logs
-    mock_food_logs = [mock_food_log1, mock_food_log2]
-    mock_session.exec.return_value.all.return_value = mock_food_logs
-
-    # Mock user details object to be updated
-    mock_user_details = make_mock_user_details(user_id=user_id)
-    mock_session.exec.return_value.first.return_value = mock_user_details
-
-    update_user_nutrition_summary(mock_session, user_id)
-
-    # Check sums were correctly assigned
-    assert mock_user_details.calorie_intake == 300
-    assert mock_user_details.protein_intake == 15
-    assert mock_user_details.fat_intake == 5
-    assert mock_user_details.carbohydrate_intake == 50
-
-    # Check session methods called properly
-    mock_session.add.assert_called_once_with(mock_user_details)
-    mock_session.commit.assert_called_once()
-    mock_session.refresh.assert_called_once_with(mock_user_details)
-
-
-def test_update_user_nutrition_summary_no_details(mock_session):
-    user_id = uuid.uuid4()
-
-    # Return food logs but no user details
-    mock_session.exec.return_value.all.return_value = []
-    mock_session.exec.return_value.first.return_value = None
-
-    # Should not raise and should not call add/commit/refresh
     update_user_nutrition_summary(mock_session, user_id)
 
-    mock_session.add.assert_not_called()
+    # one UPDATE copying the maintained totals, no scan of the logs
+    mock_session.execute.assert_called_once()
+    mock_session.exec.assert_not_called()
     mock_session.commit.assert_not_called()
-    mock_session.refresh.assert_not_called()
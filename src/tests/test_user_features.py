@@ -0,0 +1,49 @@
+from datetime import date
+
+import numpy as np
+
+from crud.food_log import create_food_log, delete_food_log, update_food_log
+from crud.user_details import create_user_details
+from crud.user_features import get_user_features, store_encoded_features
+from models.food_log import FoodLogCreate, FoodLogUpdate
+from models.user_details import UserDetailsCreate
+
+
+def log_food(session, user_id, log_date, calories, **nutrients):
+    food_log = FoodLogCreate(log_date=log_date, food="Oats", meal_type="breakfast", calories=calories, **nutrients)
+    return create_food_log(session=session, food_log=food_log, user_id=user_id)
+
+
+def test_insert_update_delete_maintain_aggregates(db_session, db_user):
+    first = log_food(db_session, db_user.id, date(2025, 6, 1), 300, protein=10, iron=2)
+    second = log_food(db_session, db_user.id, date(2025, 6, 3), 500, protein=20)
+
+    features = get_user_features(session=db_session, user_id=db_user.id)
+    assert features.food_log_count == 2
+    assert (features.first_log_date, features.last_log_date) == (date(2025, 6, 1), date(2025, 6, 3))
+    assert (features.total_calories, features.total_protein, features.total_iron) == (800, 30, 2)
+
+    update_food_log(session=db_session, db_food_log=second, food_log_in=FoodLogUpdate(calories=450))
+    db_session.refresh(features)
+    assert features.total_calories == 750
+
+    delete_food_log(session=db_session, db_food_log=first)
+    db_session.refresh(features)
+    assert features.food_log_count == 1
+    assert (features.first_log_date, features.last_log_date) == (date(2025, 6, 3), date(2025, 6, 3))
+    assert (features.total_calories, features.total_protein, features.total_iron) == (450, 20, 0)
+
+
+def test_details_change_clears_encoded_features(db_session, db_user):
+    log_food(db_session, db_user.id, date(2025, 6, 1), 300)
+    store_encoded_features(session=db_session, user_id=db_user.id, bmi_class="normal",
+                           features=np.array([[0.5, 1.0]]), model_version="v1")
+
+    features = get_user_features(session=db_session, user_id=db_user.id)
+    assert features.encoded_features == [0.5, 1.0]
+
+    create_user_details(session=db_session, user_details=UserDetailsCreate(height_cm=175, weight_kg=70),
+                        user_id=db_user.id)
+    db_session.refresh(features)
+    assert features.encoded_features is None
+    assert features.model_version is None
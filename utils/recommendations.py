@@ -1,17 +1,134 @@
-RECOMMENDATION_DB = {
-    'iron': ['Spinach', 'Red meat', 'Lentils', 'Chickpeas', 'Pumpkin seeds', 'Tofu'],
-    'calcium': ['Milk', 'Yogurt', 'Cheese', 'Sardines', 'Kale', 'Almonds'],
-    'vitamin_c': ['Orange', 'Guava', 'Strawberries', 'Bell peppers', 'Broccoli', 'Kiwi'],
-    'fiber': ['Oats', 'Chia seeds', 'Whole grains', 'Apples', 'Lentils', 'Beans'],
-    'protein': ['Eggs', 'Chicken breast', 'Fish', 'Greek yogurt', 'Lentils', 'Paneer']
-}
-
-
-def get_food_recommendations(predictions: dict):
-    recs = {}
-    for key, value in predictions.items():
-        if value == 1:
-            nutrient = key.replace('_deficient', '')
-            if nutrient in RECOMMENDATION_DB:
-                recs[nutrient] = RECOMMENDATION_DB[nutrient]
-    return recs
+import csv
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from config.config import UPPER_LIMIT_NUTRIENTS
+
+CATALOG_PATH = Path(__file__).parent / "food_catalog.csv"
+
+# foods suggested per deficient nutrient
+RECOMMENDATIONS_PER_NUTRIENT = 6
+
+# score added to foods of the user's preferred cuisine, densities are scaled to 0..1
+CUISINE_BOOST = 0.25
+
+# bit per catalog tag; UserDetails enum values map to the same bits below
+ALLERGEN_BITS = {"lactose": 1, "nuts": 2, "gluten": 4}
+DIET_BITS = {"vegan": 1, "vegetarian": 2, "keto": 4}
+FLAVOR_BITS = {"spicy": 1, "sweet": 2, "salty": 4}
+CUISINE_BITS = {"indian": 1, "asian": 2, "western": 4, "mediterranean": 8}
+CUISINE_BITS["any"] = sum(CUISINE_BITS.values())
+
+ALLERGY_TAGS = {"Lactose Intolerance": "lactose", "Nut Allergy": "nuts", "Gluten Intolerance": "gluten"}
+DIET_TAGS = {"Vegan": "vegan", "Vegetarian": "vegetarian", "Keto": "keto"}
+AVERSION_TAGS = {"Spicy": "spicy", "Sweet": "sweet", "Salty": "salty"}
+
+
+def _mask(tags: str, bits: dict[str, int]) -> int:
+    return sum(bits[tag] for tag in tags.lower().split("|") if tag)
+
+
+def _value(value) -> Optional[str]:
+    return getattr(value, "value", value)
+
+
+class FoodRecommender:
+    """
+    Food-nutrient catalog with precomputed indexes for constraint-aware recommendations.
+
+    Nutrient amounts are per 100 g. Each nutrient keeps the foods containing it ranked by
+    density, the amount per 100 kcal (the amount itself for calories). Allergens, the diets
+    a food fits, flavors and cuisines are bitmask arrays, so the foods a user may eat are
+    found with a few vectorized comparisons and no per-food Python.
+    """
+
+    def __init__(self, names: list[str], nutrients: list[str], amounts: np.ndarray,
+                 allergens: np.ndarray, diets: np.ndarray, flavors: np.ndarray, cuisines: np.ndarray):
+        self.names = np.array(names, dtype=object)
+        self.nutrients = nutrients
+        self.amounts = amounts
+        self.allergens = allergens
+        self.diets = diets
+        self.flavors = flavors
+        self.cuisines = cuisines
+
+        calories = amounts[:, nutrients.index("calories")]
+        density = amounts / np.maximum(calories, 1)[:, None] * 100
+        density[:, nutrients.index("calories")] = calories
+        peak = density.max(axis=0)
+        self.density = density / np.where(peak > 0, peak, 1)
+        self.ranked = {}
+        for column, nutrient in enumerate(nutrients):
+            order = np.argsort(-self.density[:, column], kind="stable")
+            self.ranked[nutrient] = order[self.density[order, column] > 0]
+
+    @classmethod
+    def from_csv(cls, path: Path = CATALOG_PATH) -> "FoodRecommender":
+        with open(path, newline="") as catalog:
+            reader = csv.DictReader(catalog)
+            nutrients = reader.fieldnames[5:]
+            rows = list(reader)
+        return cls(
+            names=[row["name"] for row in rows],
+            nutrients=nutrients,
+            amounts=np.array([[float(row[nutrient] or 0) for nutrient in nutrients] for row in rows]),
+            allergens=np.array([_mask(row["allergens"], ALLERGEN_BITS) for row in rows]),
+            diets=np.array([_mask(row["diets"], DIET_BITS) for row in rows]),
+            flavors=np.array([_mask(row["flavors"], FLAVOR_BITS) for row in rows]),
+            cuisines=np.array([_mask(row["cuisine"], CUISINE_BITS) for row in rows]),
+        )
+
+    def allowed(self, user_details=None) -> np.ndarray:
+        """Boolean mask of the foods compatible with the user's allergies, diet and aversions"""
+        allowed = np.ones(len(self.names), dtype=bool)
+        if user_details is None:
+            return allowed
+        allergy = ALLERGY_TAGS.get(_value(user_details.allergies))
+        if allergy:
+            allowed &= (self.allergens & ALLERGEN_BITS[allergy]) == 0
+        diet = DIET_TAGS.get(_value(user_details.dietary_habits))
+        if diet:
+            allowed &= (self.diets & DIET_BITS[diet]) != 0
+        aversion = AVERSION_TAGS.get(_value(user_details.food_aversions))
+        if aversion:
+            allowed &= (self.flavors & FLAVOR_BITS[aversion]) == 0
+        return allowed
+
+    def recommend(self, nutrients: Iterable[str], user_details=None,
+                  limit: int = RECOMMENDATIONS_PER_NUTRIENT) -> dict[str, list[str]]:
+        """
+        The densest allowed foods per nutrient, preferred cuisine first among similar densities.
+        `UPPER_LIMIT_NUTRIENTS` get none, eating more of them is never advised.
+        """
+        allowed = self.allowed(user_details)
+        cuisine = _value(getattr(user_details, "preferred_cuisine", None))
+        cuisine_bit = CUISINE_BITS.get(cuisine.lower(), 0) if cuisine else 0
+
+        recommendations = {}
+        for nutrient in nutrients:
+            ranked = self.ranked.get(nutrient)
+            if ranked is None or nutrient in UPPER_LIMIT_NUTRIENTS:
+                continue
+            candidates = ranked[allowed[ranked]]
+            if cuisine_bit:
+                column = self.nutrients.index(nutrient)
+                preferred = (self.cuisines[candidates] & cuisine_bit) != 0
+                score = self.density[candidates, column] + CUISINE_BOOST * preferred
+                candidates = candidates[np.argsort(-score, kind="stable")]
+            recommendations[nutrient] = list(self.names[candidates[:limit]])
+        return recommendations
+
+
+@lru_cache(maxsize=1)
+def food_recommender() -> FoodRecommender:
+    return FoodRecommender.from_csv()
+
+
+def get_food_recommendations(predictions: dict, user_details=None) -> dict[str, list[str]]:
+    """Foods for every `{nutrient}_deficient` flag set to 1, filtered by the user's details when given"""
+    deficient = [key.removesuffix("_deficient") for key, value in predictions.items()
+                 if key.endswith("_deficient") and value == 1]
+    return food_recommender().recommend(deficient, user_details)